@@ -0,0 +1,24 @@
+"""
+Gunicorn settings, read automatically from the working directory.
+
+Workers share Prometheus metrics through files in PROMETHEUS_MULTIPROC_DIR
+(see it_consulting.metrics), which is emptied when the server starts.
+"""
+
+import os
+import shutil
+
+prometheus_multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def on_starting(server):
+    if prometheus_multiproc_dir:
+        shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+        os.makedirs(prometheus_multiproc_dir)
+
+
+def child_exit(server, worker):
+    if prometheus_multiproc_dir:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -7,3 +7,11 @@ class HomeConfig(AppConfig):
     
     def ready(self):
         import home.admin
+        import home.checks
+        from django.conf import settings
+        from home.signals import register_signal_handlers
+        from it_consulting.metrics import install_rendition_metrics
+
+        register_signal_handlers()
+        if getattr(settings, "METRICS_ENABLED", True):
+            install_rendition_metrics()
@@ -0,0 +1,224 @@
+"""
+Render benchmarks for ``HomePage``.
+
+``run_benchmarks`` builds a worst-case page (see
+``home.sample_content.worst_case_content``) and reports render time, query
+count and allocated memory for each StreamField block type and for the whole
+page. Timings are taken without tracing; queries and memory are measured in a
+separate traced pass so that tracemalloc does not distort the timings.
+
+Use the ``benchmark_homepage`` management command to run them.
+
+``run_editor_benchmarks`` measures the page editor instead: the size and
+packing time of the ``HomePage.content`` block definitions sent to the
+editor's JavaScript, and the edit view's response size and render time. Use
+the ``benchmark_editor`` management command to run it.
+"""
+
+import gc
+import gzip
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import django
+import wagtail
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection, transaction
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from wagtail.admin.telepath import JSContext
+from wagtail.models import Site
+
+from home import sample_content
+from home.models import HomePage
+
+
+def summarize(timings):
+    return {
+        "min": round(min(timings), 3),
+        "median": round(statistics.median(timings), 3),
+        "mean": round(statistics.fmean(timings), 3),
+        "max": round(max(timings), 3),
+    }
+
+
+def time_run(setup, run, iterations):
+    """Return the wall time in ms of ``run(setup())`` for each iteration;
+    ``setup`` is not timed."""
+    timings = []
+    for _ in range(iterations):
+        state = setup()
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def trace_run(setup, run):
+    """Return the queries and memory used by a single ``run(setup())``."""
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            before, _ = tracemalloc.get_traced_memory()
+            run(state)
+            after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "queries": len(queries),
+        "allocated_bytes": after - before,
+        "peak_bytes": peak - before,
+    }
+
+
+def measure(setup, run, iterations, warmup):
+    for _ in range(warmup):
+        run(setup())
+    result = {"time_ms": summarize(time_run(setup, run, iterations))}
+    result.update(trace_run(setup, run))
+    return result
+
+
+def make_request(page):
+    site = Site.objects.get(is_default_site=True)
+    request = RequestFactory().get(page.url, HTTP_HOST=site.hostname)
+    request.user = AnonymousUser()
+    return request
+
+
+def benchmark_page(page, iterations=20, warmup=2):
+    """Benchmark each block type of ``page.content`` and the full page render."""
+    request = make_request(page)
+
+    def load_page():
+        # A fresh instance each time, so StreamField deserialization and
+        # chooser lookups are part of the measurement.
+        return HomePage.objects.get(pk=page.pk)
+
+    block_indexes = {}
+    for index, raw_block in enumerate(page.content.raw_data):
+        block_indexes.setdefault(raw_block["type"], []).append(index)
+
+    results = {"blocks": {}}
+    for block_type, indexes in sorted(block_indexes.items()):
+
+        def render_blocks(fresh_page, indexes=indexes):
+            context = {"page": fresh_page, "request": request}
+            for index in indexes:
+                fresh_page.content[index].render(context)
+
+        results["blocks"][block_type] = {
+            "count": len(indexes),
+            **measure(load_page, render_blocks, iterations, warmup),
+        }
+
+    def render_page(fresh_page):
+        return fresh_page.serve(request).render()
+
+    results["page"] = {
+        "blocks": len(page.content.raw_data),
+        "html_bytes": len(render_page(load_page()).content),
+        **measure(load_page, render_page, iterations, warmup),
+    }
+    return results
+
+
+@contextmanager
+def worst_case_page(image_count=5):
+    """
+    Yield a published worst-case ``HomePage`` under the default site root.
+    Everything is created in a transaction that is rolled back afterwards,
+    and the generated image files are deleted.
+    """
+    images = []
+    try:
+        with transaction.atomic():
+            images = [
+                sample_content.create_placeholder_image(
+                    "Benchmark image %d" % i,
+                    color=sample_content.PLACEHOLDER_COLORS[i % len(sample_content.PLACEHOLDER_COLORS)],
+                )
+                for i in range(image_count)
+            ]
+            root = Site.objects.get(is_default_site=True).root_page
+            page = HomePage(
+                title="Render benchmark",
+                content=sample_content.worst_case_content([image.pk for image in images]),
+            )
+            root.add_child(instance=page)
+            page.save_revision().publish()
+            yield page
+            transaction.set_rollback(True)
+    finally:
+        for image in images:
+            image.file.storage.delete(image.file.name)
+
+
+def run_benchmarks(iterations=20, warmup=2, image_count=5):
+    with worst_case_page(image_count) as page:
+        results = benchmark_page(page, iterations=iterations, warmup=warmup)
+    results["meta"] = {
+        "iterations": iterations,
+        "warmup": warmup,
+        "images": image_count,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "wagtail": wagtail.__version__,
+        "database": connection.vendor,
+    }
+    return results
+
+
+def pack_block_definitions(block):
+    """Return the JSON of ``block``'s definition as sent to the editor."""
+    return json.dumps(JSContext().pack(block))
+
+
+def run_editor_benchmarks(iterations=20, warmup=2, image_count=5):
+    stream_block = HomePage._meta.get_field("content").stream_block
+    definitions = pack_block_definitions(stream_block)
+    results = {
+        "definitions": {
+            "bytes": len(definitions),
+            "gzip_bytes": len(gzip.compress(definitions.encode())),
+            **measure(lambda: stream_block, pack_block_definitions, iterations, warmup),
+        },
+    }
+
+    with worst_case_page(image_count) as page:
+        user = get_user_model().objects.create_superuser("benchmark", "benchmark@example.com", None)
+        client = Client(HTTP_HOST=Site.objects.get(is_default_site=True).hostname)
+        client.force_login(user)
+        url = reverse("wagtailadmin_pages:edit", args=(page.pk,))
+
+        def load_edit_view(client):
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+            return response
+
+        html = load_edit_view(client).content
+        results["edit_view"] = {
+            "html_bytes": len(html),
+            "gzip_bytes": len(gzip.compress(html)),
+            **measure(lambda: client, load_edit_view, iterations, warmup),
+        }
+
+    results["meta"] = {
+        "iterations": iterations,
+        "warmup": warmup,
+        "images": image_count,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "wagtail": wagtail.__version__,
+        "database": connection.vendor,
+    }
+    return results
@@ -1,8 +1,116 @@
+from django.utils.functional import cached_property
 from wagtail import blocks
 from wagtail.images.blocks import ImageChooserBlock
 from wagtail.blocks import URLBlock, CharBlock, TextBlock, ChoiceBlock, BooleanBlock, RichTextBlock, IntegerBlock
 
-class HeroBannerBlock(blocks.StructBlock):
+from home.profiling import block_profiler
+from it_consulting.instrumentation import timed_block
+
+
+class TimedRenderMixin:
+    """Report render time per block type in the request's Server-Timing
+    metrics and to the sampling block profiler."""
+
+    def render(self, value, context=None):
+        block_type = self.name or type(self).__name__
+        with timed_block(block_type), block_profiler.profile(block_type, context):
+            return super().render(value, context)
+
+
+class CompactStructMixin:
+    """
+    Store only the children whose value differs from the child block's
+    default. ``StructBlock.to_python()`` fills in missing children with their
+    defaults when loading, so stored pages follow any later change to a
+    default. Use the ``compact_streamfields`` command to compact content
+    saved before this was added.
+    """
+
+    @cached_property
+    def prep_defaults(self):
+        return {name: child.get_prep_value(child.get_default()) for name, child in self.child_blocks.items()}
+
+    def compact_prep_value(self, prep_value):
+        """Remove the default values from a stored (JSON-ready) value."""
+        defaults = self.prep_defaults
+        return {
+            name: value
+            for name, value in prep_value.items()
+            if name not in defaults or value != defaults[name]
+        }
+
+    def get_prep_value(self, value):
+        return self.compact_prep_value(super().get_prep_value(value))
+
+
+def compact_stream_data(stream_block, stream_data):
+    """Compact the raw data of a stream, leaving blocks whose type is unknown
+    or isn't a ``CompactStructMixin`` block as they are."""
+    compacted = []
+    for item in stream_data:
+        block = stream_block.child_blocks.get(item.get("type"))
+        if isinstance(block, CompactStructMixin) and isinstance(item.get("value"), dict):
+            item = {**item, "value": block.compact_prep_value(item["value"])}
+        compacted.append(item)
+    return compacted
+
+
+class SharedChoiceBlock(ChoiceBlock):
+    """
+    A choice set used by several blocks, defined by setting ``choices`` on a
+    subclass. Like any ``ChoiceBlock`` subclass, instances deconstruct to a
+    plain ``ChoiceBlock`` with the choices inline, so migrations don't depend
+    on the subclasses.
+
+    Instances with the same choices share one widget. The editor's block
+    definitions are packed by telepath, which emits an object it has already
+    packed as a reference, so each choice set's HTML is sent once instead of
+    once per field.
+    """
+
+    # Keyed by block class, whether the field is required and whether a
+    # blank choice is added.
+    widgets = {}
+
+    def get_field(self, **kwargs):
+        field = super().get_field(**kwargs)
+        if kwargs.get("widget") is None:
+            key = (type(self), field.required, not (self._default and self._required))
+            field.widget = SharedChoiceBlock.widgets.setdefault(key, field.widget)
+        return field
+
+
+class ButtonStyleBlock(SharedChoiceBlock):
+    choices = [
+        ('primary', 'Primary'),
+        ('secondary', 'Secondary'),
+        ('outline', 'Outline'),
+        ('ghost', 'Ghost'),
+    ]
+
+
+class OverlayOpacityBlock(SharedChoiceBlock):
+    choices = [('0', '0%'), ('25', '25%'), ('50', '50%'), ('75', '75%'), ('90', '90%')]
+
+
+class TextAlignmentBlock(SharedChoiceBlock):
+    choices = [
+        ('left', 'Left'),
+        ('center', 'Center'),
+        ('right', 'Right'),
+    ]
+
+
+class ContentWidthBlock(SharedChoiceBlock):
+    choices = [
+        ('narrow', 'Narrow (600px)'),
+        ('medium', 'Medium (900px)'),
+        ('wide', 'Wide (1200px)'),
+        ('full', 'Full Width'),
+    ]
+
+
+class HeroBannerBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Advanced Hero Banner Block with multiple layout options and effects."""
     
     # Layout options
@@ -43,43 +151,25 @@ class HeroBannerBlock(blocks.StructBlock):
     # CTA buttons
     cta_primary = CharBlock(required=False, max_length=150, help_text='Primary CTA text.')
     cta_primary_link = URLBlock(required=False, help_text='Primary CTA link.')
-    cta_primary_style = ChoiceBlock(
-        choices=[
-            ('primary', 'Primary'),
-            ('secondary', 'Secondary'),
-            ('outline', 'Outline'),
-            ('ghost', 'Ghost'),
-        ],
+    cta_primary_style = ButtonStyleBlock(
         default='primary',
         help_text='Primary CTA style.'
     )
     
     cta_secondary = CharBlock(required=False, max_length=150, help_text='Secondary CTA text.')
     cta_secondary_link = URLBlock(required=False, help_text='Secondary CTA link.')
-    cta_secondary_style = ChoiceBlock(
-        choices=[
-            ('primary', 'Primary'),
-            ('secondary', 'Secondary'),
-            ('outline', 'Outline'),
-            ('ghost', 'Ghost'),
-        ],
+    cta_secondary_style = ButtonStyleBlock(
         default='outline',
         help_text='Secondary CTA style.'
     )
 
     # Visual effects
-    overlay_opacity = ChoiceBlock(
-        choices=[('0', '0%'), ('25', '25%'), ('50', '50%'), ('75', '75%'), ('90', '90%')],
+    overlay_opacity = OverlayOpacityBlock(
         default='50',
         help_text='Overlay opacity for better readability.'
     )
     
-    text_alignment = ChoiceBlock(
-        choices=[
-            ('left', 'Left'),
-            ('center', 'Center'),
-            ('right', 'Right'),
-        ],
+    text_alignment = TextAlignmentBlock(
         default='center',
         help_text='Text alignment within the hero banner.'
     )
@@ -107,13 +197,7 @@ class HeroBannerBlock(blocks.StructBlock):
     # Advanced options
     enable_parallax = BooleanBlock(required=False, default=False, help_text='Enable parallax effect for background.')
     enable_particles = BooleanBlock(required=False, default=False, help_text='Enable particle background effect.')
-    content_width = ChoiceBlock(
-        choices=[
-            ('narrow', 'Narrow (600px)'),
-            ('medium', 'Medium (900px)'),
-            ('wide', 'Wide (1200px)'),
-            ('full', 'Full Width'),
-        ],
+    content_width = ContentWidthBlock(
         default='medium',
         help_text='Content container width.'
     )
@@ -121,7 +205,7 @@ class HeroBannerBlock(blocks.StructBlock):
     padding_top = IntegerBlock(required=False, min_value=0, max_value=200, help_text='Top padding in pixels.')
     padding_bottom = IntegerBlock(required=False, min_value=0, max_value=200, help_text='Bottom padding in pixels.')
 
-class HeroCarouselBlock(blocks.StructBlock):
+class HeroCarouselBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Hero Carousel Block for rotating multiple hero messages or announcements.
     
     Features smooth fade transitions, dynamic responsive design, and up to 5 slides.
@@ -194,13 +278,7 @@ class HeroCarouselBlock(blocks.StructBlock):
             # CTA button
             ('cta_text', CharBlock(required=False, max_length=50, help_text='CTA button text.')),
             ('cta_link', URLBlock(required=False, help_text='CTA button link.')),
-            ('cta_style', ChoiceBlock(
-                choices=[
-                    ('primary', 'Primary'),
-                    ('secondary', 'Secondary'),
-                    ('outline', 'Outline'),
-                    ('ghost', 'Ghost'),
-                ],
+            ('cta_style', ButtonStyleBlock(
                 default='primary',
                 help_text='CTA button style.'
             )),
@@ -211,18 +289,12 @@ class HeroCarouselBlock(blocks.StructBlock):
     )
     
     # Visual effects
-    overlay_opacity = ChoiceBlock(
-        choices=[('0', '0%'), ('25', '25%'), ('50', '50%'), ('75', '75%'), ('90', '90%')],
+    overlay_opacity = OverlayOpacityBlock(
         default='50',
         help_text='Overlay opacity for better readability.'
     )
     
-    text_alignment = ChoiceBlock(
-        choices=[
-            ('left', 'Left'),
-            ('center', 'Center'),
-            ('right', 'Right'),
-        ],
+    text_alignment = TextAlignmentBlock(
         default='center',
         help_text='Text alignment within slides.'
     )
@@ -239,13 +311,7 @@ class HeroCarouselBlock(blocks.StructBlock):
     
     # Advanced options
     enable_parallax = BooleanBlock(required=False, default=False, help_text='Enable parallax effect for background images.')
-    content_width = ChoiceBlock(
-        choices=[
-            ('narrow', 'Narrow (600px)'),
-            ('medium', 'Medium (900px)'),
-            ('wide', 'Wide (1200px)'),
-            ('full', 'Full Width'),
-        ],
+    content_width = ContentWidthBlock(
         default='medium',
         help_text='Content container width.'
     )
@@ -253,7 +319,7 @@ class HeroCarouselBlock(blocks.StructBlock):
     padding_top = IntegerBlock(required=False, min_value=0, max_value=200, help_text='Top padding in pixels.')
     padding_bottom = IntegerBlock(required=False, min_value=0, max_value=200, help_text='Bottom padding in pixels.')
 
-class FeatureBlock(blocks.StructBlock):
+class FeatureBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Feature block for showcasing services or products."""
     
     icon = ImageChooserBlock(required=False, help_text='Icon for the feature.')
@@ -262,7 +328,7 @@ class FeatureBlock(blocks.StructBlock):
     link = URLBlock(required=False, help_text='Optional link for the feature.')
 
 
-class TestimonialBlock(blocks.StructBlock):
+class TestimonialBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Testimonial block for customer reviews."""
     
     quote = TextBlock(required=True, max_length=500, help_text='Customer testimonial.')
@@ -283,7 +349,7 @@ class TestimonialBlock(blocks.StructBlock):
     )
 
 
-class StatsBlock(blocks.StructBlock):
+class StatsBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Statistics block for displaying key metrics."""
     
     stat = blocks.ListBlock(
@@ -298,7 +364,7 @@ class StatsBlock(blocks.StructBlock):
     )
 
 
-class CTASectionBlock(blocks.StructBlock):
+class CTASectionBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Call to action section block."""
     
     title = CharBlock(required=True, max_length=150, help_text='Section title.')
@@ -316,7 +382,7 @@ class CTASectionBlock(blocks.StructBlock):
     )
     background_color = CharBlock(required=False, max_length=7, help_text='Background color in hex format.')
 
-class ThemeSelectorBlock(blocks.StructBlock):
+class ThemeSelectorBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Advanced Theme Selector Block with comprehensive theme management and customization options.
     
     This block provides content editors with powerful theme control capabilities,
@@ -499,7 +565,7 @@ class ThemeSelectorBlock(blocks.StructBlock):
         help_text='Style of focus outlines for keyboard navigation.'
     )
 
-class HeroVideoBackgroundBlock(blocks.StructBlock):
+class HeroVideoBackgroundBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Full-screen hero with autoplay tech-themed video background.
     
     Features overlay gradient, headline, subtitle, and CTA buttons.
@@ -568,13 +634,7 @@ class HeroVideoBackgroundBlock(blocks.StructBlock):
         help_text='Primary CTA link.'
     )
     
-    cta_primary_style = ChoiceBlock(
-        choices=[
-            ('primary', 'Primary'),
-            ('secondary', 'Secondary'),
-            ('outline', 'Outline'),
-            ('ghost', 'Ghost'),
-        ],
+    cta_primary_style = ButtonStyleBlock(
         default='primary',
         help_text='Primary CTA style.'
     )
@@ -590,24 +650,13 @@ class HeroVideoBackgroundBlock(blocks.StructBlock):
         help_text='Secondary CTA link.'
     )
     
-    cta_secondary_style = ChoiceBlock(
-        choices=[
-            ('primary', 'Primary'),
-            ('secondary', 'Secondary'),
-            ('outline', 'Outline'),
-            ('ghost', 'Ghost'),
-        ],
+    cta_secondary_style = ButtonStyleBlock(
         default='outline',
         help_text='Secondary CTA style.'
     )
     
     # Display options
-    content_alignment = ChoiceBlock(
-        choices=[
-            ('left', 'Left'),
-            ('center', 'Center'),
-            ('right', 'Right'),
-        ],
+    content_alignment = TextAlignmentBlock(
         default='center',
         help_text='Content alignment within the hero section.'
     )
@@ -622,13 +671,7 @@ class HeroVideoBackgroundBlock(blocks.StructBlock):
         help_text='Vertical position of content within the hero section.'
     )
     
-    content_width = ChoiceBlock(
-        choices=[
-            ('narrow', 'Narrow (600px)'),
-            ('medium', 'Medium (900px)'),
-            ('wide', 'Wide (1200px)'),
-            ('full', 'Full Width'),
-        ],
+    content_width = ContentWidthBlock(
         default='medium',
         help_text='Content container width.'
     )
@@ -672,7 +715,7 @@ class HeroVideoBackgroundBlock(blocks.StructBlock):
         help_text='Animation for the content.'
     )
 
-class ServiceCardBlock(blocks.StructBlock):
+class ServiceCardBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Modular service card for IT consulting firm with icon, title, description, and hover animation.
     
     Features a clean, responsive, and professional design with customizable hover effects.
@@ -746,7 +789,7 @@ class ServiceCardBlock(blocks.StructBlock):
         help_text='Custom text color in hex format (e.g., #212529).'
     )
 
-class ServiceCardsBlock(blocks.StructBlock):
+class ServiceCardsBlock(CompactStructMixin, TimedRenderMixin, blocks.StructBlock):
     """Container block for multiple service cards with layout options."""
     
     heading = CharBlock(
@@ -781,12 +824,7 @@ class ServiceCardsBlock(blocks.StructBlock):
     )
     
     # Alignment
-    text_alignment = ChoiceBlock(
-        choices=[
-            ('left', 'Left'),
-            ('center', 'Center'),
-            ('right', 'Right'),
-        ],
+    text_alignment = TextAlignmentBlock(
         default='center',
         help_text='Text alignment for heading and description.'
     )
@@ -0,0 +1,102 @@
+"""
+JSON slide feed for hero carousels.
+
+``hero-carousel.js`` can refresh a carousel from its ``ajax_url``, which is
+expected to return ``{"slides": [...]}`` with the fields read by
+``createSlideElement()``. ``get_slides_payload()`` builds that for one
+``HeroCarouselBlock`` of a live page, with a rendition URL per width in
+``SLIDE_RENDITION_WIDTHS`` so the script can pick one for the viewport.
+
+Payloads are cached per page, live revision, block and image version (see
+``home.stream_cache``), and the same values make up the feed's ETag, so a
+publish or an image change gives a new payload and ETag. The images' ids are
+cached with the payload, for the feed's ``Surrogate-Key`` header.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.utils.html import escape
+
+from home.stream_cache import get_cache, get_stream_value, get_version
+
+# 16:9 renditions, matching the fill-1920x1080 the block template uses.
+SLIDE_RENDITION_WIDTHS = (640, 1280, 1920)
+
+
+def rendition_filters():
+    return ["fill-%dx%d" % (width, width * 9 // 16) for width in SLIDE_RENDITION_WIDTHS]
+
+
+def get_carousel_block(page, block_id):
+    """Return the page's ``hero_carousel`` block with this id, or ``None``."""
+    for block in get_stream_value(page, "content"):
+        if block.id == block_id and block.block_type == "hero_carousel":
+            return block
+    return None
+
+
+def feed_version(page, block_id):
+    return "%s:%s:%s:%s:%s" % (
+        getattr(settings, "PAGE_CACHE_VERSION", ""),
+        page.pk,
+        page.live_revision_id,
+        block_id,
+        get_version(),
+    )
+
+
+def feed_etag(page, block_id):
+    return '"%s"' % hashlib.md5(feed_version(page, block_id).encode()).hexdigest()
+
+
+def slide_data(carousel, slide_id, slide, index):
+    """The slide's fields for ``createSlideElement()``; text is escaped, as
+    the script inserts it as HTML."""
+    background_images = {}
+    image = slide["background_image"]
+    if image is not None:
+        renditions = image.get_renditions(*rendition_filters())
+        background_images = {
+            str(width): renditions[spec].url for width, spec in zip(SLIDE_RENDITION_WIDTHS, rendition_filters())
+        }
+    description = slide["description"]
+    return {
+        "id": slide_id or index,
+        "index": index,
+        "backgroundImage": background_images.get(str(SLIDE_RENDITION_WIDTHS[-1]), ""),
+        "backgroundImages": background_images,
+        "backgroundColor": slide["background_color"] or "",
+        "overlayOpacity": int(carousel["overlay_opacity"] or 0) / 100,
+        "textAlignment": carousel["text_alignment"],
+        "headline": escape(slide["headline"] or ""),
+        "subtitle": escape(slide["subtitle"] or ""),
+        "description": str(description) if description else "",
+        "ctaText": escape(slide["cta_text"] or ""),
+        "ctaLink": escape(slide["cta_link"] or ""),
+        "ctaStyle": slide["cta_style"] or "primary",
+        "ctaId": slide_id or index,
+    }
+
+
+def get_slides_payload(page, block_id):
+    """
+    Return ``(payload, image_ids)`` for the page's carousel block
+    ``block_id``, with the ids of the images its slides use, or ``None`` if
+    there is no such block.
+    """
+    cache = get_cache()
+    key = "carouselfeed:%s" % feed_version(page, block_id)
+    feed = cache.get(key)
+    if feed is None:
+        block = get_carousel_block(page, block_id)
+        if block is None:
+            return None
+        carousel = block.value
+        slides = carousel["slides"].bound_blocks
+        feed = (
+            {"slides": [slide_data(carousel, child.id, child.value, index) for index, child in enumerate(slides)]},
+            sorted({child.value["background_image"].pk for child in slides if child.value["background_image"]}),
+        )
+        cache.set(key, feed, getattr(settings, "STREAMFIELD_CACHE_TIMEOUT", 3600))
+    return feed
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_stream_cache_shared(app_configs, **kwargs):
+    """The StreamField cache is invalidated by the process handling an edit,
+    so a per-process cache leaves the other workers serving stale values."""
+    alias = getattr(settings, "STREAMFIELD_CACHE_ALIAS", "default")
+    if isinstance(caches[alias], LocMemCache):
+        return [
+            Warning(
+                "STREAMFIELD_CACHE_ALIAS (%r) is a per-process local-memory cache." % alias,
+                hint="Use a cache shared by all worker processes, such as a file-based or Redis cache.",
+                id="home.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,297 @@
+"""
+Synthetic content for load testing.
+
+``generate_content`` creates placeholder images, settings snippets and a tree
+of ``HomePage`` instances with randomized ``content`` built from the
+``home.sample_content`` builders. Pages are laid out as sections under a
+parent page, each with up to ``fanout`` children, and are written with bulk
+inserts: treebeard paths, ``url_path`` and ``numchild`` are computed up front
+instead of calling ``add_child`` (several queries and a tree lock per page).
+
+Bulk inserts skip signals, so no revisions, search index entries or CDN
+purges are created; run ``update_index`` afterwards if search is needed.
+
+Use the ``generate_content`` management command to run it.
+"""
+
+import math
+import random
+import uuid
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from wagtail import blocks
+from wagtail.models import Page
+
+from home import sample_content
+from home.blocks import compact_stream_data
+from home.models import CarouselSettings, HomePage, ThemeSettings, VideoBackgroundSettings
+
+BLOCK_BUILDERS = {
+    "hero_banner": lambda rng, image_ids: sample_content.hero_banner(pick(rng, image_ids)),
+    "hero_carousel": lambda rng, image_ids: sample_content.hero_carousel(
+        image_ids, slide_count=rng.randint(1, 5)
+    ),
+    "hero_video_background": lambda rng, image_ids: sample_content.hero_video_background(
+        pick(rng, image_ids)
+    ),
+    "service_card": lambda rng, image_ids: sample_content.service_card(pick(rng, image_ids)),
+    "service_cards": lambda rng, image_ids: sample_content.service_cards(
+        image_ids, card_count=rng.randint(1, 12)
+    ),
+    "features": lambda rng, image_ids: sample_content.features(pick(rng, image_ids)),
+    "testimonials": lambda rng, image_ids: sample_content.testimonials(pick(rng, image_ids)),
+    "stats": lambda rng, image_ids: sample_content.stats(rng.randint(1, 6)),
+    "cta_section": lambda rng, image_ids: sample_content.cta_section(),
+    "theme_selector": lambda rng, image_ids: sample_content.theme_selector(),
+}
+
+
+def pick(rng, values):
+    return rng.choice(values) if values else None
+
+
+def random_color(rng):
+    return "#%06x" % rng.randrange(0x1000000)
+
+
+def randomize_choices(block, value, rng):
+    """Return a copy of a raw block value with every ``ChoiceBlock`` set to a
+    random (non-blank) choice."""
+    if isinstance(block, blocks.ChoiceBlock):
+        choices = [key for key, label in block.field.choices if key != ""]
+        return str(rng.choice(choices)) if choices else value
+    if isinstance(block, blocks.StreamBlock):
+        return [
+            {**item, "value": randomize_choices(block.child_blocks[item["type"]], item["value"], rng)}
+            for item in value
+        ]
+    if isinstance(block, blocks.StructBlock):
+        return {
+            name: randomize_choices(block.child_blocks[name], child_value, rng)
+            if name in block.child_blocks else child_value
+            for name, child_value in value.items()
+        }
+    if isinstance(block, blocks.ListBlock):
+        return [
+            {**item, "value": randomize_choices(block.child_block, item["value"], rng)}
+            for item in value
+        ]
+    return value
+
+
+def random_content(rng, image_ids, block_types=None):
+    """
+    Random ``HomePage.content`` raw data. Without ``block_types``, a random
+    sample of three or more distinct block types is used, in random order.
+    """
+    if block_types is None:
+        block_types = rng.sample(sorted(BLOCK_BUILDERS), rng.randint(3, len(BLOCK_BUILDERS)))
+    stream_block = HomePage._meta.get_field("content").stream_block
+    # Stored the way the blocks save it, without default values.
+    return compact_stream_data(stream_block, randomize_choices(
+        stream_block,
+        [BLOCK_BUILDERS[block_type](rng, image_ids) for block_type in block_types],
+        rng,
+    ))
+
+
+def random_settings_fields(model, rng):
+    """Random values for the fields of a settings snippet that have choices."""
+    return {
+        field.name: rng.choice(field.choices)[0]
+        for field in model._meta.concrete_fields
+        if field.choices
+    }
+
+
+def create_images(count, rng, width=640, height=360):
+    return [
+        sample_content.create_placeholder_image(
+            "Generated image %d" % (i + 1),
+            width=width,
+            height=height,
+            color=rng.choice(sample_content.PLACEHOLDER_COLORS),
+        )
+        for i in range(count)
+    ]
+
+
+def create_settings(tag, rng, image_ids, themes=0, carousels=0, video_backgrounds=0):
+    """Bulk-create inactive settings snippets with random values."""
+    ThemeSettings.objects.bulk_create(
+        ThemeSettings(
+            name="Generated theme %s-%d" % (tag, i + 1),
+            primary_color=random_color(rng),
+            secondary_color=random_color(rng),
+            background_color=random_color(rng),
+            surface_color=random_color(rng),
+            text_color=random_color(rng),
+            text_secondary_color=random_color(rng),
+            border_color=random_color(rng),
+            **random_settings_fields(ThemeSettings, rng),
+        )
+        for i in range(themes)
+    )
+    CarouselSettings.objects.bulk_create(
+        CarouselSettings(
+            name="Generated carousel %s-%d" % (tag, i + 1),
+            **random_settings_fields(CarouselSettings, rng),
+        )
+        for i in range(carousels)
+    )
+    VideoBackgroundSettings.objects.bulk_create(
+        VideoBackgroundSettings(
+            name="Generated video background %s-%d" % (tag, i + 1),
+            background_video="https://example.com/media/hero-%d.mp4" % (i + 1),
+            fallback_image_id=pick(rng, image_ids),
+            **random_settings_fields(VideoBackgroundSettings, rng),
+        )
+        for i in range(video_backgrounds)
+    )
+
+
+def plan_tree(count, fanout):
+    """
+    Split ``count`` pages into sections of one section page plus up to
+    ``fanout`` children. Returns the number of children of each section.
+    """
+    sections = math.ceil(count / (fanout + 1))
+    children = count - sections
+    return [min(fanout, max(children - i * fanout, 0)) for i in range(sections)]
+
+
+class PageTreeWriter:
+    """
+    Bulk-inserts ``HomePage`` instances, computing their treebeard position
+    (``path``, ``depth``) from the parent's instead of locking the tree for
+    each page.
+    """
+
+    def __init__(self, tag, rng, image_ids, batch_size=1000):
+        self.tag = tag
+        self.rng = rng
+        self.image_ids = image_ids
+        self.batch_size = batch_size
+        self.content_type = ContentType.objects.get_for_model(HomePage)
+        self.now = timezone.now()
+        self.created = 0
+        self.pending = []
+
+    def next_step(self, parent):
+        last_child = parent.get_last_child()
+        return last_child._get_lastpos_in_path() + 1 if last_child else 1
+
+    def build(self, parent, step, numchild=0):
+        """Build an unsaved page as the ``step``-th child of ``parent``."""
+        self.created += 1
+        title = "Load test page %s-%d" % (self.tag, self.created)
+        slug = "load-%s-%d" % (self.tag, self.created)
+        content = (
+            # The first page uses every block type, so all of them are covered
+            # however few pages are generated.
+            random_content(self.rng, self.image_ids, sorted(BLOCK_BUILDERS))
+            if self.created == 1
+            else random_content(self.rng, self.image_ids)
+        )
+        return HomePage(
+            title=title,
+            draft_title=title,
+            slug=slug,
+            path=Page._get_path(parent.path, parent.depth + 1, step),
+            depth=parent.depth + 1,
+            numchild=numchild,
+            url_path="%s%s/" % (parent.url_path, slug),
+            content_type=self.content_type,
+            locale_id=parent.locale_id,
+            translation_key=uuid.uuid4(),
+            live=True,
+            has_unpublished_changes=False,
+            first_published_at=self.now,
+            last_published_at=self.now,
+            search_description=sample_content.LOREM,
+            banner_title=title,
+            banner_subtitle=sample_content.LOREM,
+            content=content,
+        )
+
+    def add(self, page):
+        self.pending.append(page)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        pages, self.pending = self.pending, []
+        if not pages:
+            return
+
+        parent_fields = [field.attname for field in Page._meta.concrete_fields if not field.primary_key]
+        rows = Page.objects.bulk_create(
+            [Page(**{name: getattr(page, name) for name in parent_fields}) for page in pages],
+            batch_size=self.batch_size,
+        )
+        if any(row.pk is None for row in rows):
+            # Backends that can't return ids from bulk inserts (MySQL).
+            ids = dict(
+                Page.objects.filter(path__in=[row.path for row in rows]).values_list("path", "pk")
+            )
+            for row in rows:
+                row.pk = ids[row.path]
+        for page, row in zip(pages, rows):
+            page.pk = page.page_ptr_id = row.pk
+
+        # Model.objects.bulk_create() refuses multi-table inheritance, so the
+        # HomePage rows are inserted directly.
+        fields = HomePage._meta.local_concrete_fields
+        batch_size = max(min(self.batch_size, connection.ops.bulk_batch_size(fields, pages)), 1)
+        for start in range(0, len(pages), batch_size):
+            HomePage._base_manager._insert(pages[start:start + batch_size], fields=fields, raw=True)
+
+    def write_tree(self, parent, count, fanout):
+        """Create ``count`` pages under ``parent``, ``fanout`` per section."""
+        plan = plan_tree(count, fanout)
+        first_step = self.next_step(parent)
+        sections = []
+        for i, children in enumerate(plan):
+            section = self.build(parent, first_step + i, numchild=children)
+            sections.append(section)
+            self.add(section)
+        for section, children in zip(sections, plan):
+            for step in range(1, children + 1):
+                self.add(self.build(section, step))
+        self.flush()
+        Page.objects.filter(pk=parent.pk).update(numchild=F("numchild") + len(plan))
+
+
+def generate_content(
+    parent,
+    count,
+    fanout=50,
+    images=10,
+    themes=3,
+    carousels=3,
+    video_backgrounds=3,
+    seed=None,
+    batch_size=1000,
+):
+    """Generate ``count`` pages under ``parent``; returns a summary dict."""
+    rng = random.Random(seed)
+    tag = "%06x" % rng.randrange(0x1000000)
+    with transaction.atomic():
+        image_ids = [image.pk for image in create_images(images, rng)]
+        create_settings(
+            tag, rng, image_ids, themes=themes, carousels=carousels, video_backgrounds=video_backgrounds
+        )
+        writer = PageTreeWriter(tag, rng, image_ids, batch_size=batch_size)
+        writer.write_tree(parent, count, fanout)
+    return {
+        "tag": tag,
+        "pages": writer.created,
+        "sections": len(plan_tree(count, fanout)) if count else 0,
+        "images": len(image_ids),
+        "themes": themes,
+        "carousels": carousels,
+        "video_backgrounds": video_backgrounds,
+    }
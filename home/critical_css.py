@@ -0,0 +1,166 @@
+"""
+Critical CSS for above-the-fold StreamField blocks.
+
+The hero blocks are almost always the first block in ``HomePage.content``.
+Their first-paint styles are extracted from the block's stylesheets, inlined
+into ``<head>`` by the ``{% critical_css %}`` tag, and the full stylesheets
+are then loaded without blocking render (see ``{% static_bundle %}``).
+
+Extracted CSS is cached per block type, keyed on the stylesheets' static URLs
+so that a deploy with changed (re-hashed) stylesheets gets fresh CSS.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.templatetags.static import static
+
+from it_consulting.bundles import minify_css
+
+# Stylesheets holding the above-the-fold styles of each block type.
+CRITICAL_CSS_STYLESHEETS = {
+    "hero_banner": ["css/hero-banner.css"],
+    "hero_carousel": ["css/hero-carousel.css"],
+    "hero_video_background": ["css/hero-video-background.css"],
+}
+
+# Rules only matching these states cannot affect the first paint.
+NON_CRITICAL_PSEUDO_CLASSES = (":hover", ":focus", ":active", ":visited")
+
+# Markup injected after user interaction (AJAX feedback boxes).
+NON_CRITICAL_SELECTORS = (".ajax-response", ".ajax-success", ".ajax-error", ".response-box")
+
+NON_CRITICAL_AT_RULES = ("@keyframes", "@-webkit-keyframes", "@media print")
+
+CACHE_KEY_PREFIX = "home:critical-css:"
+
+
+def _split_top_level(text, separator):
+    """Split ``text`` on ``separator`` outside of parentheses and strings."""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for index, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parse_rules(css, index=0):
+    """
+    Parse minified CSS into a list of ``(prelude, body)`` pairs.
+
+    ``body`` is a string of declarations for style rules and a nested list
+    for grouping at-rules such as ``@media``. Statement at-rules (``@import``)
+    have a ``None`` body. Returns ``(rules, end_index)``.
+    """
+    rules = []
+    start = index
+    quote = None
+    while index < len(css):
+        char = css[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == ";" and css[start:index].lstrip().startswith("@"):
+            rules.append((css[start:index].strip(), None))
+            start = index + 1
+        elif char == "{":
+            prelude = css[start:index].strip()
+            if prelude.startswith("@") and not prelude.startswith("@font-face"):
+                body, index = parse_rules(css, index + 1)
+            else:
+                end = css.index("}", index)
+                body, index = css[index + 1:end], end + 1
+            rules.append((prelude, body))
+            start = index
+            continue
+        elif char == "}":
+            return rules, index + 1
+        index += 1
+    return rules, index
+
+
+def _is_critical_selector(selector):
+    if any(pseudo in selector for pseudo in NON_CRITICAL_PSEUDO_CLASSES):
+        return False
+    return not selector.strip().startswith(NON_CRITICAL_SELECTORS)
+
+
+def serialize_critical_rules(rules):
+    output = []
+    for prelude, body in rules:
+        if body is None or prelude.startswith(NON_CRITICAL_AT_RULES):
+            continue
+        if isinstance(body, list):
+            inner = serialize_critical_rules(body)
+            if inner:
+                output.append("%s{%s}" % (prelude, inner))
+            continue
+        selectors = [
+            selector
+            for selector in _split_top_level(prelude, ",")
+            if _is_critical_selector(selector)
+        ]
+        if selectors:
+            output.append("%s{%s}" % (",".join(selectors), body))
+    return "".join(output)
+
+
+def extract_critical_css(stylesheets):
+    """Return the minified first-paint rules of the given static paths."""
+    output = []
+    for path in stylesheets:
+        absolute_path = finders.find(path)
+        if not absolute_path:
+            continue
+        with open(absolute_path, encoding="utf-8") as f:
+            css, _ = minify_css(f.read())
+        rules, _ = parse_rules(css)
+        output.append(serialize_critical_rules(rules))
+    return "".join(output)
+
+
+def get_critical_css(block_type):
+    """Return the cached critical CSS for a StreamField block type, or ''."""
+    stylesheets = CRITICAL_CSS_STYLESHEETS.get(block_type)
+    if not stylesheets:
+        return ""
+
+    version = hashlib.md5(
+        "|".join(static(path) for path in stylesheets).encode()
+    ).hexdigest()
+    key = "%s%s:%s" % (CACHE_KEY_PREFIX, block_type, version)
+    css = cache.get(key)
+    if css is None:
+        css = extract_critical_css(stylesheets)
+        cache.set(key, css, getattr(settings, "CRITICAL_CSS_CACHE_TIMEOUT", None))
+    return css
+
+
+def get_first_block_type(page):
+    """Return the type of the first block in ``page.content`` without
+    deserializing the stream."""
+    content = getattr(page, "content", None)
+    if content is None:
+        return None
+    raw_data = content.raw_data
+    if not len(raw_data):
+        return None
+    return raw_data[0]["type"]
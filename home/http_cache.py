@@ -0,0 +1,160 @@
+"""
+HTTP caching for Wagtail page responses.
+
+Pages served through Wagtail's catch-all route get an ``ETag`` and
+``Last-Modified`` computed from the page's live revision and the active
+settings snippets (the ETag also changes with the image and rich text
+versions, see ``home.stream_cache`` and ``home.rich_text``), plus a ``Surrogate-Key`` header listing everything the
+response depends on (page, settings snippets and images), so a CDN can purge
+exactly the responses affected by an edit.
+
+Conditional requests are answered with a 304 before the page is rendered;
+see the ``on_serve_page`` hook in ``home.wagtail_hooks``.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from home import rich_text, stream_cache
+from home.models import CarouselSettings, ThemeSettings, VideoBackgroundSettings
+from home.streamfield import get_image_ids
+from it_consulting.instrumentation import get_current_metrics
+
+# Snippets whose active instance affects how every page renders.
+ACTIVE_SETTINGS_MODELS = (ThemeSettings, CarouselSettings, VideoBackgroundSettings)
+
+DEFAULT_PAGE_CACHE_CONTROL = {"public": True, "max_age": 0, "s_maxage": 86400}
+
+
+@dataclass
+class PageValidators:
+    etag: str
+    last_modified: datetime | None
+    surrogate_keys: list = field(default_factory=list)
+
+
+def page_surrogate_key(page_id):
+    return "page-%s" % page_id
+
+
+def image_surrogate_key(image_id):
+    return "image-%s" % image_id
+
+
+def settings_surrogate_keys(model, pk=None):
+    """Model-wide key (purged when the active instance changes) and the
+    instance key."""
+    keys = [model._meta.model_name]
+    if pk is not None:
+        keys.append("%s-%s" % (model._meta.model_name, pk))
+    return keys
+
+
+def get_active_settings():
+    """Return ``(model, pk, updated_at)`` for each active settings snippet."""
+    active = []
+    for model in ACTIVE_SETTINGS_MODELS:
+        row = (
+            model.objects.filter(is_active=True)
+            .order_by("-updated_at")
+            .values_list("pk", "updated_at")
+            .first()
+        )
+        active.append((model, *(row or (None, None))))
+    return active
+
+
+def get_page_validators(page):
+    """Compute the ETag, Last-Modified and surrogate keys for a live page."""
+    revision_id = page.live_revision_id or page.latest_revision_id
+    modified = [page.last_published_at or page.latest_revision_created_at]
+
+    fingerprint = [
+        getattr(settings, "PAGE_CACHE_VERSION", ""),
+        page.pk,
+        revision_id,
+        page.last_published_at,
+        # Bumped when images, or pages and documents linked from rich text,
+        # change, without the page being published.
+        stream_cache.get_version(),
+        rich_text.get_version(),
+    ]
+    surrogate_keys = [page_surrogate_key(page.pk)]
+
+    for model, pk, updated_at in get_active_settings():
+        fingerprint.append((model._meta.model_name, pk, updated_at))
+        modified.append(updated_at)
+        surrogate_keys.extend(settings_surrogate_keys(model, pk))
+
+    content = getattr(page, "content", None)
+    if content is not None:
+        surrogate_keys.extend(
+            image_surrogate_key(image_id) for image_id in sorted(get_image_ids(content))
+        )
+
+    etag = hashlib.md5(repr(fingerprint).encode()).hexdigest()
+    last_modified = max((value for value in modified if value is not None), default=None)
+    return PageValidators(etag, last_modified, surrogate_keys)
+
+
+def is_cacheable_request(request, page):
+    """Only anonymous GET/HEAD requests without a query string for unrestricted
+    pages are shared-cacheable."""
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if getattr(request, "is_preview", False):
+        return False
+    # The validators only cover the page, not what a query string may change.
+    if request.META.get("QUERY_STRING"):
+        return False
+    # Checking the cookie rather than request.user avoids a session lookup
+    # (and a Vary: Cookie header) on every anonymous request.
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+    return not page.get_view_restrictions().exists()
+
+
+def patch_page_cache_headers(response, validators):
+    response["ETag"] = '"%s"' % validators.etag
+    if validators.last_modified is not None:
+        response["Last-Modified"] = http_date(validators.last_modified.timestamp())
+    response["Surrogate-Key"] = " ".join(validators.surrogate_keys)
+    patch_cache_control(
+        response, **getattr(settings, "PAGE_CACHE_CONTROL", DEFAULT_PAGE_CACHE_CONTROL)
+    )
+
+
+def record_revalidation(request, response):
+    """Count conditional requests as hits (304) or misses of the ``http``
+    cache layer in the request metrics."""
+    metrics = get_current_metrics()
+    if metrics is not None and (
+        "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META
+    ):
+        hit = response is not None and response.status_code == 304
+        metrics.add_cache_lookups("http", int(hit), int(not hit))
+
+
+def serve_page_with_validators(serve_page, page, request, serve_args, serve_kwargs):
+    if not is_cacheable_request(request, page):
+        return serve_page(page, request, serve_args, serve_kwargs)
+
+    validators = get_page_validators(page)
+    last_modified = validators.last_modified
+    response = get_conditional_response(
+        request,
+        etag='"%s"' % validators.etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    record_revalidation(request, response)
+    if response is None:
+        response = serve_page(page, request, serve_args, serve_kwargs)
+        if response.status_code != 200:
+            return response
+    patch_page_cache_headers(response, validators)
+    return response
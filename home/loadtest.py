@@ -0,0 +1,303 @@
+"""
+HTTP load generation for the served site.
+
+``run_loadtest`` replays a weighted mix of requests (the site root, deep
+``HomePage`` children, searches and carousel tracking POSTs) with
+asyncio-driven concurrency and reports throughput, latency percentiles,
+error rate and a per-URL breakdown.
+
+Requests go either to the WSGI application in-process (``WSGITransport``,
+each request on a worker thread, so no server is needed) or over HTTP to a
+running server such as gunicorn (``HTTPTransport``). Use the ``loadtest``
+management command to run it; ``generate_content`` creates enough pages to
+make the deep URLs interesting.
+"""
+
+import asyncio
+import io
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+from wagtail.models import Site
+
+from home.models import HomePage
+
+DEFAULT_MIX = {"home": 40, "deep": 40, "search": 15, "track": 5}
+DEFAULT_SEARCH_QUERIES = ["consulting", "cloud", "security", "infrastructure"]
+
+
+@dataclass(frozen=True)
+class Target:
+    label: str
+    method: str
+    path: str
+    body: bytes = b""
+    content_type: str = ""
+
+
+@dataclass
+class Result:
+    target: Target
+    status: int
+    latency: float
+    error: str = ""
+
+    @property
+    def failed(self):
+        return bool(self.error) or self.status >= 400
+
+
+def parse_mix(value):
+    """Parse ``"home=40,deep=40,search=15,track=5"`` into a dict of weights."""
+    mix = {}
+    for item in filter(None, value.split(",")):
+        label, _, weight = item.partition("=")
+        if label not in DEFAULT_MIX:
+            raise ValueError("Unknown URL kind %r; expected one of %s." % (label, ", ".join(DEFAULT_MIX)))
+        mix[label] = int(weight)
+    return mix
+
+
+def site_path(page):
+    return urlsplit(page.get_url()).path
+
+
+def build_targets(mix=None, search_queries=None, deep_pages=20):
+    """Build the request targets for each kind in ``mix`` from the database."""
+    mix = DEFAULT_MIX if mix is None else mix
+    search_queries = search_queries or DEFAULT_SEARCH_QUERIES
+    targets = {}
+
+    if mix.get("home"):
+        targets["home"] = [Target("home", "GET", "/")]
+    if mix.get("deep"):
+        pages = HomePage.objects.live().filter(depth__gt=2).order_by("-depth", "path")[:deep_pages]
+        targets["deep"] = [Target("deep", "GET", site_path(page)) for page in pages]
+    if mix.get("search"):
+        targets["search"] = [
+            Target("search", "GET", "%s?query=%s" % (reverse("search"), query)) for query in search_queries
+        ]
+    if mix.get("track"):
+        targets["track"] = [
+            Target(
+                "track",
+                "POST",
+                reverse("carousel_track"),
+                json.dumps({"action": action, "slideIndex": index, "slideId": index}).encode(),
+                "application/json",
+            )
+            for action in ("view", "click")
+            for index in range(5)
+        ]
+    return {label: targets[label] for label in targets if targets[label]}
+
+
+def request_schedule(targets, mix, count, rng):
+    """Pick ``count`` targets, weighted by kind and uniformly within a kind."""
+    labels = [label for label in targets if mix.get(label)]
+    weights = [mix[label] for label in labels]
+    return [rng.choice(targets[label]) for label in rng.choices(labels, weights, k=count)]
+
+
+class WSGITransport:
+    """Calls the WSGI application directly, one worker thread per concurrent request."""
+
+    def __init__(self, concurrency, host="localhost", application=None):
+        self.application = application or get_wsgi_application()
+        self.host = host
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadtest")
+
+    def environ(self, target):
+        path, _, query = target.path.partition("?")
+        return {
+            "REQUEST_METHOD": target.method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SCRIPT_NAME": "",
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": self.host,
+            "REMOTE_ADDR": "127.0.0.1",
+            "CONTENT_TYPE": target.content_type,
+            "CONTENT_LENGTH": str(len(target.body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(target.body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+
+    def call(self, target):
+        status = []
+        response = self.application(
+            self.environ(target), lambda status_line, headers, exc_info=None: status.append(status_line)
+        )
+        try:
+            for _ in response:
+                pass
+        finally:
+            # Fires request_finished, which closes the thread's DB connection.
+            response.close()
+        return int(status[0].split(" ", 1)[0])
+
+    async def request(self, target):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.call, target)
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class HTTPTransport:
+    """Minimal asyncio HTTP/1.1 client, one connection per request."""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        if parts.scheme != "http":
+            raise ValueError("Only http:// URLs are supported.")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+
+    async def request(self, target):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        try:
+            headers = [
+                "%s %s%s HTTP/1.1" % (target.method, self.prefix, target.path),
+                "Host: %s:%s" % (self.host, self.port),
+                "Connection: close",
+                "Content-Length: %d" % len(target.body),
+            ]
+            if target.content_type:
+                headers.append("Content-Type: %s" % target.content_type)
+            writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + target.body)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+            # Read the full response, so latency includes the body transfer.
+            await asyncio.wait_for(reader.read(), self.timeout)
+        finally:
+            writer.close()
+        return int(status_line.split()[1])
+
+    def close(self):
+        pass
+
+
+async def run_requests(transport, schedule, concurrency):
+    """Send the scheduled requests with at most ``concurrency`` in flight."""
+    queue = iter(schedule)
+    results = []
+
+    async def worker():
+        for target in queue:
+            start = time.perf_counter()
+            try:
+                status = await transport.request(target)
+                error = ""
+            except Exception as e:
+                status, error = 0, "%s: %s" % (type(e).__name__, e)
+            results.append(Result(target, status, time.perf_counter() - start, error))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(results, elapsed=None):
+    latencies = sorted(result.latency * 1000 for result in results)
+    errors = sum(result.failed for result in results)
+    summary = {
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+    }
+    if elapsed is not None:
+        summary["rps"] = round(len(results) / elapsed, 2) if elapsed else 0.0
+    return summary
+
+
+def build_report(results, elapsed):
+    by_url = {}
+    for result in results:
+        by_url.setdefault("%s %s" % (result.target.method, result.target.path), []).append(result)
+
+    report = summarize(results, elapsed)
+    report["duration_s"] = round(elapsed, 3)
+    report["statuses"] = {}
+    for result in results:
+        key = str(result.status) if not result.error else "exception"
+        report["statuses"][key] = report["statuses"].get(key, 0) + 1
+    report["urls"] = {url: summarize(url_results) for url, url_results in sorted(by_url.items())}
+    report["sample_errors"] = sorted({result.error for result in results if result.error})[:5]
+    return report
+
+
+def run_loadtest(
+    transport,
+    requests=1000,
+    concurrency=10,
+    warmup=0,
+    mix=None,
+    search_queries=None,
+    deep_pages=20,
+    seed=None,
+):
+    mix = DEFAULT_MIX if mix is None else mix
+    targets = build_targets(mix, search_queries=search_queries, deep_pages=deep_pages)
+    if not targets:
+        raise ValueError("The URL mix selects no requests.")
+    rng = random.Random(seed)
+
+    async def main():
+        if warmup:
+            await run_requests(transport, request_schedule(targets, mix, warmup, rng), concurrency)
+        schedule = request_schedule(targets, mix, requests, rng)
+        start = time.perf_counter()
+        results = await run_requests(transport, schedule, concurrency)
+        return results, time.perf_counter() - start
+
+    try:
+        results, elapsed = asyncio.run(main())
+    finally:
+        transport.close()
+
+    report = build_report(results, elapsed)
+    report["meta"] = {
+        "concurrency": concurrency,
+        "warmup": warmup,
+        "mix": {label: mix[label] for label in targets},
+        "targets": {label: len(label_targets) for label, label_targets in targets.items()},
+        "seed": seed,
+    }
+    return report
+
+
+def default_host():
+    site = Site.objects.filter(is_default_site=True).first()
+    return site.hostname if site else "localhost"
@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from home.benchmarks import run_editor_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the HomePage editor on a worst-case page and report the size "
+        "and packing time of the content block definitions and the edit view's "
+        "response size and render time as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Timed runs per measurement.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed runs before measuring.")
+        parser.add_argument("--images", type=int, default=5, help="Placeholder images to attach.")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        results = run_editor_benchmarks(
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            image_count=options["images"],
+        )
+        report = json.dumps(results, indent=2, sort_keys=True)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(report + "\n")
+            self.stdout.write(
+                "Block definitions %d bytes, edit view median %.2f ms. Report written to %s"
+                % (
+                    results["definitions"]["bytes"],
+                    results["edit_view"]["time_ms"]["median"],
+                    options["output"],
+                )
+            )
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from home.benchmarks import run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark HomePage rendering on a worst-case page and report render "
+        "time, query count and allocated memory per block type as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Timed runs per measurement.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed runs before measuring.")
+        parser.add_argument("--images", type=int, default=5, help="Placeholder images to attach.")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        results = run_benchmarks(
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            image_count=options["images"],
+        )
+        report = json.dumps(results, indent=2, sort_keys=True)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(report + "\n")
+            self.stdout.write(
+                "Page render median %.2f ms, %d queries. Report written to %s"
+                % (results["page"]["time_ms"]["median"], results["page"]["queries"], options["output"])
+            )
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,133 @@
+import json
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from wagtail.fields import StreamField
+from wagtail.models import Revision
+
+from home.blocks import compact_stream_data
+from home.revisions import compress_content, decompress_content, is_compressed
+
+
+def stream_fields(model):
+    return [field for field in model._meta.local_concrete_fields if isinstance(field, StreamField)]
+
+
+def json_size(data):
+    return len(json.dumps(data))
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite StreamField content and revisions without the block values "
+        "that are equal to their defaults (see home.blocks.CompactStructMixin), "
+        "and report the bytes saved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report the savings without writing.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per bulk update.")
+        parser.add_argument("--skip-revisions", action="store_true", help="Only rewrite the live content.")
+
+    def handle(self, *args, **options):
+        self.dry_run = options["dry_run"]
+        self.batch_size = options["batch_size"]
+        for model in apps.get_models():
+            fields = stream_fields(model)
+            if not fields:
+                continue
+            self.report(model._meta.label, self.compact_objects(model, fields))
+            if not options["skip_revisions"]:
+                self.report("%s revisions" % model._meta.label, self.compact_revisions(model, fields))
+
+    def report(self, label, stats):
+        rows, changed, before, after = stats
+        self.stdout.write(
+            "%s: %s %d of %d rows, %d -> %d bytes (%d saved, %.1f%%)."
+            % (
+                label,
+                "would rewrite" if self.dry_run else "rewrote",
+                changed,
+                rows,
+                before,
+                after,
+                before - after,
+                (before - after) * 100 / before if before else 0,
+            )
+        )
+
+    def compact_objects(self, model, fields):
+        names = [field.name for field in fields]
+        rows = changed = before = after = 0
+        batch = []
+        queryset = model._base_manager.only("pk", *names).order_by("pk")
+        for obj in queryset.iterator(chunk_size=self.batch_size):
+            rows += 1
+            modified = False
+            for field in fields:
+                stream_data = list(getattr(obj, field.name).raw_data)
+                compacted = compact_stream_data(field.stream_block, stream_data)
+                before += json_size(stream_data)
+                after += json_size(compacted)
+                if compacted != stream_data:
+                    setattr(obj, field.name, compacted)
+                    modified = True
+            if modified:
+                changed += 1
+                batch.append(obj)
+            if len(batch) >= self.batch_size:
+                self.save(model, batch, names)
+                batch = []
+        self.save(model, batch, names)
+        return rows, changed, before, after
+
+    def compact_revisions(self, model, fields):
+        rows = changed = before = after = 0
+        batch = []
+        queryset = Revision.objects.filter(content_type=ContentType.objects.get_for_model(model)).order_by("pk")
+        # values_list() skips the post_init decompression (see
+        # home.revisions), so compressed content is written back compressed.
+        for pk, stored_content in queryset.values_list("pk", "content").iterator(chunk_size=self.batch_size):
+            rows += 1
+            compressed = is_compressed(stored_content)
+            content = decompress_content(stored_content) if compressed else stored_content
+            modified = False
+            for field in fields:
+                stored = content.get(field.name)
+                # StreamFields are stored in revisions as JSON strings.
+                stream_data = json.loads(stored) if isinstance(stored, str) else stored
+                if not isinstance(stream_data, list):
+                    continue
+                compacted = compact_stream_data(field.stream_block, stream_data)
+                if compacted != stream_data:
+                    content[field.name] = json.dumps(compacted) if isinstance(stored, str) else compacted
+                    modified = True
+            size = json_size(stored_content)
+            before += size
+            if modified:
+                content = compress_content(content) if compressed else content
+                after += json_size(content)
+                changed += 1
+                batch.append((pk, content))
+            else:
+                after += size
+            if len(batch) >= self.batch_size:
+                self.save_revisions(batch)
+                batch = []
+        self.save_revisions(batch)
+        return rows, changed, before, after
+
+    def save_revisions(self, batch):
+        if batch and not self.dry_run:
+            with transaction.atomic():
+                # Not bulk_update(), as building Revision instances would
+                # decompress the content.
+                for pk, content in batch:
+                    Revision.objects.filter(pk=pk).update(content=content)
+
+    def save(self, model, objs, fields):
+        if objs and not self.dry_run:
+            with transaction.atomic():
+                model._base_manager.bulk_update(objs, fields)
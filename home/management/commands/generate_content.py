@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from wagtail.models import Page, Site
+
+from home.content_generator import generate_content
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a tree of HomePages with randomized content, placeholder "
+        "images and settings snippets for load testing. Search index entries "
+        "are not created; run update_index afterwards if needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, help="Number of pages to create.")
+        parser.add_argument("--parent", type=int, help="ID of the parent page (default: the default site's root page).")
+        parser.add_argument("--fanout", type=int, default=50, help="Child pages per section page.")
+        parser.add_argument("--images", type=int, default=10, help="Placeholder images to create.")
+        parser.add_argument("--themes", type=int, default=3, help="ThemeSettings snippets to create.")
+        parser.add_argument("--carousels", type=int, default=3, help="CarouselSettings snippets to create.")
+        parser.add_argument(
+            "--video-backgrounds", type=int, default=3, help="VideoBackgroundSettings snippets to create."
+        )
+        parser.add_argument("--seed", type=int, help="Random seed, for reproducible content.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk insert.")
+
+    def handle(self, *args, **options):
+        if options["count"] < 0 or options["fanout"] < 1:
+            raise CommandError("count must be positive and --fanout at least 1.")
+
+        if options["parent"]:
+            try:
+                parent = Page.objects.get(pk=options["parent"])
+            except Page.DoesNotExist:
+                raise CommandError("Page %s does not exist." % options["parent"])
+        else:
+            site = Site.objects.filter(is_default_site=True).select_related("root_page").first()
+            if site is None:
+                raise CommandError("No default site; pass --parent.")
+            parent = site.root_page
+
+        start = time.perf_counter()
+        summary = generate_content(
+            parent,
+            options["count"],
+            fanout=options["fanout"],
+            images=options["images"],
+            themes=options["themes"],
+            carousels=options["carousels"],
+            video_backgrounds=options["video_backgrounds"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            "Created %(pages)d pages (%(sections)d sections) under %(parent)r, %(images)d images, "
+            "%(themes)d themes, %(carousels)d carousels and %(video_backgrounds)d video backgrounds "
+            "in %(seconds).1fs. Slugs start with load-%(tag)s-."
+            % {**summary, "parent": parent.title, "seconds": time.perf_counter() - start}
+        )
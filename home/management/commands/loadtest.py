@@ -0,0 +1,67 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home.loadtest import DEFAULT_MIX, HTTPTransport, WSGITransport, default_host, parse_mix, run_loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of page, search and carousel tracking requests "
+        "against the WSGI application in-process (default) or a running server "
+        "(--url), and report RPS, latency percentiles and errors as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Base URL of a running server, e.g. http://127.0.0.1:8000.")
+        parser.add_argument("--requests", type=int, default=1000, help="Number of measured requests.")
+        parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once.")
+        parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests sent first.")
+        parser.add_argument(
+            "--mix",
+            default=",".join("%s=%d" % item for item in DEFAULT_MIX.items()),
+            help="Relative weight of each kind of request (default: %(default)s).",
+        )
+        parser.add_argument("--search-query", action="append", dest="search_queries", help="Search query to replay; repeatable.")
+        parser.add_argument("--deep-pages", type=int, default=20, help="Number of deepest HomePages to request.")
+        parser.add_argument("--host", help="Host header for in-process requests (default: the default site's hostname).")
+        parser.add_argument("--seed", type=int, help="Random seed, for a reproducible request sequence.")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+        try:
+            mix = parse_mix(options["mix"])
+            if options["url"]:
+                transport = HTTPTransport(options["url"])
+            else:
+                transport = WSGITransport(options["concurrency"], host=options["host"] or default_host())
+            report = run_loadtest(
+                transport,
+                requests=options["requests"],
+                concurrency=options["concurrency"],
+                warmup=options["warmup"],
+                mix=mix,
+                search_queries=options["search_queries"],
+                deep_pages=options["deep_pages"],
+                seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+
+        report["meta"]["target"] = options["url"] or "in-process"
+        output = json.dumps(report, indent=2, sort_keys=True)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+            self.stdout.write(
+                "%d requests, %.1f req/s, p50 %.1f ms, p99 %.1f ms, %.2f%% errors. Report written to %s"
+                % (
+                    report["requests"], report["rps"], report["latency_ms"]["p50"],
+                    report["latency_ms"]["p99"], report["error_rate"] * 100, options["output"],
+                )
+            )
+        else:
+            self.stdout.write(output)
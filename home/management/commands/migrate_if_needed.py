@@ -0,0 +1,81 @@
+import hashlib
+import os
+import time
+from importlib.util import find_spec
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+from home.models import MigrationFingerprint
+
+
+def migration_fingerprint():
+    """SHA-256 of the names and contents of every installed app's migration
+    files, read without importing them."""
+    digest = hashlib.sha256()
+    for app_config in sorted(apps.get_app_configs(), key=lambda app_config: app_config.label):
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            spec = find_spec(module_name)
+        except ModuleNotFoundError:
+            spec = None
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for directory in spec.submodule_search_locations:
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".py"):
+                    digest.update(("%s/%s\0" % (app_config.label, name)).encode())
+                    with open(os.path.join(directory, name), "rb") as f:
+                        digest.update(f.read())
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run migrate, unless the migration files are unchanged since the last "
+        "successful run of this command against the database. Skips building "
+        "the migration graph and project state on container start."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database to migrate.")
+        parser.add_argument("--force", action="store_true", help="Run migrate even if the fingerprint matches.")
+
+    def handle(self, *args, **options):
+        database = options["database"]
+        start = time.perf_counter()
+        fingerprint = migration_fingerprint()
+
+        if not options["force"] and self.is_current(database, fingerprint):
+            self.stdout.write(
+                "Migration fingerprint unchanged, skipping migrate (%.0fms)." % ((time.perf_counter() - start) * 1000)
+            )
+            return
+
+        call_command("migrate", database=database, interactive=False, verbosity=options["verbosity"])
+        MigrationFingerprint.objects.using(database).update_or_create(
+            database=database,
+            defaults={"fingerprint": fingerprint, "applied_count": self.applied_count(database)},
+        )
+
+    def applied_count(self, database):
+        return MigrationRecorder(connections[database]).migration_qs.count()
+
+    def is_current(self, database, fingerprint):
+        try:
+            stored = MigrationFingerprint.objects.using(database).filter(database=database).first()
+            return (
+                stored is not None
+                and stored.fingerprint == fingerprint
+                and stored.applied_count == self.applied_count(database)
+            )
+        except DatabaseError:
+            # A new database, or one migrated before the fingerprint table
+            # existed.
+            return False
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from home.revisions import compress_revisions, delete_revisions, get_policy, plan
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete old page revisions and compress the content of older ones, "
+        "following the REVISION_RETENTION_* and REVISION_COMPRESS_AFTER_DAYS "
+        "settings (see home.revisions). Meant to be run daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be reclaimed without writing.")
+        parser.add_argument("--keep", type=int, help="Newest revisions to keep per page.")
+        parser.add_argument("--max-age", type=int, help="Delete unprotected revisions older than this many days.")
+        parser.add_argument("--compress-after", type=int, help="Compress revisions older than this many days.")
+        parser.add_argument("--no-prune", action="store_true", help="Don't delete any revisions.")
+        parser.add_argument("--no-compress", action="store_true", help="Don't compress any revisions.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Revisions per batch.")
+
+    def handle(self, *args, **options):
+        policy = get_policy(options["keep"], options["max_age"], options["compress_after"])
+        if policy["keep"] < 1:
+            raise CommandError("At least one revision per page must be kept.")
+        if options["no_prune"]:
+            policy["max_age_days"] = None
+        if options["no_compress"]:
+            policy["compress_after_days"] = None
+
+        dry_run = options["dry_run"]
+        delete_ids, compress_ids = plan(**policy)
+        deleted_bytes = delete_revisions(delete_ids, dry_run, options["batch_size"])
+        compressed, compressed_bytes = compress_revisions(compress_ids, dry_run, options["batch_size"])
+
+        verb = "Would" if dry_run else "Did"
+        self.stdout.write(
+            "%s delete %d revisions (%d bytes) and compress %d revisions (%d bytes saved); %d bytes reclaimed in total."
+            % (verb, len(delete_ids), deleted_bytes, compressed, compressed_bytes, deleted_bytes + compressed_bytes)
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0009_alter_homepage_content'),
+        ('wagtailcore', '0095_groupsitepermission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockRenderStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('block_type', models.CharField(max_length=64)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('histogram', models.JSONField(default=list)),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='wagtailcore.page')),
+            ],
+            options={
+                'verbose_name': 'Block Render Stats',
+                'verbose_name_plural': 'Block Render Stats',
+                'constraints': [models.UniqueConstraint(fields=('block_type', 'page', 'day'), name='unique_block_render_stats')],
+            },
+        ),
+    ]
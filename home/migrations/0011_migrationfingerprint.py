@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0010_blockrenderstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MigrationFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('database', models.CharField(max_length=100, unique=True)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('applied_count', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -17,6 +17,9 @@ from home.blocks import (
     CTASectionBlock,
     ThemeSelectorBlock
 )
+from home.preview import serve_incremental_preview
+from home.rich_text import expand_rich_text
+from home.stream_cache import use_cached_stream_values
 
 
 class ThemeSettings(models.Model):
@@ -509,7 +512,52 @@ class HomePage(Page):
     # Configuration
     subpage_types = ['home.HomePage']  # Allow child pages of this type
     parent_page_types = ['wagtailcore.Page']  # Allow this page type to be created under any page
+
+    def serve(self, request, *args, **kwargs):
+        # Reuse the deserialized content across requests (see home.stream_cache).
+        use_cached_stream_values(self, request)
+        # Expand all rich text links and embeds together (see home.rich_text).
+        expand_rich_text(self)
+        return super().serve(request, *args, **kwargs)
+
+    def serve_preview(self, request, mode_name):
+        # Re-render only the changed blocks of the editor's last preview.
+        return serve_incremental_preview(
+            self, request, mode_name, lambda: super(HomePage, self).serve_preview(request, mode_name)
+        )
     
     class PageMeta:
         verbose_name = "Home Page"
-        verbose_name_plural = "Home Pages"
\ No newline at end of file
+        verbose_name_plural = "Home Pages"
+
+class BlockRenderStats(models.Model):
+    """Sampled render times of top-level StreamField blocks, aggregated per
+    block type, page and day by ``home.profiling``."""
+
+    block_type = models.CharField(max_length=64)
+    page = models.ForeignKey('wagtailcore.Page', on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    # Sample counts per bucket of home.profiling.HISTOGRAM_BUCKETS_MS, plus
+    # one for slower renders.
+    histogram = models.JSONField(default=list)
+
+    class Meta:
+        verbose_name = "Block Render Stats"
+        verbose_name_plural = "Block Render Stats"
+        constraints = [
+            models.UniqueConstraint(fields=['block_type', 'page', 'day'], name='unique_block_render_stats'),
+        ]
+
+
+class MigrationFingerprint(models.Model):
+    """The migration files fingerprint of the last successful migrate run,
+    per database; see the ``migrate_if_needed`` command."""
+
+    database = models.CharField(max_length=100, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    # Rows in django_migrations at the time, to notice manual migrations.
+    applied_count = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
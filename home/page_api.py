@@ -0,0 +1,249 @@
+"""
+Read-only JSON representation of ``HomePage`` for headless clients.
+
+``serialize_pages()`` returns every API field of live pages, with the
+``content`` StreamField as a list of ``{"type", "id", "value"}`` blocks
+(values from each block's ``get_api_representation()``, so images are ids)
+and the images they refer to in ``images``. Pages not in the cache are
+serialized together: their content is loaded with one query, deserialized
+as one stream (so each block type looks up its images once for all of
+them) and their images fetched with one more. Clients then get only the
+``fields`` and content block ``types`` they ask for, which ``select()``
+picks from the serialized data; listings that don't ask for ``content``
+are built by ``listing_items()`` from the requested columns alone.
+
+Serialized data is cached per page, published version and image version
+(see ``home.stream_cache``), and saving the page deletes it, as
+``home.stream_cache`` does for its values.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from wagtail.blocks.stream_block import StreamValue
+from wagtail.images import get_image_model
+from wagtail.images.blocks import ImageChooserBlock
+
+from home.stream_cache import get_cache, get_version
+from home.streamfield import walk_raw
+
+FIELDS = (
+    "id",
+    "title",
+    "slug",
+    "url",
+    "seo_title",
+    "search_description",
+    "first_published_at",
+    "last_published_at",
+    "banner_title",
+    "banner_subtitle",
+    "about_title",
+    "about_description",
+    "content",
+)
+
+DEFAULT_LISTING_FIELDS = ("id", "title", "slug", "url", "last_published_at")
+
+# Pages serialized together in listings.
+BATCH_SIZE = 100
+
+
+def parse_list(value, allowed, name):
+    """Parse a comma-separated query parameter, raising ``ValueError`` for
+    unknown items."""
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = set(items) - set(allowed)
+    if unknown:
+        raise ValueError("Unknown %s: %s." % (name, ", ".join(sorted(unknown))))
+    return items
+
+
+def get_stream_block():
+    from home.models import HomePage
+
+    return HomePage._meta.get_field("content").stream_block
+
+
+def block_types():
+    return list(get_stream_block().child_blocks)
+
+
+def columns(fields):
+    """The model fields to load to output ``fields``."""
+    if "content" in fields:
+        # Serialized in full, for the cache.
+        fields = FIELDS
+        names = {"live_revision_id", "last_published_at"}
+    else:
+        names = set()
+    for name in fields:
+        if name == "url":
+            names.add("url_path")
+        elif name != "content":
+            names.add(name)
+    return sorted(names)
+
+
+def page_version(page):
+    # Pages created without revisions (e.g. by generate_content) have none.
+    published_at = page.last_published_at.isoformat() if page.last_published_at else ""
+    return "%s:%s" % (page.live_revision_id or "", published_at)
+
+
+def cache_key(page):
+    return "pageapi:%d:%s:%d" % (page.pk, page_version(page), get_version())
+
+
+def invalidate_page(sender, instance, **kwargs):
+    """``post_save`` handler deleting the page's cached data."""
+    get_cache().delete(cache_key(instance))
+
+
+def serialize_blocks(children, raw_data):
+    """Serialize stream children, each with the ids of the images it uses
+    under ``"images"``."""
+    stream_block = get_stream_block()
+    return [
+        {
+            "type": child.block_type,
+            "id": child.id,
+            "value": child.block.get_api_representation(child.value),
+            "images": sorted(
+                value
+                for block, value in walk_raw(stream_block, [raw])
+                if isinstance(block, ImageChooserBlock) and value
+            ),
+        }
+        for child, raw in zip(children, raw_data)
+    ]
+
+
+def get_images(image_ids):
+    return {
+        str(image.pk): {
+            "id": image.pk,
+            "title": image.title,
+            "width": image.width,
+            "height": image.height,
+            "url": image.file.url,
+        }
+        for image in get_image_model().objects.filter(pk__in=image_ids)
+    }
+
+
+def load_content(pages):
+    """Return ``{pk: raw_data}`` of the pages' content, loading it with one
+    query for pages it was deferred on."""
+    deferred = [page.pk for page in pages if "content" in page.get_deferred_fields()]
+    raw_data = {}
+    if deferred:
+        model = pages[0]._meta.model
+        raw_data = dict(model.objects.filter(pk__in=deferred).values_list("pk", "content"))
+    for page in pages:
+        content = raw_data[page.pk] if page.pk in raw_data else page.content
+        raw_data[page.pk] = list(content.raw_data)
+    return raw_data
+
+
+def serialize_new(pages):
+    """Serialize ``pages``, deserializing their content together."""
+    stream_block = get_stream_block()
+    raw_data = load_content(pages)
+    for page in pages:
+        # Blocks of removed types are left out, as when rendering.
+        raw_data[page.pk] = [raw for raw in raw_data[page.pk] if raw.get("type") in stream_block.child_blocks]
+    children = list(StreamValue(stream_block, [raw for page in pages for raw in raw_data[page.pk]], is_lazy=True))
+
+    serialized, start = {}, 0
+    for page in pages:
+        end = start + len(raw_data[page.pk])
+        data = {name: getattr(page, name) for name in FIELDS if name not in ("url", "content")}
+        data["content"] = serialize_blocks(children[start:end], raw_data[page.pk])
+        serialized[page.pk] = data
+        start = end
+
+    image_ids = {image_id for data in serialized.values() for block in data["content"] for image_id in block["images"]}
+    images = get_images(image_ids)
+    for data in serialized.values():
+        used = {str(image_id) for block in data["content"] for image_id in block["images"]}
+        data["images"] = {pk: image for pk, image in images.items() if pk in used}
+    return serialized
+
+
+def serialize_pages(pages, request=None):
+    """Return all the API fields of each of ``pages``, from the cache where
+    possible."""
+    pages = list(pages)
+    cache = get_cache()
+    keys = {page.pk: cache_key(page) for page in pages}
+    cached = cache.get_many(keys.values())
+    missing = [page for page in pages if keys[page.pk] not in cached]
+    if missing:
+        # Stored as JSON types, so cached and fresh copies are alike.
+        new = {
+            keys[pk]: json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+            for pk, data in serialize_new(missing).items()
+        }
+        cache.set_many(new, getattr(settings, "STREAMFIELD_CACHE_TIMEOUT", 3600))
+        cached.update(new)
+
+    serialized = []
+    for page in pages:
+        data = dict(cached[keys[page.pk]])
+        # Depends on the request's site, so not cached.
+        data["url"] = page.get_url(request)
+        serialized.append(data)
+    return serialized
+
+
+def serialize_page(page, request=None):
+    """Return all the API fields of ``page``, from the cache if possible."""
+    return serialize_pages([page], request)[0]
+
+
+def listing_items(pages, fields, types=None, request=None):
+    """
+    Yield the ``fields`` (and content block ``types``) of each of ``pages``,
+    which must have been loaded with ``columns(fields)``. Pages are
+    serialized ``BATCH_SIZE`` at a time if ``content`` is requested.
+    """
+    if "content" not in fields:
+        for page in pages:
+            item = {name: getattr(page, name) for name in fields if name != "url"}
+            if "url" in fields:
+                item["url"] = page.get_url(request)
+            yield {name: item[name] for name in fields}
+        return
+
+    batch = []
+    for page in pages:
+        batch.append(page)
+        if len(batch) == BATCH_SIZE:
+            for data in serialize_pages(batch, request):
+                yield select(data, fields, types)
+            batch = []
+    for data in serialize_pages(batch, request):
+        yield select(data, fields, types)
+
+
+def select(data, fields, types=None):
+    """Pick ``fields`` and, if given, content blocks of ``types`` from the
+    output of ``serialize_pages()``, with the images those blocks use."""
+    selected = {name: data[name] for name in fields}
+    if "content" in selected:
+        blocks = [block for block in data["content"] if not types or block["type"] in types]
+        used = {str(image_id) for block in blocks for image_id in block["images"]}
+        selected["content"] = [
+            {name: value for name, value in block.items() if name != "images"} for block in blocks
+        ]
+        selected["images"] = {pk: image for pk, image in data["images"].items() if pk in used}
+    return selected
+
+
+def etag(page, fields, types):
+    fingerprint = [getattr(settings, "PAGE_CACHE_VERSION", ""), page.pk, page_version(page), get_version()]
+    fingerprint += [sorted(fields), sorted(types or ())]
+    return '"%s"' % hashlib.md5(repr(fingerprint).encode()).hexdigest()
@@ -0,0 +1,134 @@
+"""
+Incremental preview rendering for ``HomePage``.
+
+The preview panel re-renders the page after every edit. In preview mode the
+template wraps each top-level StreamField block in ``<!--preview-block:ID-->``
+markers, and ``serve_incremental_preview()`` keeps the last preview of each
+user and page in the cache, with a hash of every block's stored value and
+one of everything else they depend on. When only blocks change, it renders
+just those blocks and splices them into the previous HTML; anything else
+(other fields, images, linked pages or settings, added, removed or reordered
+blocks, blocks without ids) renders the whole page again.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.template import engines
+
+from home import rich_text, stream_cache
+from home.stream_cache import get_cache
+
+BLOCK_START = "<!--preview-block:%s-->"
+BLOCK_END = "<!--/preview-block:%s-->"
+
+BLOCK_TEMPLATE = "{% load wagtailcore_tags %}{% include_block block %}"
+
+
+def digest(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+
+
+def preview_state(page):
+    """
+    Return ``(page_hash, blocks)``, where ``blocks`` is a list of
+    ``(block_id, block_hash)`` for the top-level blocks of ``page.content``.
+    ``page_hash`` covers everything else the blocks render: the page's other
+    fields, the images and linked pages (through the ``home.stream_cache``
+    and ``home.rich_text`` versions) and the active settings snippets.
+    """
+    # Imported here, as home.http_cache imports the models.
+    from home.http_cache import get_active_settings
+
+    data = page.serializable_data()
+    data.pop("content", None)
+    dependencies = [
+        stream_cache.get_version(),
+        rich_text.get_version(),
+        [(model._meta.label, pk, updated_at) for model, pk, updated_at in get_active_settings()],
+    ]
+    blocks = [(raw.get("id"), digest(raw)) for raw in page.content.raw_data]
+    return digest([data, dependencies]), blocks
+
+
+def cache_key(request, page, mode_name):
+    return "preview:%s:%s:%s:%s" % (
+        page._meta.label_lower,
+        page.pk or "new",
+        getattr(request.user, "pk", None),
+        mode_name,
+    )
+
+
+def render_block(page, request, block):
+    # Rendered like {% include_block %} in the page template, with the
+    # page's context and the context processors.
+    template = engines["django"].from_string(BLOCK_TEMPLATE)
+    return template.render({**page.get_context(request), "block": block}, request)
+
+
+def splice(html, block_id, block_html):
+    """Replace the HTML between a block's markers, or return ``None`` if
+    they're missing."""
+    start_marker, end_marker = BLOCK_START % block_id, BLOCK_END % block_id
+    start = html.find(start_marker)
+    end = html.find(end_marker, start)
+    if start == -1 or end == -1:
+        return None
+    start += len(start_marker)
+    return html[:start] + block_html + html[end:]
+
+
+def incremental_html(page, request, previous, page_hash, blocks):
+    """Return the preview HTML updated from ``previous``, or ``None`` if the
+    page must be rendered in full."""
+    if not previous or previous["page_hash"] != page_hash:
+        return None
+    block_ids = [block_id for block_id, block_hash in blocks]
+    if None in block_ids or len(set(block_ids)) != len(block_ids):
+        return None
+    if block_ids != [block_id for block_id, block_hash in previous["blocks"]]:
+        return None
+
+    html = previous["html"]
+    for index, ((block_id, block_hash), (_, previous_hash)) in enumerate(zip(blocks, previous["blocks"])):
+        if block_hash != previous_hash:
+            html = splice(html, block_id, render_block(page, request, page.content[index]))
+            if html is None:
+                return None
+    return html
+
+
+def serve_incremental_preview(page, request, mode_name, serve_preview):
+    """
+    Serve the preview of ``page``, updating the user's previous preview
+    when possible; ``serve_preview()`` renders the whole page.
+    """
+    if not getattr(settings, "INCREMENTAL_PREVIEW_ENABLED", True):
+        return serve_preview()
+
+    cache = get_cache()
+    key = cache_key(request, page, mode_name)
+    page_hash, blocks = preview_state(page)
+    html = incremental_html(page, request, cache.get(key), page_hash, blocks)
+    if html is not None:
+        response = HttpResponse(html)
+        response["X-Preview-Render"] = "incremental"
+    else:
+        response = serve_preview()
+        if hasattr(response, "render"):
+            response.render()
+        if response.status_code != 200:
+            return response
+        html = response.content.decode(response.charset)
+        response["X-Preview-Render"] = "full"
+
+    cache.set(
+        key,
+        {"page_hash": page_hash, "blocks": blocks, "html": html},
+        getattr(settings, "INCREMENTAL_PREVIEW_TIMEOUT", 1800),
+    )
+    return response
@@ -0,0 +1,197 @@
+"""
+Sampling profiler for StreamField block rendering.
+
+``home.blocks.TimedRenderMixin`` wraps every top-level block render in
+``block_profiler.profile()``. A ``BLOCK_PROFILE_SAMPLE_RATE`` fraction of
+renders is timed and appended to an in-memory ring buffer (oldest samples
+are dropped if it fills up), so the cost for unsampled renders is a random
+number and a context variable.
+
+At the end of a request, at most once per ``BLOCK_PROFILE_FLUSH_INTERVAL``
+seconds per process, the buffer is aggregated into ``BlockRenderStats`` rows
+(count, total, max and a histogram per block type, page and day), which the
+"Block render times" and "Page render times" admin reports read.
+"""
+
+import bisect
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger("home.profiling")
+
+# Upper bounds (ms) of the histogram buckets; slower renders go in a final
+# overflow bucket.
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_profile_depth = ContextVar("block_profile_depth", default=0)
+
+
+def empty_histogram():
+    return [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+
+def histogram_bucket(duration_ms):
+    return bisect.bisect_left(HISTOGRAM_BUCKETS_MS, duration_ms)
+
+
+def merge_histograms(histograms):
+    merged = empty_histogram()
+    for histogram in histograms:
+        for index, count in enumerate(histogram[:len(merged)]):
+            merged[index] += count
+    return merged
+
+
+def histogram_percentile(histogram, percent):
+    """Upper bound (ms) of the bucket holding the ``percent`` percentile, or
+    None if it falls in the overflow bucket or there are no samples."""
+    total = sum(histogram)
+    if not total:
+        return None
+    threshold = percent / 100 * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= threshold:
+            return HISTOGRAM_BUCKETS_MS[index] if index < len(HISTOGRAM_BUCKETS_MS) else None
+    return None
+
+
+def get_page_id(context):
+    if not context:
+        return None
+    request = context.get("request")
+    if request is not None and getattr(request, "is_preview", False):
+        return None
+    page = context.get("page")
+    return getattr(page, "pk", None)
+
+
+class BlockProfiler:
+    def __init__(self, buffer_size=None):
+        self.samples = deque(maxlen=buffer_size or getattr(settings, "BLOCK_PROFILE_BUFFER_SIZE", 10000))
+        self.last_flush = time.monotonic()
+        self.flush_lock = threading.Lock()
+
+    @contextmanager
+    def profile(self, block_type, context):
+        """Time the block render, if sampled. Blocks nested inside a profiled
+        block are counted as part of it."""
+        depth = _profile_depth.get()
+        token = _profile_depth.set(depth + 1)
+        sample_rate = getattr(settings, "BLOCK_PROFILE_SAMPLE_RATE", 0.0)
+        if depth or not sample_rate or random.random() >= sample_rate:
+            try:
+                yield
+            finally:
+                _profile_depth.reset(token)
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            _profile_depth.reset(token)
+            page_id = get_page_id(context)
+            if page_id is not None:
+                self.samples.append((block_type, page_id, duration_ms))
+
+    def drain(self):
+        samples = []
+        while True:
+            try:
+                samples.append(self.samples.popleft())
+            except IndexError:
+                return samples
+
+    def maybe_flush(self):
+        interval = getattr(settings, "BLOCK_PROFILE_FLUSH_INTERVAL", 60)
+        if self.samples and time.monotonic() - self.last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        """Aggregate the buffered samples into ``BlockRenderStats``."""
+        if not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.last_flush = time.monotonic()
+            samples = self.drain()
+            if samples:
+                self.write(aggregate(samples, timezone.localdate()))
+        except Exception:
+            logger.exception("Failed to write block render profile")
+        finally:
+            self.flush_lock.release()
+
+    def write(self, aggregates):
+        # Imported here as home.models imports home.blocks, which uses this module.
+        from home.models import BlockRenderStats
+        from wagtail.models import Page
+
+        page_ids = set(Page.objects.filter(pk__in={key[1] for key in aggregates}).values_list("pk", flat=True))
+        aggregates = {key: value for key, value in aggregates.items() if key[1] in page_ids}
+        if not aggregates:
+            return
+
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    write_aggregates(BlockRenderStats, aggregates)
+                return
+            except IntegrityError:
+                # Another process created one of the rows first; the retry
+                # updates it instead.
+                if attempt:
+                    raise
+
+
+def aggregate(samples, day):
+    """Group ``(block_type, page_id, duration_ms)`` samples by block type,
+    page and day."""
+    aggregates = {}
+    for block_type, page_id, duration_ms in samples:
+        key = (block_type, page_id, day)
+        stats = aggregates.get(key)
+        if stats is None:
+            stats = aggregates[key] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "histogram": empty_histogram()}
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["histogram"][histogram_bucket(duration_ms)] += 1
+    return aggregates
+
+
+def write_aggregates(model, aggregates):
+    days = {key[2] for key in aggregates}
+    existing = {
+        (row.block_type, row.page_id, row.day): row
+        for row in model.objects.select_for_update().filter(
+            day__in=days, block_type__in={key[0] for key in aggregates}, page_id__in={key[1] for key in aggregates}
+        )
+    }
+    updated, created = [], []
+    for (block_type, page_id, day), stats in aggregates.items():
+        row = existing.get((block_type, page_id, day))
+        if row is None:
+            created.append(model(block_type=block_type, page_id=page_id, day=day, **stats))
+        else:
+            row.count += stats["count"]
+            row.total_ms += stats["total_ms"]
+            row.max_ms = max(row.max_ms, stats["max_ms"])
+            row.histogram = merge_histograms([row.histogram, stats["histogram"]])
+            updated.append(row)
+    model.objects.bulk_update(updated, ["count", "total_ms", "max_ms", "histogram"])
+    model.objects.bulk_create(created)
+
+
+block_profiler = BlockProfiler()
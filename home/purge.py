@@ -0,0 +1,196 @@
+"""
+Publish-driven CDN purging.
+
+Signal handlers in ``home.signals`` compute the URLs and surrogate keys (see
+``home.http_cache``) affected by an edit and add them to ``purge_queue``. The
+queue deduplicates them and flushes once the surrounding transaction commits,
+handing them to a background thread that dispatches batches to every backend
+configured in ``CDN_PURGE_BACKENDS``, so editors don't wait for the CDN::
+
+    CDN_PURGE_BACKENDS = {
+        "default": {
+            "BACKEND": "home.purge.HTTPPurgeBackend",
+            "LOCATION": "https://cdn.example.com/purge",
+            "HEADERS": {"Authorization": "Bearer ..."},
+            "BATCH_SIZE": 100,
+        },
+    }
+
+``LocalPurgeServer`` is an in-process HTTP stand-in for a CDN purge API,
+which ``HTTPPurgeBackend`` can be pointed at in tests and development.
+"""
+
+import json
+import logging
+import queue
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger("home.purge")
+
+
+def batched(items, size):
+    items = sorted(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BasePurgeBackend:
+    """Purges URLs and surrogate keys from a CDN, in batches."""
+
+    def __init__(self, params):
+        self.batch_size = params.get("BATCH_SIZE", 100)
+
+    def purge(self, urls, keys):
+        """Purge the given URLs and surrogate keys (both lists)."""
+        raise NotImplementedError
+
+    def purge_batched(self, urls, keys):
+        for batch in batched(urls, self.batch_size):
+            self.purge(batch, [])
+        for batch in batched(keys, self.batch_size):
+            self.purge([], batch)
+
+
+class HTTPPurgeBackend(BasePurgeBackend):
+    """POST ``{"urls": [...], "surrogate_keys": [...]}`` to a purge endpoint."""
+
+    def __init__(self, params):
+        super().__init__(params)
+        try:
+            self.location = params["LOCATION"]
+        except KeyError:
+            raise ImproperlyConfigured("HTTPPurgeBackend requires a LOCATION")
+        self.headers = params.get("HEADERS", {})
+        self.timeout = params.get("TIMEOUT", 5)
+
+    def purge(self, urls, keys):
+        body = json.dumps({"urls": urls, "surrogate_keys": keys}).encode()
+        request = urllib.request.Request(
+            self.location,
+            data=body,
+            method="POST",
+            headers={"Content-Type": "application/json", **self.headers},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def get_backends(backend_settings=None):
+    if backend_settings is None:
+        backend_settings = getattr(settings, "CDN_PURGE_BACKENDS", {})
+
+    backends = {}
+    for name, config in backend_settings.items():
+        config = config.copy()
+        backend_class = import_string(config.pop("BACKEND"))
+        backends[name] = backend_class(config)
+    return backends
+
+
+class PurgeQueue:
+    """
+    Collects URLs and surrogate keys to purge, deduplicated, and dispatches
+    them from a background thread once the current transaction commits.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.urls = set()
+        self.keys = set()
+        self.pending = queue.Queue()
+        self.worker = None
+
+    def __len__(self):
+        return len(self.urls) + len(self.keys)
+
+    def add(self, urls=(), keys=()):
+        with self.lock:
+            self.urls.update(url for url in urls if url)
+            self.keys.update(keys)
+        # The first flush after commit dispatches everything queued so far;
+        # any later ones find the queue empty. Entries queued in a
+        # transaction that rolls back go out with the next flush instead.
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        with self.lock:
+            urls, keys = self.urls, self.keys
+            self.urls, self.keys = set(), set()
+            if not urls and not keys:
+                return
+            # Started on first use, so each (forked) server process has its own.
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run, name="cdn-purge", daemon=True)
+                self.worker.start()
+        # Backends are set up here, with the settings of the flushing thread.
+        self.pending.put((get_backends(), urls, keys))
+
+    def run(self):
+        while True:
+            backends, urls, keys = self.pending.get()
+            try:
+                self.dispatch(backends, urls, keys)
+            finally:
+                self.pending.task_done()
+
+    def dispatch(self, backends, urls, keys):
+        for name, backend in backends.items():
+            try:
+                backend.purge_batched(urls, keys)
+            except Exception:
+                logger.exception("CDN purge via backend %r failed", name)
+            else:
+                logger.info(
+                    "Purged %d URLs and %d surrogate keys via backend %r",
+                    len(urls), len(keys), name,
+                )
+
+    def join(self):
+        """Wait until everything flushed so far has been dispatched."""
+        self.pending.join()
+
+
+purge_queue = PurgeQueue()
+
+
+class LocalPurgeServer:
+    """
+    A local HTTP stand-in for a CDN purge API. Every JSON body POSTed to it
+    is appended to ``received``.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        received = self.received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                received.append(json.loads(self.rfile.read(length)))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return "http://%s:%s/" % (host, port)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,159 @@
+"""
+Page revision retention and compression.
+
+Every page save stores a full copy of the page, including its StreamField
+content, as a ``Revision``. The ``prune_revisions`` command (run it daily,
+e.g. from cron) applies a retention policy:
+
+* the ``REVISION_RETENTION_KEEP`` newest revisions of each page are kept;
+* so are revisions that are or were published, the latest and live
+  revisions, revisions scheduled for publishing, revisions that went
+  through a moderation workflow and revisions comments were made on (which
+  deleting would delete the comments);
+* other revisions older than ``REVISION_RETENTION_MAX_AGE_DAYS`` are deleted.
+
+Remaining revisions older than ``REVISION_COMPRESS_AFTER_DAYS`` (other than
+each page's latest revision) have their content stored zlib-compressed. A
+``post_init`` signal handler (see ``home.signals``) decompresses them when
+loaded, so Wagtail's history, compare and revert views work as before.
+"""
+
+import base64
+import json
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from wagtail.models import Comment, Page, PageLogEntry, Revision, TaskState
+
+COMPRESSED_KEY = "__compressed__"
+
+
+def is_compressed(content):
+    return isinstance(content, dict) and content.get(COMPRESSED_KEY) == "zlib"
+
+
+def compress_content(content):
+    data = zlib.compress(json.dumps(content, separators=(",", ":")).encode(), 9)
+    return {COMPRESSED_KEY: "zlib", "data": base64.b64encode(data).decode("ascii")}
+
+
+def decompress_content(content):
+    return json.loads(zlib.decompress(base64.b64decode(content["data"])))
+
+
+def decompress_revision(sender, instance, **kwargs):
+    """``post_init`` handler for ``Revision``."""
+    if is_compressed(instance.__dict__.get("content")):
+        instance.content = decompress_content(instance.content)
+
+
+def stored_size(content):
+    return len(json.dumps(content))
+
+
+def get_policy(keep=None, max_age_days=None, compress_after_days=None):
+    """The retention settings, with any of them overridden."""
+    return {
+        "keep": getattr(settings, "REVISION_RETENTION_KEEP", 20) if keep is None else keep,
+        "max_age_days": (
+            getattr(settings, "REVISION_RETENTION_MAX_AGE_DAYS", 90) if max_age_days is None else max_age_days
+        ),
+        "compress_after_days": (
+            getattr(settings, "REVISION_COMPRESS_AFTER_DAYS", 30)
+            if compress_after_days is None
+            else compress_after_days
+        ),
+    }
+
+
+def protected_revision_ids():
+    """Revisions never deleted, whatever their age."""
+    protected = set()
+    for latest, live in Page.objects.values_list("latest_revision_id", "live_revision_id"):
+        protected.update((latest, live))
+    protected.update(
+        PageLogEntry.objects.filter(action="wagtail.publish", revision_id__isnull=False).values_list(
+            "revision_id", flat=True
+        )
+    )
+    protected.update(TaskState.objects.values_list("revision_id", flat=True))
+    protected.update(Comment.objects.values_list("revision_created_id", flat=True))
+    protected.update(
+        Revision.objects.page_revisions().filter(approved_go_live_at__isnull=False).values_list("pk", flat=True)
+    )
+    protected.discard(None)
+    return protected
+
+
+def plan(keep, max_age_days, compress_after_days, now=None):
+    """
+    Return ``(delete_ids, compress_ids)`` for the page revisions. A
+    ``max_age_days`` or ``compress_after_days`` of ``None`` disables pruning
+    or compression.
+    """
+    now = now or timezone.now()
+    protected = protected_revision_ids()
+    latest = set(Page.objects.exclude(latest_revision=None).values_list("latest_revision_id", flat=True))
+    delete_before = now - timedelta(days=max_age_days) if max_age_days is not None else None
+    compress_before = now - timedelta(days=compress_after_days) if compress_after_days is not None else None
+
+    delete_ids, compress_ids = [], []
+    position, object_id = 0, None
+    revisions = (
+        Revision.objects.page_revisions()
+        .order_by("object_id", "-created_at", "-pk")
+        .values_list("pk", "object_id", "created_at")
+    )
+    for pk, revision_object_id, created_at in revisions.iterator(chunk_size=2000):
+        if revision_object_id != object_id:
+            position, object_id = 0, revision_object_id
+        position += 1
+        if delete_before and position > keep and pk not in protected and created_at < delete_before:
+            delete_ids.append(pk)
+        elif compress_before and pk not in latest and created_at < compress_before:
+            compress_ids.append(pk)
+    return delete_ids, compress_ids
+
+
+def batched(ids, size):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def delete_revisions(ids, dry_run=False, batch_size=500):
+    """Delete the revisions; returns the bytes of content deleted."""
+    reclaimed = 0
+    for batch in batched(ids, batch_size):
+        # values_list() skips the post_init decompression, so this is the
+        # stored size.
+        reclaimed += sum(map(stored_size, Revision.objects.filter(pk__in=batch).values_list("content", flat=True)))
+        if not dry_run:
+            with transaction.atomic():
+                # History entries for these edits are kept, without the link.
+                PageLogEntry.objects.filter(revision_id__in=batch).update(revision=None)
+                Revision.objects.filter(pk__in=batch).delete()
+    return reclaimed
+
+
+def compress_revisions(ids, dry_run=False, batch_size=500):
+    """Compress the revisions' content; returns ``(compressed, bytes_saved)``."""
+    compressed = saved = 0
+    for batch in batched(ids, batch_size):
+        with transaction.atomic():
+            for pk, content in Revision.objects.filter(pk__in=batch).values_list("pk", "content"):
+                if is_compressed(content):
+                    continue
+                compressed_content = compress_content(content)
+                saving = stored_size(content) - stored_size(compressed_content)
+                if saving <= 0:
+                    continue
+                compressed += 1
+                saved += saving
+                if not dry_run:
+                    # Not bulk_update(), as building Revision instances would
+                    # decompress the content again.
+                    Revision.objects.filter(pk=pk).update(content=compressed_content)
+    return compressed, saved
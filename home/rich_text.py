@@ -0,0 +1,123 @@
+"""
+Bulk expansion of the rich text in a page's StreamField content.
+
+Rich text is stored with ``<a linktype="page" id="...">`` links and
+``<embed>`` tags that are expanded when rendered, and each ``RichText``
+value does its own lookups. ``expand_rich_text()`` runs before a page is
+rendered: it collects every rich text value in the page's StreamFields,
+expands the ones not in the cache in a single pass (so all of the page's
+page and document links are fetched with one query per link type), and
+swaps them for ``ExpandedRichText`` values that render the result.
+
+Expanded HTML is cached by a hash of the source. Links render URLs and
+titles of other objects, so any page or document change invalidates every
+entry (see ``home.signals``).
+"""
+
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from wagtail import blocks
+from wagtail.rich_text import RichText, expand_db_html
+
+from home.stream_cache import get_cache, stream_fields
+
+VERSION_KEY = "richtext:version"
+
+# Joins the sources expanded together; the rewriters leave comments alone.
+SEPARATOR = "<!--home.rich_text-->"
+
+
+class ExpandedRichText(RichText):
+    """A ``RichText`` whose front-end HTML has already been expanded."""
+
+    def __init__(self, source, html):
+        super().__init__(source)
+        self.html = html
+
+    def __html__(self):
+        return render_to_string("wagtailcore/shared/richtext.html", {"html": self.html})
+
+
+def rich_text_values(block, value):
+    """
+    Yield ``(rich_text, replace)`` for every ``RichText`` in a native block
+    value, where ``replace(new_value)`` swaps it in its parent.
+    """
+    if isinstance(block, blocks.StreamBlock):
+        for child in value:
+            yield from _child_rich_text_values(child)
+    elif isinstance(block, blocks.StructBlock):
+        for name, child_block in block.child_blocks.items():
+            child_value = value.get(name)
+            if isinstance(child_block, blocks.RichTextBlock):
+                if isinstance(child_value, RichText):
+                    yield child_value, partial(value.__setitem__, name)
+            elif child_value is not None:
+                yield from rich_text_values(child_block, child_value)
+    elif isinstance(block, blocks.ListBlock):
+        for child in value.bound_blocks:
+            yield from _child_rich_text_values(child)
+
+
+def _child_rich_text_values(child):
+    # StreamValue and ListValue children both have ``block`` and ``value``.
+    if isinstance(child.block, blocks.RichTextBlock):
+        if isinstance(child.value, RichText):
+            yield child.value, partial(setattr, child, "value")
+    elif child.value is not None:
+        yield from rich_text_values(child.block, child.value)
+
+
+def get_version():
+    return get_cache().get_or_set(VERSION_KEY, 1, None)
+
+
+def bump_version(sender, **kwargs):
+    """Handler for page and document changes, invalidating every entry."""
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def expand_many(sources):
+    """Return a ``{source: html}`` dict of the expanded rich text sources."""
+    sources = list(dict.fromkeys(source for source in sources if source))
+    if not sources:
+        return {}
+    cache = get_cache()
+    version = get_version()
+    keys = {
+        source: "richtext:%d:%s" % (version, hashlib.sha1(source.encode()).hexdigest())
+        for source in sources
+    }
+    cached = cache.get_many(keys.values())
+    expanded = {source: cached[key] for source, key in keys.items() if key in cached}
+
+    missing = [source for source in sources if source not in expanded]
+    if missing:
+        html = expand_db_html(SEPARATOR.join(missing)).split(SEPARATOR)
+        if len(html) != len(missing):
+            # A source contains the separator itself.
+            html = [expand_db_html(source) for source in missing]
+        new = dict(zip(missing, html))
+        cache.set_many(
+            {keys[source]: source_html for source, source_html in new.items()},
+            getattr(settings, "RICH_TEXT_CACHE_TIMEOUT", 3600),
+        )
+        expanded.update(new)
+    return expanded
+
+
+def expand_rich_text(page):
+    """Expand all of the page's StreamField rich text in bulk."""
+    found = []
+    for field in stream_fields(page):
+        found.extend(rich_text_values(field.stream_block, getattr(page, field.name)))
+    expanded = expand_many(rich_text.source for rich_text, replace in found)
+    for rich_text, replace in found:
+        replace(ExpandedRichText(rich_text.source, expanded.get(rich_text.source, "")))
@@ -0,0 +1,253 @@
+"""
+Builders for realistic ``HomePage.content`` data and placeholder images.
+
+Used by the render benchmarks (``home.benchmarks``) to build worst-case
+pages. Values are returned in the raw JSON form stored in the database, so
+they can be assigned straight to ``HomePage.content``.
+"""
+
+import io
+import uuid
+
+from django.core.files.images import ImageFile
+from PIL import Image as PILImage
+from wagtail.images import get_image_model
+
+PLACEHOLDER_COLORS = ["#1e3a8a", "#0f766e", "#7c3aed", "#b45309", "#be123c", "#334155"]
+
+LOREM = (
+    "We help growing businesses modernise their infrastructure, secure their "
+    "data and ship software faster with pragmatic, vendor-neutral advice."
+)
+
+
+def create_placeholder_image(title, width=1920, height=1080, color="#1e3a8a"):
+    """Create a solid-colour PNG in the Wagtail image library."""
+    buffer = io.BytesIO()
+    PILImage.new("RGB", (width, height), color).save(buffer, format="PNG")
+    filename = "%s.png" % uuid.uuid4().hex
+    return get_image_model().objects.create(
+        title=title, file=ImageFile(buffer, name=filename)
+    )
+
+
+def block(block_type, value):
+    return {"type": block_type, "value": value, "id": str(uuid.uuid4())}
+
+
+def list_items(values):
+    return [{"type": "item", "value": value, "id": str(uuid.uuid4())} for value in values]
+
+
+def rich_text(text=LOREM):
+    return "<p>%s</p><ul><li>Cloud migration</li><li>Managed security</li></ul>" % text
+
+
+def hero_banner(image_id=None):
+    return block("hero_banner", {
+        "layout_style": "split",
+        "background_type": "image",
+        "background_image": image_id,
+        "headline": "Technology consulting that scales with you",
+        "subtitle": LOREM,
+        "description": rich_text(),
+        "cta_primary": "Book a consultation",
+        "cta_primary_link": "https://example.com/contact/",
+        "cta_primary_style": "primary",
+        "cta_secondary": "Our services",
+        "cta_secondary_link": "https://example.com/services/",
+        "cta_secondary_style": "outline",
+        "overlay_opacity": "75",
+        "text_alignment": "left",
+        "animation_style": "fade-in-up",
+        "enable_parallax": True,
+        "enable_particles": True,
+        "content_width": "wide",
+        "padding_top": 120,
+        "padding_bottom": 120,
+    })
+
+
+def carousel_slide(index, image_id=None):
+    return {
+        "background_image": image_id,
+        "background_color": "#0f172a",
+        "headline": "Slide %d headline" % (index + 1),
+        "subtitle": LOREM,
+        "description": rich_text(),
+        "cta_text": "Learn more",
+        "cta_link": "https://example.com/slide-%d/" % (index + 1),
+        "cta_style": "primary",
+    }
+
+
+def hero_carousel(image_ids, slide_count=5):
+    return block("hero_carousel", {
+        "auto_rotate": True,
+        "rotation_speed": "5000",
+        "show_indicators": True,
+        "show_navigation": True,
+        "pause_on_hover": True,
+        "ajax_url": "",
+        "ajax_method": "GET",
+        "slides": list_items(
+            carousel_slide(i, image_ids[i % len(image_ids)] if image_ids else None)
+            for i in range(slide_count)
+        ),
+        "overlay_opacity": "50",
+        "text_alignment": "center",
+        "animation_style": "slide",
+        "enable_parallax": True,
+        "content_width": "full",
+        "padding_top": 80,
+        "padding_bottom": 80,
+    })
+
+
+def hero_video_background(image_id):
+    return block("hero_video_background", {
+        "background_video": "https://example.com/media/hero.mp4",
+        "fallback_image": image_id,
+        "overlay_gradient": "blue",
+        "overlay_opacity": "50",
+        "headline": "Always-on infrastructure",
+        "subtitle": LOREM,
+        "description": rich_text(),
+        "cta_primary": "Get started",
+        "cta_primary_link": "https://example.com/start/",
+        "cta_primary_style": "primary",
+        "cta_secondary": "Watch the demo",
+        "cta_secondary_link": "https://example.com/demo/",
+        "cta_secondary_style": "ghost",
+        "content_alignment": "center",
+        "content_vertical_position": "middle",
+        "content_width": "medium",
+        "enable_mute": True,
+        "enable_loop": True,
+        "enable_autoplay": True,
+        "disable_on_mobile": True,
+        "animation_style": "fade-in-up",
+    })
+
+
+def service_card_value(index, image_id=None):
+    return {
+        "icon": image_id,
+        "title": "Service %d" % (index + 1),
+        "description": LOREM,
+        "link": "https://example.com/services/%d/" % (index + 1),
+        "link_text": "Learn more",
+        "card_style": "outlined",
+        "hover_animation": "lift",
+        "background_color": "#f8fafc",
+        "text_color": "#0f172a",
+    }
+
+
+def service_card(image_id=None):
+    return block("service_card", service_card_value(0, image_id))
+
+
+def service_cards(image_ids, card_count=12):
+    return block("service_cards", {
+        "heading": "What we do",
+        "description": LOREM,
+        "cards": list_items(
+            service_card_value(i, image_ids[i % len(image_ids)] if image_ids else None)
+            for i in range(card_count)
+        ),
+        "columns": "4",
+        "text_alignment": "center",
+        "card_spacing": "normal",
+    })
+
+
+def features(image_id=None):
+    return block("features", {
+        "icon": image_id,
+        "title": "24/7 monitoring",
+        "description": LOREM,
+        "link": "https://example.com/monitoring/",
+    })
+
+
+def testimonials(image_id=None):
+    return block("testimonials", {
+        "quote": LOREM,
+        "author": "Alex Morgan",
+        "role": "CTO",
+        "company": "Example Ltd",
+        "avatar": image_id,
+        "rating": "5",
+    })
+
+
+def stats(stat_count=6):
+    return block("stats", {
+        "stat": list_items(
+            {"value": "%d+" % (100 * (i + 1)), "label": "Metric %d" % (i + 1), "description": LOREM[:150]}
+            for i in range(stat_count)
+        ),
+    })
+
+
+def cta_section():
+    return block("cta_section", {
+        "title": "Ready to modernise?",
+        "description": LOREM,
+        "button_text": "Talk to us",
+        "button_link": "https://example.com/contact/",
+        "button_style": "primary",
+        "background_color": "#1e3a8a",
+    })
+
+
+def theme_selector():
+    return block("theme_selector", {
+        "theme_mode": "custom",
+        "enable_customization": True,
+        "primary_color": "#3B82F6",
+        "secondary_color": "#10B981",
+        "background_color": "#FFFFFF",
+        "surface_color": "#F8FAFC",
+        "text_color": "#1E293B",
+        "text_secondary_color": "#64748B",
+        "border_color": "#E2E8F0",
+        "font_family": "sans-serif",
+        "font_size_scale": "lg",
+        "show_theme_switcher": True,
+        "switcher_position": "top-right",
+        "switcher_style": "expanded",
+        "enable_transitions": True,
+        "transition_duration": "slow",
+        "enable_persistence": True,
+        "enable_server_persistence": False,
+        "enable_auto_detect": True,
+        "auto_contrast_adjustment": True,
+        "enable_high_contrast_mode": False,
+        "focus_outline_style": "thick",
+    })
+
+
+def worst_case_content(image_ids):
+    """
+    Every block type, with list blocks at their ``max_num`` (5 carousel
+    slides, 12 service cards, 6 stats), every image attached and each hero
+    block repeated.
+    """
+    first_image = image_ids[0] if image_ids else None
+    return [
+        hero_video_background(first_image),
+        hero_carousel(image_ids),
+        hero_banner(first_image),
+        service_cards(image_ids),
+        service_card(first_image),
+        features(first_image),
+        testimonials(first_image),
+        stats(),
+        cta_section(),
+        theme_selector(),
+        hero_banner(first_image),
+        hero_carousel(image_ids),
+        hero_video_background(first_image),
+    ]
@@ -0,0 +1,120 @@
+"""
+Signal handlers queueing CDN purges (see ``home.purge``) when editors publish
+or move pages or change the settings snippets and images that pages depend on, and
+flushing the block render profile (see ``home.profiling``) and reporting
+buffer depths to the metrics after requests, decompressing compressed
+revisions (see ``home.revisions``) when they're loaded, and invalidating
+cached StreamField values (see ``home.stream_cache``), expanded rich text
+(see ``home.rich_text``), page API data (see ``home.page_api``) and
+sitemaps (see ``home.sitemap``).
+"""
+
+import copy
+
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_init, post_save
+from wagtail.documents import get_document_model
+from wagtail.images import get_image_model
+from wagtail.models import Page, PageViewRestriction, Revision, get_page_models
+from wagtail.signals import page_published, page_unpublished, post_page_move
+
+from home import page_api, rich_text, sitemap
+from home.http_cache import (
+    ACTIVE_SETTINGS_MODELS,
+    image_surrogate_key,
+    page_surrogate_key,
+    settings_surrogate_keys,
+)
+from home.profiling import block_profiler
+from home.purge import purge_queue
+from home.models import HomePage
+from home.revisions import decompress_revision
+from home.stream_cache import bump_version, invalidate_page
+from it_consulting.metrics import set_buffer_depth
+
+
+def purge_page(sender, instance, **kwargs):
+    purge_queue.add(urls=[instance.get_full_url()], keys=[page_surrogate_key(instance.pk)])
+
+
+def purge_moved_page(sender, instance, url_path_before, url_path_after, **kwargs):
+    """Purge a moved page's old and new URLs, and the keys of the live pages
+    below it, whose URLs changed too."""
+    if url_path_before == url_path_after:
+        return
+    keys = [
+        page_surrogate_key(pk) for pk in instance.get_descendants(inclusive=True).live().values_list("pk", flat=True)
+    ]
+    urls = []
+    if instance.live:
+        old_page = copy.copy(instance)
+        old_page.url_path = url_path_before
+        urls = [old_page.get_full_url(), instance.get_full_url()]
+    purge_queue.add(urls=urls, keys=keys)
+
+
+def purge_deleted_page(sender, instance, **kwargs):
+    if instance.live:
+        purge_queue.add(keys=[page_surrogate_key(instance.pk)])
+
+
+def purge_settings(sender, instance, **kwargs):
+    purge_queue.add(keys=settings_surrogate_keys(sender, instance.pk))
+
+
+def purge_image(sender, instance, **kwargs):
+    purge_queue.add(keys=[image_surrogate_key(instance.pk)])
+
+
+def after_request(sender, **kwargs):
+    block_profiler.maybe_flush()
+    set_buffer_depth("block_profile", len(block_profiler.samples))
+    set_buffer_depth("cdn_purge", len(purge_queue))
+
+
+def register_signal_handlers():
+    page_published.connect(purge_page, dispatch_uid="home_purge_published_page")
+    page_unpublished.connect(purge_page, dispatch_uid="home_purge_unpublished_page")
+    post_page_move.connect(purge_moved_page, dispatch_uid="home_purge_moved_page")
+    for model in get_page_models():
+        post_delete.connect(
+            purge_deleted_page, sender=model, dispatch_uid="home_purge_deleted_%s" % model._meta.model_name
+        )
+
+    for model in ACTIVE_SETTINGS_MODELS:
+        post_save.connect(purge_settings, sender=model, dispatch_uid="home_purge_%s" % model._meta.model_name)
+        post_delete.connect(purge_settings, sender=model, dispatch_uid="home_purge_deleted_%s" % model._meta.model_name)
+
+    image_model = get_image_model()
+    post_save.connect(purge_image, sender=image_model, dispatch_uid="home_purge_image")
+    post_delete.connect(purge_image, sender=image_model, dispatch_uid="home_purge_deleted_image")
+    post_save.connect(bump_version, sender=image_model, dispatch_uid="home_stream_cache_image")
+    post_delete.connect(bump_version, sender=image_model, dispatch_uid="home_stream_cache_deleted_image")
+    post_save.connect(invalidate_page, sender=HomePage, dispatch_uid="home_stream_cache_page")
+    post_save.connect(page_api.invalidate_page, sender=HomePage, dispatch_uid="home_page_api_page")
+
+    # Rich text links render the URLs of the linked pages and documents.
+    for model in (Page, HomePage, get_document_model()):
+        post_save.connect(
+            rich_text.bump_version, sender=model, dispatch_uid="home_rich_text_%s" % model._meta.model_name
+        )
+        post_delete.connect(
+            rich_text.bump_version, sender=model, dispatch_uid="home_rich_text_deleted_%s" % model._meta.model_name
+        )
+    # Moves also change the URLs of the descendants, without saving them.
+    post_page_move.connect(rich_text.bump_version, dispatch_uid="home_rich_text_moved_page")
+
+    # Anything changing which pages are live and public, or their URLs.
+    page_published.connect(sitemap.bump_version, dispatch_uid="home_sitemap_published_page")
+    page_unpublished.connect(sitemap.bump_version, dispatch_uid="home_sitemap_unpublished_page")
+    post_page_move.connect(sitemap.bump_version, dispatch_uid="home_sitemap_moved_page")
+    post_delete.connect(sitemap.bump_version, sender=Page, dispatch_uid="home_sitemap_deleted_page")
+    post_delete.connect(sitemap.bump_version, sender=HomePage, dispatch_uid="home_sitemap_deleted_homepage")
+    post_save.connect(sitemap.bump_version, sender=PageViewRestriction, dispatch_uid="home_sitemap_restriction")
+    post_delete.connect(
+        sitemap.bump_version, sender=PageViewRestriction, dispatch_uid="home_sitemap_deleted_restriction"
+    )
+
+    request_finished.connect(after_request, dispatch_uid="home_after_request")
+
+    post_init.connect(decompress_revision, sender=Revision, dispatch_uid="home_decompress_revision")
@@ -0,0 +1,136 @@
+"""
+Streaming ``sitemap.xml`` for the live, public pages.
+
+Pages are read in ``path`` order with keyset pagination (``path > last``,
+``BATCH_SIZE`` at a time) and only the columns their URLs need, so a sitemap
+never holds more than a batch of pages in memory. Sitemaps are limited to
+``SITEMAP_MAX_URLS`` URLs (50,000 in the protocol), so larger trees are
+split into chunks starting at the paths ``chunk_starts()`` finds with a
+``ROW_NUMBER()`` window over the pages, listed by a sitemap index.
+
+Chunk boundaries and each chunk's XML are cached under a version number
+that's bumped whenever pages are published, unpublished, moved or deleted,
+or their view restrictions change (see ``home.signals``).
+"""
+
+from django.conf import settings
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils.html import escape
+from wagtail.models import Page, Site
+
+from home.stream_cache import get_cache
+
+VERSION_KEY = "sitemap:version"
+
+BATCH_SIZE = 2000
+
+# Needed for get_full_url() and <lastmod>.
+FIELDS = ("id", "path", "url_path", "last_published_at")
+
+URLSET_START = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_END = "</urlset>\n"
+INDEX_START = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+INDEX_END = "</sitemapindex>\n"
+
+
+def max_urls():
+    return getattr(settings, "SITEMAP_MAX_URLS", 50000)
+
+
+def get_version():
+    return get_cache().get_or_set(VERSION_KEY, 1, None)
+
+
+def bump_version(sender, **kwargs):
+    """Handler for page and view restriction changes, invalidating every
+    cached chunk."""
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def get_pages():
+    """The live public pages within a site, i.e. those with a URL."""
+    in_site = Q()
+    for site_root in Site.get_site_root_paths():
+        in_site |= Q(url_path__startswith=site_root.root_path)
+    if not in_site:
+        return Page.objects.none()
+    return Page.objects.live().public().filter(in_site).order_by("path")
+
+
+def chunk_starts():
+    """Return the path of the first page of each chunk."""
+    cache = get_cache()
+    key = "sitemap:%d:%d:starts" % (get_version(), max_urls())
+    starts = cache.get(key)
+    if starts is None:
+        # Numbers the pages in path order in the database, in one pass, and
+        # returns every max_urls()-th path.
+        position = Window(RowNumber(), order_by=F("path").asc()) - 1
+        starts = list(
+            get_pages()
+            .annotate(chunk_position=position % max_urls())
+            .filter(chunk_position=0)
+            .values_list("path", flat=True)
+        )
+        cache.set(key, starts, getattr(settings, "SITEMAP_CACHE_TIMEOUT", 3600))
+    return starts
+
+
+def iter_pages(start, stop=None):
+    """Yield the pages from path ``start`` up to (not including) ``stop``."""
+    pages = get_pages().only(*FIELDS)
+    if stop is not None:
+        pages = pages.filter(path__lt=stop)
+    batch = list(pages.filter(path__gte=start)[:BATCH_SIZE])
+    while batch:
+        yield from batch
+        if len(batch) < BATCH_SIZE:
+            return
+        batch = list(pages.filter(path__gt=batch[-1].path)[:BATCH_SIZE])
+
+
+def url_entry(page, request=None):
+    url = page.get_full_url(request)
+    if not url:
+        return ""
+    entry = "<url><loc>%s</loc>" % escape(url)
+    if page.last_published_at:
+        entry += "<lastmod>%s</lastmod>" % page.last_published_at.date().isoformat()
+    return entry + "</url>\n"
+
+
+def stream_chunk(index, request=None):
+    """
+    Yield the XML of chunk ``index`` (which must exist), from the cache or as
+    it's generated, caching it once complete.
+    """
+    cache = get_cache()
+    key = "sitemap:%d:%d:chunk:%d" % (get_version(), max_urls(), index)
+    xml = cache.get(key)
+    if xml is not None:
+        yield xml
+        return
+
+    starts = chunk_starts()
+    stop = starts[index + 1] if index + 1 < len(starts) else None
+    parts = [URLSET_START]
+    yield URLSET_START
+    for page in iter_pages(starts[index], stop):
+        entry = url_entry(page, request)
+        parts.append(entry)
+        yield entry
+    parts.append(URLSET_END)
+    yield URLSET_END
+    cache.set(key, "".join(parts), getattr(settings, "SITEMAP_CACHE_TIMEOUT", 3600))
+
+
+def index_xml(chunk_urls):
+    entries = "".join("<sitemap><loc>%s</loc></sitemap>\n" % escape(url) for url in chunk_urls)
+    return INDEX_START + entries + INDEX_END
@@ -334,6 +334,15 @@ class HeroCarousel {
         this.showSlide(0);
     }
     
+    // Pick the smallest rendition at least as wide as the carousel
+    pickBackgroundImage(slideData) {
+        const images = slideData.backgroundImages || {};
+        const needed = this.carousel.clientWidth * (window.devicePixelRatio || 1);
+        const widths = Object.keys(images).map(Number).sort((a, b) => a - b);
+        const width = widths.find(w => w >= needed) || widths[widths.length - 1];
+        return width ? images[width] : (slideData.backgroundImage || '');
+    }
+
     // Create slide element from data
     createSlideElement(slideData, index) {
         const slide = document.createElement('div');
@@ -342,7 +351,7 @@ class HeroCarousel {
         
         // Add slide content
         slide.innerHTML = `
-            <div class="hero-carousel-background" style="background-image: url('${slideData.backgroundImage || ''}');">
+            <div class="hero-carousel-background" style="background-image: url('${this.pickBackgroundImage(slideData)}');">
                 <div class="hero-carousel-overlay" style="opacity: ${slideData.overlayOpacity || 0.5};"></div>
             </div>
             <div class="hero-carousel-content" style="text-align: ${slideData.textAlignment || 'center'};">
@@ -0,0 +1,153 @@
+"""
+Cross-request cache of deserialized StreamField values.
+
+Turning a page's stored StreamField JSON into ``StreamValue``/``StructValue``
+objects runs every block's ``to_python()`` and looks up the images (and other
+chosen objects) it refers to. ``get_stream_value()`` caches the result per
+page and live revision, so it only happens once per published version of a
+page rather than on every request.
+
+``StreamValue`` itself only pickles its raw JSON, so the cached form is a
+"frozen" copy: nested lists, dicts and tuples holding the native values
+(model instances, ``RichText`` objects, strings...), which ``thaw()`` turns
+back into block values without calling ``to_python()`` or querying the
+database. Keys include a hash of the field's block definitions, so deploying
+changed blocks doesn't reuse incompatible entries.
+
+Pages without a live revision (e.g. created in bulk by ``generate_content``)
+and previews are not cached. Saving a page deletes its entry, as content can
+be changed without publishing a new revision, and changing any image
+invalidates every entry, as the cached values hold image instances. Those
+invalidations only reach other processes if ``STREAMFIELD_CACHE_ALIAS`` is a
+cache they share, which the ``home.W001`` deploy check looks for.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from wagtail import blocks
+from wagtail.blocks.list_block import ListValue
+from wagtail.blocks.stream_block import StreamValue
+from wagtail.fields import StreamField
+
+VERSION_KEY = "streamvalue:version"
+
+_schema_versions = {}
+
+
+def freeze(block, value):
+    """Return a picklable copy of a native block value."""
+    if isinstance(block, blocks.StreamBlock):
+        return [(child.block_type, freeze(child.block, child.value), child.id) for child in value]
+    if isinstance(block, blocks.StructBlock):
+        return {name: freeze(block.child_blocks[name], child_value) for name, child_value in value.items()}
+    if isinstance(block, blocks.ListBlock):
+        return [(freeze(block.child_block, child.value), child.id) for child in value.bound_blocks]
+    return value
+
+
+def thaw(block, data):
+    """Rebuild a native block value from ``freeze()``'s output."""
+    if isinstance(block, blocks.StreamBlock):
+        return StreamValue(
+            block,
+            [
+                (block_type, thaw(block.child_blocks[block_type], value), block_id)
+                for block_type, value, block_id in data
+                if block_type in block.child_blocks
+            ],
+        )
+    if isinstance(block, blocks.StructBlock):
+        return block._to_struct_value([
+            (name, thaw(child_block, data[name]) if name in data else child_block.get_default())
+            for name, child_block in block.child_blocks.items()
+        ])
+    if isinstance(block, blocks.ListBlock):
+        return ListValue(
+            block,
+            bound_blocks=[
+                ListValue.ListChild(block.child_block, thaw(block.child_block, value), id=block_id)
+                for value, block_id in data
+            ],
+        )
+    return data
+
+
+def schema_version(field):
+    key = (field.model._meta.label, field.name)
+    if key not in _schema_versions:
+        _schema_versions[key] = hashlib.sha256(repr(field.deconstruct()).encode()).hexdigest()[:12]
+    return _schema_versions[key]
+
+
+def stream_fields(page):
+    return [field for field in page._meta.concrete_fields if isinstance(field, StreamField)]
+
+
+def get_cache():
+    return caches[getattr(settings, "STREAMFIELD_CACHE_ALIAS", "default")]
+
+
+def get_version():
+    return get_cache().get_or_set(VERSION_KEY, 1, None)
+
+
+def bump_version(sender, **kwargs):
+    """``post_save``/``post_delete`` handler for images, invalidating every
+    cached value."""
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def cache_key(page, field, version=None):
+    if not page.live_revision_id:
+        return None
+    return "streamvalue:%s:%s:%d:%d:%s:%d" % (
+        page._meta.label_lower,
+        field.name,
+        page.pk,
+        page.live_revision_id,
+        schema_version(field),
+        get_version() if version is None else version,
+    )
+
+
+def get_stream_value(page, field_name):
+    """
+    Return the page's value for the StreamField ``field_name``, from the
+    cache if possible. ``page`` must be the live version of the page, as
+    loaded from the database.
+    """
+    field = page._meta.get_field(field_name)
+    key = cache_key(page, field)
+    if key is None:
+        return getattr(page, field_name)
+
+    cache = get_cache()
+    data = cache.get(key)
+    if data is not None:
+        return field.to_python(thaw(field.stream_block, data))
+
+    value = getattr(page, field_name)
+    cache.set(key, freeze(field.stream_block, value), getattr(settings, "STREAMFIELD_CACHE_TIMEOUT", 3600))
+    return value
+
+
+def use_cached_stream_values(page, request=None):
+    """Replace the page's StreamField values with cached ones, unless the
+    request is a preview (where the page is a draft)."""
+    if request is not None and getattr(request, "is_preview", False):
+        return
+    for field in stream_fields(page):
+        setattr(page, field.name, get_stream_value(page, field.name))
+
+
+def invalidate_page(sender, instance, **kwargs):
+    """``post_save`` handler deleting the page's cached values."""
+    keys = [key for key in (cache_key(instance, field) for field in stream_fields(instance)) if key]
+    if keys:
+        get_cache().delete_many(keys)
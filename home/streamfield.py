@@ -0,0 +1,47 @@
+"""
+Helpers for inspecting StreamField content without deserializing it.
+
+Walking the raw JSON data against the block definitions is much cheaper than
+building ``StreamValue``/``StructValue`` objects, and avoids the chooser
+lookups (images, pages) that ``to_python`` performs.
+"""
+
+from wagtail import blocks
+from wagtail.images.blocks import ImageChooserBlock
+
+
+def walk_raw(block, value):
+    """
+    Yield ``(block, raw_value)`` for ``block`` and every block nested in it,
+    depth first.
+    """
+    yield block, value
+    if isinstance(block, blocks.StreamBlock):
+        for item in value or []:
+            child_block = block.child_blocks.get(item.get("type"))
+            if child_block is not None:
+                yield from walk_raw(child_block, item.get("value"))
+    elif isinstance(block, blocks.StructBlock):
+        if isinstance(value, dict):
+            for name, child_block in block.child_blocks.items():
+                if name in value:
+                    yield from walk_raw(child_block, value[name])
+    elif isinstance(block, blocks.ListBlock):
+        for item in value or []:
+            if block._item_is_in_block_format(item):
+                item = item["value"]
+            yield from walk_raw(block.child_block, item)
+
+
+def walk_stream(stream_value):
+    """Yield ``(block, raw_value)`` pairs for a ``StreamValue``."""
+    return walk_raw(stream_value.stream_block, list(stream_value.raw_data))
+
+
+def get_image_ids(stream_value):
+    """Return the ids of all images referenced by a ``StreamValue``."""
+    return {
+        value
+        for block, value in walk_stream(stream_value)
+        if isinstance(block, ImageChooserBlock) and value
+    }
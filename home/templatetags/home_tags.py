@@ -1,8 +1,25 @@
 from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
 from django.utils.safestring import mark_safe
 
+from home.critical_css import get_critical_css, get_first_block_type
+from it_consulting.bundles import bundle_path, get_bundles
+
 register = template.Library()
 
+BUNDLE_TAGS = {
+    "css": '<link rel="stylesheet" type="text/css" href="{}">',
+    "js": '<script type="text/javascript" src="{}"></script>',
+}
+
+# Loads a stylesheet without blocking render, for use once critical CSS is inlined.
+DEFERRED_CSS_TAG = (
+    '<link rel="preload" as="style" href="{0}" onload="this.onload=null;this.rel=\'stylesheet\'">'
+    '<noscript><link rel="stylesheet" type="text/css" href="{0}"></noscript>'
+)
+
 @register.simple_tag
 def carousel_assets():
     """Include CSS and JS assets for the hero carousel."""
@@ -25,4 +42,31 @@ def service_card_assets():
     return mark_safe('''
         <link rel="stylesheet" type="text/css" href="/static/css/service-card.css">
         <link rel="stylesheet" type="text/css" href="/static/css/service-cards.css">
-    ''')
\ No newline at end of file
+    ''')
+
+@register.simple_tag
+def static_bundle(name, kind, defer=False):
+    """Include a STATIC_BUNDLES bundle, or its source files when bundling is off.
+
+    With ``defer``, stylesheets are preloaded and applied without blocking render.
+    """
+    try:
+        files = get_bundles()[name][kind]
+    except KeyError:
+        raise template.TemplateSyntaxError(
+            "Unknown static bundle %r of kind %r" % (name, kind)
+        )
+
+    if getattr(settings, "STATIC_BUNDLES_ENABLED", False):
+        files = [bundle_path(name, kind)]
+    tag = DEFERRED_CSS_TAG if defer and kind == "css" else BUNDLE_TAGS[kind]
+    return format_html_join("\n", tag, ((static(f),) for f in files))
+
+
+@register.simple_tag(takes_context=True)
+def critical_css(context):
+    """Return the critical CSS for the first StreamField block of the page."""
+    block_type = get_first_block_type(context.get("page"))
+    if block_type is None:
+        return ""
+    return mark_safe(get_critical_css(block_type))
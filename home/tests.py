@@ -1,7 +1,44 @@
+import functools
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import RequestFactory, SimpleTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from home.models import HomePage
+from django.utils import timezone
+from home import rich_text, sample_content, sitemap, stream_cache
+from home.benchmarks import pack_block_definitions
+from home.blocks import ButtonStyleBlock
+from home.checks import check_stream_cache_shared
+from home.critical_css import parse_rules, serialize_critical_rules
+from home.loadtest import WSGITransport, parse_mix, percentile, run_loadtest
+from home.models import BlockRenderStats, HomePage, MigrationFingerprint, ThemeSettings
+from home.profiling import block_profiler, histogram_percentile
+from home.purge import BasePurgeBackend, LocalPurgeServer, purge_queue
+from home.revisions import is_compressed
+from it_consulting.bundles import build_bundle, minify_css, minify_js
+from it_consulting import slowlog
+from it_consulting.middleware import PrecompressedStaticFilesMiddleware
+from it_consulting.storage import CompressedManifestStaticFilesStorage
+from it_consulting.test_runner import FIXTURE_PAGES, FIXTURES_SLUG
 
-from wagtail.models import Page
+from prometheus_client import REGISTRY
+from wagtail.models import Comment, Page, Revision
 from wagtail.test.utils import WagtailPageTestCase
 
 
@@ -41,3 +78,1286 @@ class HomeTests(WagtailPageTestCase):
     def test_homepage_template_used(self):
         response = self.client.get(reverse("home"))
         self.assertTemplateUsed(response, "home/home_page.html")
+
+
+class PrecompressedStaticFilesTests(SimpleTestCase):
+    """
+    Tests for the compressed static files storage and serving middleware.
+    """
+
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+        self.storage = CompressedManifestStaticFilesStorage(location=self.static_root)
+        os.makedirs(os.path.join(self.static_root, "css"))
+        with open(os.path.join(self.static_root, "css", "site.css"), "w") as f:
+            f.write(".hero-banner { color: #fff; }\n" * 50)
+
+    def get(self, path, **extra):
+        with self.settings(STATIC_ROOT=self.static_root):
+            middleware = PrecompressedStaticFilesMiddleware(lambda request: None)
+            return middleware(RequestFactory().get(path, **extra))
+
+    def test_compress_file_writes_variants(self):
+        written = self.storage.compress_file("css/site.css")
+        self.assertEqual(written, ["css/site.css.gz", "css/site.css.br"])
+        with open(os.path.join(self.static_root, "css", "site.css.gz"), "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()).decode()[:12], ".hero-banner")
+
+    def test_middleware_negotiates_encoding(self):
+        self.storage.compress_file("css/site.css")
+        response = self.get("/static/css/site.css", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+        response = self.get("/static/css/site.css", HTTP_ACCEPT_ENCODING="gzip, br;q=0")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+        response = self.get("/static/css/site.css")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_not_modified_keeps_vary_and_cache_control(self):
+        self.storage.compress_file("css/site.css")
+        last_modified = self.get("/static/css/site.css")["Last-Modified"]
+        response = self.get(
+            "/static/css/site.css", HTTP_ACCEPT_ENCODING="br", HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+
+    def test_middleware_passes_through_unknown_files(self):
+        self.assertIsNone(self.get("/static/css/missing.css"))
+        self.assertIsNone(self.get("/static/../secret.txt"))
+
+
+class StaticBundleTests(SimpleTestCase):
+    """
+    Tests for the pure-Python minifiers and the bundle template tag.
+    """
+
+    def test_minify_css(self):
+        code, segments = minify_css("/* hero */\n.hero a :hover {\n  color: red;\n  margin: 0 auto;\n}\n")
+        self.assertEqual(code, ".hero a :hover{color:red;margin:0 auto}")
+        self.assertEqual(segments[0], (0, 0, 1, 0))
+
+    def test_minify_js_keeps_strings_regexes_and_line_breaks(self):
+        source = (
+            "// comment\n"
+            "const url = 'http://example.com'; /* block */\n"
+            "const tpl = `a // ${ {b: '}'}.b }\n  c`;\n"
+            "if (/a\\/b/i.test(url)) { return x / 2 }\n"
+        )
+        code, _ = minify_js(source)
+        self.assertEqual(
+            code,
+            "const url='http://example.com';\n"
+            "const tpl=`a // ${ {b: '}'}.b }\n  c`;\n"
+            "if(/a\\/b/i.test(url)){return x/2}",
+        )
+
+    def test_build_bundle_source_map(self):
+        files = {"css/a.css": "a {\n  color: red;\n}\n", "css/b.css": "b { color: blue; }\n"}
+        code, source_map = build_bundle("test", "css", list(files), files.__getitem__)
+        self.assertEqual(
+            code,
+            "a{color:red}\nb{color:blue}\n/*# sourceMappingURL=test.min.css.map */\n",
+        )
+        source_map = json.loads(source_map)
+        self.assertEqual(source_map["sources"], ["../css/a.css", "../css/b.css"])
+        self.assertEqual(source_map["mappings"], "AAAA,EACE,SACF;ACFA")
+
+    def test_static_bundle_tag(self):
+        template = Template('{% load home_tags %}{% static_bundle "services" "css" %}')
+        self.assertHTMLEqual(
+            template.render(Context()),
+            '<link rel="stylesheet" type="text/css" href="/static/css/service-card.css">'
+            '<link rel="stylesheet" type="text/css" href="/static/css/service-cards.css">',
+        )
+        with self.settings(STATIC_BUNDLES_ENABLED=True):
+            self.assertHTMLEqual(
+                template.render(Context()),
+                '<link rel="stylesheet" type="text/css" href="/static/bundles/services.min.css">',
+            )
+
+    def test_block_templates_include_their_bundles(self):
+        templates = {"hero_banner": "blocks/hero_banner_block.html", "theme_selector": "blocks/theme-selector-block.html"}
+        for name, template_name in templates.items():
+            with self.settings(STATIC_BUNDLES_ENABLED=True):
+                html = render_to_string(template_name, {"self": {}})
+            self.assertIn('href="/static/bundles/%s.min.css"' % name, html)
+            self.assertIn('src="/static/bundles/%s.min.js"' % name, html)
+
+
+class CriticalCSSTests(WagtailPageTestCase):
+    """
+    Tests for inlining the critical CSS of the first StreamField block.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+
+    def test_parse_and_filter_rules(self):
+        rules, _ = parse_rules(
+            ".a{color:red}.a:hover,.b{color:blue}.ajax-error{color:red}"
+            "@keyframes spin{to{opacity:1}}@media (max-width:480px){.a:focus{x:y}.c{z:0}}"
+        )
+        self.assertEqual(
+            serialize_critical_rules(rules),
+            ".a{color:red}.b{color:blue}@media (max-width:480px){.c{z:0}}",
+        )
+
+    def test_first_hero_block_css_is_inlined(self):
+        self.homepage.content = json.dumps([
+            {"type": "hero_carousel", "value": {"slides": [{"headline": "Welcome"}]}},
+            {"type": "stats", "value": {"stat": [{"value": "99%", "label": "Uptime"}]}},
+        ])
+        self.homepage.save()
+
+        response = self.client.get("/")
+        self.assertContains(response, "<style>.hero-carousel{")
+        self.assertNotContains(response, ".hero-carousel-control:hover")
+        self.assertContains(response, '<link rel="preload" as="style" href="/static/css/hero-carousel.css"')
+
+    def test_no_inlining_without_hero_block(self):
+        response = self.client.get("/")
+        self.assertNotContains(response, "<style>")
+        self.assertContains(response, '<link rel="stylesheet" type="text/css" href="/static/css/hero-carousel.css">')
+
+
+class PageCacheHeadersTests(WagtailPageTestCase):
+    """
+    Tests for the ETag, Last-Modified and Surrogate-Key headers on page responses.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.homepage.content = json.dumps([
+            {"type": "hero_banner", "value": {"headline": "Welcome", "background_image": 42}},
+        ])
+        self.homepage.save_revision().publish()
+        self.theme = ThemeSettings.objects.create(name="Default", is_active=True)
+
+    def test_validators_and_surrogate_keys(self):
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("ETag"))
+        self.assertTrue(response.has_header("Last-Modified"))
+        self.assertIn("s-maxage=86400", response["Cache-Control"])
+        self.assertEqual(
+            response["Surrogate-Key"].split(),
+            [
+                "page-%s" % self.homepage.pk,
+                "themesettings",
+                "themesettings-%s" % self.theme.pk,
+                "carouselsettings",
+                "videobackgroundsettings",
+                "image-42",
+            ],
+        )
+
+    def test_conditional_get_returns_304(self):
+        etag = self.client.get("/")["ETag"]
+        response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        self.homepage.save_revision().publish()
+        response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_settings_change_invalidates_etag(self):
+        etag = self.client.get("/")["ETag"]
+        self.theme.theme_mode = "dark"
+        self.theme.save()
+        self.assertNotEqual(self.client.get("/")["ETag"], etag)
+
+    def test_image_change_invalidates_etag(self):
+        etag = self.client.get("/")["ETag"]
+        stream_cache.bump_version(None)
+        self.assertNotEqual(self.client.get("/")["ETag"], etag)
+
+    def test_query_strings_are_not_publicly_cached(self):
+        response = self.client.get("/", {"page": "2"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_sessions_are_not_publicly_cached(self):
+        self.client.cookies["sessionid"] = "abc"
+        response = self.client.get("/")
+        self.assertFalse(response.has_header("ETag"))
+
+
+class BlockingPurgeBackend(BasePurgeBackend):
+    """Records purges once ``release`` is set."""
+
+    release = threading.Event()
+    purged = []
+
+    def purge(self, urls, keys):
+        self.release.wait(5)
+        self.purged.append((urls, keys))
+
+
+class CDNPurgeTests(WagtailPageTestCase):
+    """
+    Tests for queueing and dispatching CDN purges against the local stand-in.
+    """
+
+    def setUp(self):
+        # Drop anything left queued by other tests' rolled back transactions.
+        purge_queue.flush()
+        self.server = LocalPurgeServer().start()
+        self.addCleanup(self.server.stop)
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+
+    def purge_settings(self, **params):
+        backends = {"default": {"BACKEND": "home.purge.HTTPPurgeBackend", "LOCATION": self.server.url, **params}}
+        return self.settings(CDN_PURGE_BACKENDS=backends)
+
+    def test_publish_purges_page_url_and_key_once(self):
+        with self.purge_settings(), self.captureOnCommitCallbacks(execute=True):
+            self.homepage.save_revision().publish()
+            self.homepage.save_revision().publish()
+
+        purge_queue.join()
+        self.assertEqual(
+            self.server.received,
+            [
+                {"urls": [self.homepage.get_full_url()], "surrogate_keys": []},
+                {"urls": [], "surrogate_keys": ["page-%s" % self.homepage.pk]},
+            ],
+        )
+
+    def test_move_purges_old_and_new_urls(self):
+        section = self.homepage.add_child(instance=HomePage(title="Section", slug="section"))
+        page = self.homepage.add_child(instance=HomePage(title="About", slug="about"))
+        child = page.add_child(instance=HomePage(title="Team", slug="team"))
+        old_url = page.get_full_url()
+        with self.purge_settings(), self.captureOnCommitCallbacks(execute=True):
+            page.move(section, pos="last-child")
+
+        purge_queue.join()
+        page.refresh_from_db()
+        self.assertEqual(
+            self.server.received,
+            [
+                {"urls": sorted([old_url, page.get_full_url()]), "surrogate_keys": []},
+                {"urls": [], "surrogate_keys": sorted(["page-%s" % page.pk, "page-%s" % child.pk])},
+            ],
+        )
+
+    def test_image_change_purges_image_key(self):
+        image = sample_content.create_placeholder_image("Slide", width=8, height=8)
+        self.addCleanup(image.file.storage.delete, image.file.name)
+        purge_queue.flush()
+        with self.purge_settings(), self.captureOnCommitCallbacks(execute=True):
+            image.title = "Renamed"
+            image.save()
+
+        purge_queue.join()
+        self.assertEqual(self.server.received, [{"urls": [], "surrogate_keys": ["image-%s" % image.pk]}])
+
+    def test_settings_changes_are_batched(self):
+        with self.purge_settings(BATCH_SIZE=2), self.captureOnCommitCallbacks(execute=True):
+            theme = ThemeSettings.objects.create(name="Default")
+            theme.is_active = True
+            theme.save()
+
+        purge_queue.join()
+        self.assertEqual(
+            [batch["surrogate_keys"] for batch in self.server.received],
+            [["themesettings", "themesettings-%s" % theme.pk]],
+        )
+        self.assertEqual(len(purge_queue), 0)
+
+    def test_flush_does_not_wait_for_backends(self):
+        BlockingPurgeBackend.release.clear()
+        self.addCleanup(BlockingPurgeBackend.purged.clear)
+        with self.settings(CDN_PURGE_BACKENDS={"default": {"BACKEND": "home.tests.BlockingPurgeBackend"}}):
+            purge_queue.add(keys=["page-1"])
+            purge_queue.flush()
+        self.assertEqual(BlockingPurgeBackend.purged, [])
+        BlockingPurgeBackend.release.set()
+        purge_queue.join()
+        self.assertEqual(BlockingPurgeBackend.purged, [([], ["page-1"])])
+
+
+class RenderBenchmarkTests(WagtailPageTestCase):
+    """
+    Runs the HomePage render benchmark once, as a smoke test for CI.
+    """
+
+    def test_benchmark_command_writes_json_report(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        output = os.path.join(media_root, "benchmark.json")
+
+        with self.settings(MEDIA_ROOT=media_root):
+            call_command("benchmark_homepage", iterations=1, warmup=0, images=2, output=output, stdout=io.StringIO())
+
+        with open(output) as f:
+            report = json.load(f)
+        self.assertEqual(report["blocks"]["hero_carousel"]["count"], 2)
+        self.assertEqual(report["page"]["blocks"], 13)
+        self.assertIn("median", report["page"]["time_ms"])
+        self.assertGreater(report["page"]["allocated_bytes"], 0)
+        self.assertFalse(HomePage.objects.filter(title="Render benchmark").exists())
+
+
+class GenerateContentTests(WagtailPageTestCase):
+    """
+    Tests for the load-testing content generator.
+    """
+
+    def test_generates_valid_page_tree(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        homepage = HomePage.objects.get(slug="home", depth=2)
+        # The test database also has the runner's shared fixtures.
+        themes = ThemeSettings.objects.count()
+
+        with self.settings(MEDIA_ROOT=media_root):
+            call_command(
+                "generate_content", 11, fanout=4, images=2, themes=2, carousels=1,
+                video_backgrounds=1, seed=1, stdout=io.StringIO(),
+            )
+
+        # Page.find_problems() reports treebeard inconsistencies (bad paths,
+        # depths or numchild values).
+        self.assertEqual(sum(map(len, Page.find_problems())), 0)
+        pages = HomePage.objects.descendant_of(homepage).filter(slug__startswith="load-")
+        self.assertEqual(pages.count(), 11)
+        homepage.refresh_from_db()
+        self.assertEqual(homepage.get_children().filter(slug__startswith="load-").count(), 3)
+        self.assertEqual(ThemeSettings.objects.count() - themes, 2)
+
+        block_types = {block.block_type for page in pages for block in page.content}
+        self.assertEqual(len(block_types), 10)
+
+        leaf = pages.filter(depth=4).last()
+        response = self.client.get(leaf.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, leaf.title)
+
+
+class CarouselTrackingTests(WagtailPageTestCase):
+    """
+    Tests for the carousel analytics endpoint.
+    """
+
+    def test_accepts_tracking_events(self):
+        response = self.client.post(
+            reverse("carousel_track"),
+            json.dumps({"action": "view", "slideIndex": 2, "slideId": 2}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json(), {"status": "ok"})
+
+    def test_rejects_invalid_events(self):
+        for body in ("not json", "[]", json.dumps({"action": "delete", "slideIndex": 0})):
+            with self.subTest(body=body):
+                response = self.client.post(reverse("carousel_track"), body, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse("carousel_track")).status_code, 405)
+
+
+class CarouselSlideFeedTests(WagtailPageTestCase):
+    """
+    Tests for the hero carousel JSON slide feed.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.image = sample_content.create_placeholder_image("Slide", width=64, height=36)
+        self.addCleanup(self.image.file.storage.delete, self.image.file.name)
+        self.homepage.content = [sample_content.hero_carousel([self.image.pk], slide_count=2)]
+        self.homepage.content[0].value["slides"][0]["headline"] = "<Fast> & secure"
+        self.homepage.save_revision().publish()
+        self.block_id = self.homepage.content[0].id
+        self.url = reverse("carousel_slides", args=(self.homepage.pk, self.block_id))
+
+    def tearDown(self):
+        for rendition in self.image.renditions.all():
+            rendition.file.storage.delete(rendition.file.name)
+
+    def test_slides_with_renditions(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        slides = response.json()["slides"]
+        self.assertEqual(len(slides), 2)
+        self.assertEqual(slides[0]["headline"], "&lt;Fast&gt; &amp; secure")
+        self.assertEqual(sorted(slides[0]["backgroundImages"]), ["1280", "1920", "640"])
+        self.assertEqual(slides[0]["backgroundImage"], slides[0]["backgroundImages"]["1920"])
+        self.assertEqual(slides[0]["overlayOpacity"], 0.5)
+        self.assertIn("<p>", slides[0]["description"])
+        self.assertEqual(response["Surrogate-Key"], "page-%s image-%s" % (self.homepage.pk, self.image.pk))
+
+    def test_conditional_requests_and_caching(self):
+        etag = self.client.get(self.url)["ETag"]
+        # The view restrictions and the page, without its content.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Surrogate-Key"], "page-%s image-%s" % (self.homepage.pk, self.image.pk))
+
+        # Served from the cache until the page is published again.
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.homepage.save_revision().publish()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unknown_block_and_tracking(self):
+        missing = reverse("carousel_slides", args=(self.homepage.pk, "missing"))
+        self.assertEqual(self.client.get(missing).status_code, 404)
+        response = self.client.post(
+            self.url, json.dumps({"action": "view", "slideIndex": 0}), content_type="application/json"
+        )
+        self.assertEqual(response.json(), {"status": "ok"})
+
+
+class PageApiTests(WagtailPageTestCase):
+    """
+    Tests for the read-only JSON page API.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.image = sample_content.create_placeholder_image("Banner", width=64, height=36)
+        self.addCleanup(self.image.file.storage.delete, self.image.file.name)
+        self.homepage.content = [sample_content.hero_banner(self.image.pk), sample_content.stats()]
+        self.homepage.save_revision().publish()
+        self.url = reverse("page_api_detail", args=(self.homepage.pk,))
+
+    def test_sparse_fields_and_block_types(self):
+        data = self.client.get(self.url, {"fields": "title,content", "types": "stats"}).json()
+        self.assertEqual(sorted(data), ["content", "images", "title"])
+        self.assertEqual([block["type"] for block in data["content"]], ["stats"])
+        self.assertEqual(data["images"], {})
+
+        data = self.client.get(self.url, {"types": "hero_banner"}).json()
+        self.assertEqual(data["content"][0]["value"]["background_image"], self.image.pk)
+        self.assertEqual(data["images"][str(self.image.pk)]["width"], 64)
+
+        self.assertEqual(self.client.get(self.url, {"fields": "title,secret"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"types": "missing"}).status_code, 400)
+
+    def test_conditional_requests_and_caching(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(self.client.get(self.url, {"fields": "title"})["ETag"], etag)
+        # The view restrictions and the page, without its content.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Plus the request's site, for the page's URL.
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.homepage.title = "Renamed"
+        self.homepage.save_revision().publish()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Renamed")
+
+    def listing(self, **params):
+        response = self.client.get(reverse("page_api_listing"), params)
+        return json.loads(b"".join(response.streaming_content))["items"]
+
+    def test_listing_queries(self):
+        parent = self.homepage.add_child(instance=HomePage(title="Listing", slug="listing"))
+        for i in range(5):
+            page = parent.add_child(instance=HomePage(title="Listing %d" % i, slug="listing-%d" % i))
+            page.content = [sample_content.hero_banner(self.image.pk), sample_content.stats()]
+            page.save()
+        self.listing()
+        # The view restrictions, the pages' requested columns and the
+        # request's site, for the URLs.
+        with self.assertNumQueries(3):
+            self.listing()
+
+        # Plus the content and images of each batch of uncached pages, and the
+        # image lookups of the content blocks, whatever the number of pages.
+        with CaptureQueriesContext(connection) as cold:
+            items = self.listing(fields="id,title,content")
+        with self.assertNumQueries(3):
+            self.assertEqual(self.listing(fields="id,title,content"), items)
+        for i in range(5):
+            page = parent.add_child(instance=HomePage(title="More %d" % i, slug="more-%d" % i))
+            page.content = [sample_content.hero_banner(self.image.pk)]
+            page.save()
+        # Changing the image invalidates every page.
+        self.image.save()
+        with self.assertNumQueries(len(cold)):
+            self.listing(fields="id,content", types="stats")
+        item = next(item for item in items if item["title"] == "Listing 4")
+        self.assertEqual([block["type"] for block in item["content"]], ["hero_banner", "stats"])
+        self.assertEqual(list(item["images"]), [str(self.image.pk)])
+
+    def test_streamed_listing(self):
+        response = self.client.get(reverse("page_api_listing"), {"fields": "id,title"})
+        self.assertTrue(response.streaming)
+        items = json.loads(b"".join(response.streaming_content))["items"]
+        self.assertIn({"id": self.homepage.pk, "title": self.homepage.title}, items)
+        self.assertEqual(self.client.get(reverse("page_api_listing"), {"fields": "x"}).status_code, 400)
+
+
+class SitemapTests(WagtailPageTestCase):
+    """
+    Tests for the streamed sitemap.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.pages = [
+            self.homepage.add_child(instance=HomePage(title="Sitemap %d" % i, slug="sitemap-%d" % i))
+            for i in range(5)
+        ]
+        for page in self.pages:
+            page.save_revision().publish()
+        self.addCleanup(setattr, sitemap, "BATCH_SIZE", sitemap.BATCH_SIZE)
+        sitemap.BATCH_SIZE = 2
+
+    def get_xml(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode() if response.streaming else response.content.decode()
+
+    def locations(self, xml):
+        return re.findall(r"<loc>(.*?)</loc>", xml)
+
+    def test_single_sitemap(self):
+        urls = self.locations(self.get_xml(reverse("sitemap_index")))
+        self.assertEqual(len(urls), sitemap.get_pages().count())
+        self.assertEqual(len(set(urls)), len(urls))
+        self.assertIn(self.pages[0].get_full_url(), urls)
+
+    def test_index_of_chunks(self):
+        total = sitemap.get_pages().count()
+        with self.settings(SITEMAP_MAX_URLS=4):
+            chunk_urls = self.locations(self.get_xml(reverse("sitemap_index")))
+            self.assertEqual(len(chunk_urls), -(-total // 4))
+            urls = []
+            for chunk_url in chunk_urls:
+                chunk = self.locations(self.get_xml(chunk_url))
+                self.assertLessEqual(len(chunk), 4)
+                urls += chunk
+            self.assertEqual(len(set(urls)), total)
+            self.assertEqual(self.client.get(reverse("sitemap_chunk", args=(len(chunk_urls),))).status_code, 404)
+
+    def test_chunk_starts_in_one_query(self):
+        paths = list(sitemap.get_pages().values_list("path", flat=True))
+        for size in (1, 2, 4):
+            with self.settings(SITEMAP_MAX_URLS=size):
+                # The view restrictions, then the numbered pages.
+                with self.assertNumQueries(2):
+                    self.assertEqual(sitemap.chunk_starts(), paths[::size])
+
+    def test_chunks_cached_until_publish(self):
+        url = reverse("sitemap_index")
+        self.get_xml(url)
+        with self.assertNumQueries(0):
+            self.get_xml(url)
+
+        self.pages[0].unpublish()
+        self.assertNotIn(self.pages[0].get_full_url(), self.locations(self.get_xml(url)))
+
+
+class LoadTestTests(WagtailPageTestCase):
+    """
+    Runs the load-test harness in-process, as a smoke test.
+    """
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("home=3,track=1"), {"home": 3, "track": 1})
+        with self.assertRaises(ValueError):
+            parse_mix("admin=1")
+
+    def test_in_process_report(self):
+        report = run_loadtest(
+            WSGITransport(concurrency=1, application=WSGIHandler()),
+            requests=20,
+            concurrency=1,
+            mix={"home": 1, "search": 1, "track": 1},
+            seed=1,
+        )
+        self.assertEqual(report["requests"], 20)
+        self.assertEqual(report["errors"], 0, report["statuses"])
+        self.assertIn("GET /", report["urls"])
+        self.assertIn("POST /carousel/track/", report["urls"])
+        self.assertLessEqual(report["latency_ms"]["p50"], report["latency_ms"]["p99"])
+
+
+class ServerTimingTests(WagtailPageTestCase):
+    """
+    Tests for the Server-Timing header and sampled request metrics log.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.homepage.content = [sample_content.hero_banner(), sample_content.stats(), sample_content.stats()]
+        self.homepage.save_revision().publish()
+
+    def test_header_reports_request_breakdown(self):
+        with self.settings(SERVER_TIMING="all"):
+            response = self.client.get("/")
+
+        names = [entry.split(";")[0] for entry in response["Server-Timing"].split(", ")]
+        for name in ("total", "middleware", "app", "routing", "render", "db", "cache", "block.hero_banner"):
+            self.assertIn(name, names)
+        self.assertIn('block.stats;desc="2 rendered"', response["Server-Timing"])
+
+    def test_header_is_staff_only_by_default(self):
+        self.assertNotIn("Server-Timing", self.client.get("/"))
+
+        user = User.objects.create_user("editor", password="password", is_staff=True)
+        self.client.force_login(user)
+        self.assertIn("Server-Timing", self.client.get("/"))
+
+    def test_sampled_log_line(self):
+        with self.settings(SERVER_TIMING="off", REQUEST_METRICS_SAMPLE_RATE=1.0):
+            with self.assertLogs("it_consulting.request_metrics") as logs:
+                response = self.client.get("/")
+
+        self.assertNotIn("Server-Timing", response)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "wagtail_serve")
+        self.assertGreater(record["db"]["queries"], 0)
+        self.assertEqual(record["blocks"]["stats"]["count"], 2)
+
+
+class BlockProfilerTests(WagtailPageTestCase):
+    """
+    Tests for the sampling block render profiler and its admin reports.
+    """
+
+    def setUp(self):
+        block_profiler.drain()
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.homepage.content = [sample_content.hero_banner(), sample_content.service_cards([]), sample_content.stats()]
+        self.homepage.save_revision().publish()
+
+    def test_histogram_percentile(self):
+        histogram = [0] * 11
+        histogram[0], histogram[3] = 90, 10
+        self.assertEqual(histogram_percentile(histogram, 50), 1)
+        self.assertEqual(histogram_percentile(histogram, 95), 10)
+        self.assertIsNone(histogram_percentile([0] * 11, 95))
+
+    def test_samples_are_aggregated_per_block_type_and_page(self):
+        with self.settings(BLOCK_PROFILE_SAMPLE_RATE=1.0, BLOCK_PROFILE_FLUSH_INTERVAL=0):
+            self.client.get("/")
+            self.client.get("/")
+
+        stats = {row.block_type: row for row in BlockRenderStats.objects.filter(page=self.homepage)}
+        # Service cards nested in service_cards are counted as part of it.
+        self.assertEqual(set(stats), {"hero_banner", "service_cards", "stats"})
+        self.assertEqual(stats["hero_banner"].count, 2)
+        self.assertEqual(sum(stats["stats"].histogram), 2)
+        self.assertGreaterEqual(stats["stats"].max_ms * 2, stats["stats"].total_ms)
+
+    def test_unsampled_renders_are_not_recorded(self):
+        with self.settings(BLOCK_PROFILE_SAMPLE_RATE=0.0, BLOCK_PROFILE_FLUSH_INTERVAL=0):
+            self.client.get("/")
+        self.assertFalse(BlockRenderStats.objects.exists())
+
+    def test_admin_reports(self):
+        with self.settings(BLOCK_PROFILE_SAMPLE_RATE=1.0):
+            self.client.get("/")
+        block_profiler.flush()
+        self.login()
+
+        response = self.client.get(reverse("block_render_times_report"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "service_cards")
+
+        response = self.client.get(reverse("page_render_times_report"))
+        self.assertContains(response, self.homepage.title)
+        self.assertContains(response, reverse("wagtailadmin_pages:edit", args=(self.homepage.pk,)))
+
+        response = self.client.get(reverse("block_render_times_report") + "?export=csv")
+        self.assertIn("hero_banner", response.getvalue().decode())
+
+    def test_admin_reports_need_permission(self):
+        editor = User.objects.create_user("editor", password="password")
+        editor.user_permissions.add(Permission.objects.get(codename="access_admin"))
+        self.client.force_login(editor)
+        urls = [
+            reverse(name) for name in ("block_render_times_report", "page_render_times_report", "slow_operations_report")
+        ]
+        for url in urls:
+            self.assertNotEqual(self.client.get(url).status_code, 200)
+        self.assertNotContains(self.client.get(reverse("wagtailadmin_home")), "Slow operations")
+
+        editor.user_permissions.add(Permission.objects.get(codename="view_blockrenderstats"))
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertContains(self.client.get(reverse("wagtailadmin_home")), "Slow operations")
+
+
+class MetricsEndpointTests(WagtailPageTestCase):
+    """
+    Tests for the Prometheus metrics and the /metrics endpoint.
+    """
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_requires_staff_or_token(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], 'Bearer realm="metrics"')
+
+        with self.settings(METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 401)
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"# TYPE django_request_duration_seconds histogram", response.content)
+
+        self.login()
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    def test_request_and_http_cache_metrics(self):
+        labels = {"view": "wagtail_serve", "page_type": "home.HomePage", "method": "GET"}
+        requests = self.sample("django_request_duration_seconds_count", **labels)
+        queries = self.sample("django_db_queries_total", view="wagtail_serve")
+        revalidated = self.sample("cache_lookups_total", layer="http", result="hit")
+
+        response = self.client.get("/")
+        self.client.get("/", HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(self.sample("django_request_duration_seconds_count", **labels), requests + 2)
+        self.assertGreater(self.sample("django_db_queries_total", view="wagtail_serve"), queries)
+        self.assertEqual(self.sample("cache_lookups_total", layer="http", result="hit"), revalidated + 1)
+
+    def test_rendition_search_and_tracking_metrics(self):
+        renditions = self.sample("wagtail_image_renditions_generated_total")
+        searches = self.sample("site_search_duration_seconds_count")
+        views = self.sample("carousel_tracking_events_total", action="view")
+
+        image = sample_content.create_placeholder_image("Metrics", width=16, height=16)
+        self.addCleanup(image.file.storage.delete, image.file.name)
+        rendition = image.get_rendition("fill-8x8")
+        self.addCleanup(rendition.file.storage.delete, rendition.file.name)
+        self.client.get(reverse("search") + "?query=home")
+        self.client.post(
+            reverse("carousel_track"), json.dumps({"action": "view", "slideIndex": 0}), content_type="application/json"
+        )
+
+        self.assertEqual(self.sample("wagtail_image_renditions_generated_total"), renditions + 1)
+        self.assertEqual(self.sample("site_search_duration_seconds_count"), searches + 1)
+        self.assertEqual(self.sample("carousel_tracking_events_total", action="view"), views + 1)
+
+
+class SlowOperationLogTests(WagtailPageTestCase):
+    """
+    Tests for the slow query and render log and its admin viewer.
+    """
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir)
+        # Closes the log file once the settings are restored.
+        self.addCleanup(slowlog.configure_handler)
+        self.log_path = os.path.join(self.log_dir, "slow.jsonl")
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.homepage.content = [sample_content.hero_banner(), sample_content.stats()]
+        self.homepage.save_revision().publish()
+
+    def read_log(self):
+        with open(self.log_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_scrub_sql(self):
+        self.assertEqual(
+            slowlog.scrub_sql("SELECT \"t1\".\"id\" FROM t1 WHERE name = 'O''Brien' AND id IN (12, -3.5) LIMIT 21"),
+            "SELECT \"t1\".\"id\" FROM t1 WHERE name = ? AND id IN (?, ?) LIMIT ?",
+        )
+
+    def test_slow_operations_are_logged_with_attribution(self):
+        with self.settings(SLOW_LOG_PATH=self.log_path, SLOW_QUERY_MS=0, SLOW_RENDER_MS=0):
+            self.client.get("/")
+        entries = self.read_log()
+
+        self.assertEqual({entry["kind"] for entry in entries}, {"query", "block", "template"})
+        self.assertTrue(all(entry["path"] == "/" for entry in entries))
+        blocks = {entry["block_type"] for entry in entries if entry["kind"] == "block"}
+        self.assertEqual(blocks, {"hero_banner", "stats"})
+        template = next(entry for entry in entries if entry["kind"] == "template")
+        self.assertEqual(template["template"], "home/home_page.html")
+        self.assertEqual(template["page_id"], self.homepage.pk)
+
+        page_queries = [entry for entry in entries if entry["kind"] == "query" and entry["page_id"]]
+        self.assertTrue(page_queries)
+        # Only the SQL is logged, with its literals scrubbed; never the parameters.
+        self.assertTrue(all("%s" in entry["sql"] or "?" in entry["sql"] for entry in page_queries))
+        self.assertNotIn("params", page_queries[0])
+        self.assertTrue(any(entry["stack"] for entry in page_queries))
+
+    def test_fast_operations_are_not_logged(self):
+        with self.settings(SLOW_LOG_PATH=self.log_path, SLOW_QUERY_MS=10000, SLOW_RENDER_MS=10000):
+            self.client.get("/")
+        self.assertFalse(os.path.exists(self.log_path))
+
+    def test_external_rotation(self):
+        with self.settings(SLOW_LOG_PATH=self.log_path, SLOW_QUERY_MS=0, SLOW_RENDER_MS=10000):
+            self.client.get("/")
+            count = len(self.read_log())
+            os.rename(self.log_path, self.log_path + ".1")
+            self.client.get("/")
+            self.assertEqual(len(self.read_log()), count)
+            self.assertEqual(len(slowlog.read_entries()), count * 2)
+
+    def test_unwritable_log_is_skipped(self):
+        blocker = os.path.join(self.log_dir, "file")
+        open(blocker, "w").close()
+        with self.settings(SLOW_LOG_PATH=os.path.join(blocker, "slow.jsonl"), SLOW_QUERY_MS=0):
+            with self.assertLogs("it_consulting", "WARNING"):
+                self.assertEqual(self.client.get("/").status_code, 200)
+
+    def test_admin_viewer(self):
+        with self.settings(SLOW_LOG_PATH=self.log_path, SLOW_QUERY_MS=0, SLOW_RENDER_MS=10000):
+            self.client.get("/")
+            self.login()
+
+            response = self.client.get(reverse("slow_operations_report") + "?ordering=-duration_ms")
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, "SELECT")
+
+            response = self.client.get(reverse("slow_operations_report") + "?export=csv")
+            self.assertIn("query", response.getvalue().decode())
+
+
+class MigrateIfNeededTests(WagtailPageTestCase):
+    """
+    Tests for the migrate_if_needed startup command.
+    """
+
+    def run_command(self):
+        stdout = io.StringIO()
+        call_command("migrate_if_needed", verbosity=0, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_migrate_runs_until_fingerprint_is_stored(self):
+        self.assertNotIn("skipping migrate", self.run_command())
+        stored = MigrationFingerprint.objects.get(database="default")
+        self.assertEqual(len(stored.fingerprint), 64)
+        self.assertIn("skipping migrate", self.run_command())
+
+    def test_changed_migrations_are_applied(self):
+        self.run_command()
+        MigrationFingerprint.objects.update(fingerprint="stale")
+        self.assertNotIn("skipping migrate", self.run_command())
+
+        # Migrations recorded or unapplied by hand also invalidate it.
+        MigrationFingerprint.objects.update(applied_count=0)
+        self.assertNotIn("skipping migrate", self.run_command())
+        self.assertIn("skipping migrate", self.run_command())
+
+
+class TestRunnerFixturesTests(WagtailPageTestCase):
+    """
+    Tests for the shared fixtures seeded into the test database template.
+    """
+
+    def test_fixture_tree(self):
+        fixtures_root = HomePage.objects.get(slug=FIXTURES_SLUG, depth=2)
+        self.assertEqual(
+            HomePage.objects.descendant_of(fixtures_root).filter(slug__startswith="load-").count(), FIXTURE_PAGES
+        )
+        # Outside the site, so the site itself is unchanged.
+        self.assertIsNone(fixtures_root.get_url())
+        self.assertFalse(ThemeSettings.objects.filter(is_active=True).exists())
+
+
+class CompactStreamFieldTests(WagtailPageTestCase):
+    """
+    Tests for storing StructBlocks without their default values.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.full_content = [sample_content.hero_banner(), sample_content.hero_carousel([]), sample_content.theme_selector()]
+
+    def stored_content(self):
+        return list(HomePage.objects.filter(pk=self.homepage.pk).values_list("content", flat=True).get().raw_data)
+
+    def test_defaults_are_not_stored(self):
+        self.homepage.content = self.full_content
+        self.homepage.save()
+        # Force the blocks through to_python()/get_prep_value().
+        self.homepage.content = [(block.block_type, block.value) for block in self.homepage.content]
+        self.homepage.save()
+
+        stored = {item["type"]: item["value"] for item in self.stored_content()}
+        self.assertEqual(stored["hero_banner"]["layout_style"], "split")
+        self.assertNotIn("background_type", stored["hero_banner"])
+        self.assertNotIn("auto_rotate", stored["hero_carousel"])
+
+        self.homepage.refresh_from_db()
+        banner = self.homepage.content[0].value
+        self.assertEqual(banner["background_type"], "image")
+        self.assertEqual(banner["layout_style"], "split")
+        self.assertIs(self.homepage.content[1].value["auto_rotate"], True)
+
+    def test_command_compacts_content_and_revisions(self):
+        self.homepage.content = self.full_content
+        revision = self.homepage.save_revision()
+        revision.publish()
+        HomePage.objects.filter(pk=self.homepage.pk).update(content=self.full_content)
+        response = self.client.get("/")
+
+        stdout = io.StringIO()
+        call_command("compact_streamfields", stdout=stdout)
+
+        self.assertIn("home.HomePage: rewrote 1 of", stdout.getvalue())
+        self.assertIn("home.HomePage revisions: rewrote 1 of", stdout.getvalue())
+        self.assertNotIn("auto_rotate", self.stored_content()[1]["value"])
+        revision.refresh_from_db()
+        self.assertNotIn("auto_rotate", revision.content["content"])
+        # The carousel is rendered as a <dl> of its values, including a repr
+        # of the slides with object addresses.
+        rendered = [re.sub(rb"0x[0-9a-f]+", b"", r.content) for r in (response, self.client.get("/"))]
+        self.assertEqual(rendered[0], rendered[1])
+
+        stdout = io.StringIO()
+        call_command("compact_streamfields", stdout=stdout)
+        self.assertIn("home.HomePage: rewrote 0 of", stdout.getvalue())
+
+
+class RevisionRetentionTests(WagtailPageTestCase):
+    """
+    Tests for the prune_revisions command.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.homepage.content = [sample_content.hero_banner(), sample_content.theme_selector()]
+        self.revisions = []
+        for i in range(6):
+            self.homepage.title = "Home %d" % i
+            revision = self.homepage.save_revision()
+            if i == 1:
+                revision.publish()
+            self.revisions.append(revision)
+        Revision.objects.update(created_at=timezone.now() - timedelta(days=60))
+
+    def prune(self, *args):
+        stdout = io.StringIO()
+        call_command("prune_revisions", "--keep=2", "--max-age=30", "--compress-after=10", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_dry_run_reports_without_writing(self):
+        output = self.prune("--dry-run")
+        self.assertIn("Would delete 3 revisions", output)
+        self.assertEqual(Revision.objects.filter(object_id=str(self.homepage.pk)).count(), 6)
+        self.assertFalse(any(is_compressed(content) for content in Revision.objects.values_list("content", flat=True)))
+
+    def test_retention_and_compression(self):
+        self.assertIn("Did delete 3 revisions", self.prune())
+
+        # The published and two newest revisions are kept.
+        kept = list(Revision.objects.filter(object_id=str(self.homepage.pk)).order_by("pk"))
+        self.assertEqual([r.pk for r in kept], [self.revisions[i].pk for i in (1, 4, 5)])
+
+        # All but the latest are compressed, and decompressed when loaded.
+        stored = dict(Revision.objects.values_list("pk", "content"))
+        self.assertTrue(is_compressed(stored[self.revisions[1].pk]))
+        self.assertFalse(is_compressed(stored[self.revisions[5].pk]))
+        page = kept[0].as_object()
+        self.assertEqual(page.title, "Home 1")
+        self.assertEqual(page.content[0].block_type, "hero_banner")
+
+        self.login()
+        response = self.client.get(
+            reverse("wagtailadmin_pages:revisions_compare", args=(self.homepage.pk, kept[0].pk, kept[2].pk))
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Did delete 0 revisions", self.prune())
+
+    def test_commented_revision_is_kept(self):
+        user = User.objects.create_user("editor")
+        comment = Comment.objects.create(
+            page=self.homepage, user=user, text="Check this", contentpath="title", revision_created=self.revisions[2]
+        )
+        self.assertIn("Did delete 2 revisions", self.prune())
+        self.assertTrue(Revision.objects.filter(pk=self.revisions[2].pk).exists())
+        self.assertTrue(Comment.objects.filter(pk=comment.pk).exists())
+
+    def test_compaction_keeps_revisions_compressed(self):
+        self.prune()
+        stdout = io.StringIO()
+        call_command("compact_streamfields", stdout=stdout)
+        self.assertIn("home.HomePage revisions: rewrote 3 of 3", stdout.getvalue())
+        stored = Revision.objects.values_list("content", flat=True).get(pk=self.revisions[1].pk)
+        self.assertTrue(is_compressed(stored))
+        page = Revision.objects.get(pk=self.revisions[1].pk).as_object()
+        self.assertEqual(page.content[0].block_type, "hero_banner")
+
+
+class StreamValueCacheTests(WagtailPageTestCase):
+    """
+    Tests for the cross-request cache of deserialized StreamField values.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.image = sample_content.create_placeholder_image("Icon", width=8, height=8)
+        self.addCleanup(self.image.file.storage.delete, self.image.file.name)
+        self.homepage.content = [
+            sample_content.service_card(self.image.pk),
+            sample_content.hero_carousel([self.image.pk]),
+            sample_content.stats(),
+        ]
+        self.homepage.save_revision().publish()
+        self.homepage.refresh_from_db()
+
+    def cached(self):
+        field = HomePage._meta.get_field("content")
+        return stream_cache.get_cache().get(stream_cache.cache_key(self.homepage, field))
+
+    def test_freeze_thaw_round_trip(self):
+        block = HomePage._meta.get_field("content").stream_block
+        value = self.homepage.content
+        thawed = stream_cache.thaw(block, stream_cache.freeze(block, value))
+        self.assertEqual(block.get_prep_value(thawed), block.get_prep_value(value))
+        self.assertEqual(thawed[0].value["icon"], self.image)
+
+    def test_second_request_is_served_from_cache(self):
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get("/")
+        self.assertIsNotNone(self.cached())
+        with CaptureQueriesContext(connection) as second:
+            cached_response = self.client.get("/")
+        self.assertLess(len(second), len(first))
+        strip = functools.partial(re.sub, r"0x[0-9a-f]+", "")
+        self.assertEqual(strip(cached_response.content.decode()), strip(response.content.decode()))
+
+    def test_saving_page_invalidates(self):
+        self.client.get("/")
+        self.homepage.save()
+        self.assertIsNone(self.cached())
+
+    def test_image_change_invalidates(self):
+        self.client.get("/")
+        self.image.title = "Renamed"
+        self.image.save()
+        self.assertIsNone(self.cached())
+
+    def test_preview_is_not_cached(self):
+        self.homepage.content = [sample_content.stats()]
+        self.homepage.save_revision()
+        self.login()
+        response = self.client.get(reverse("wagtailadmin_pages:view_draft", args=(self.homepage.pk,)))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.cached())
+
+    def test_shared_cache_check(self):
+        self.assertEqual([e.id for e in check_stream_cache_shared(None)], ["home.W001"])
+        with tempfile.TemporaryDirectory() as location:
+            shared = {"BACKEND": "it_consulting.instrumentation.InstrumentedFileBasedCache", "LOCATION": location}
+            with self.settings(CACHES={**settings.CACHES, "streamfield": shared}, STREAMFIELD_CACHE_ALIAS="streamfield"):
+                self.assertEqual(check_stream_cache_shared(None), [])
+
+
+class RichTextExpansionTests(WagtailPageTestCase):
+    """
+    Tests for expanding a page's rich text in bulk.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.targets = [
+            self.homepage.add_child(instance=HomePage(title="Target %d" % i, slug="target-%d" % i))
+            for i in range(3)
+        ]
+
+    def link(self, page):
+        return '<p><a linktype="page" id="%d">%s</a></p>' % (page.pk, page.title)
+
+    def test_links_are_expanded_in_bulk_and_cached(self):
+        sources = [self.link(page) for page in self.targets]
+        rich_text.expand_many([self.link(self.homepage)])  # Warm the site root paths.
+        # One query for the pages' types and one for the specific pages.
+        with self.assertNumQueries(2):
+            expanded = rich_text.expand_many(sources)
+        self.assertEqual(expanded[sources[1]], '<p><a href="/target-1/">Target 1</a></p>')
+        with self.assertNumQueries(0):
+            self.assertEqual(rich_text.expand_many(sources), expanded)
+
+    def test_page_render_uses_expanded_rich_text(self):
+        banner = sample_content.hero_banner()
+        banner["value"]["description"] = self.link(self.targets[0])
+        carousel = sample_content.hero_carousel([], slide_count=2)
+        for i, slide in enumerate(carousel["value"]["slides"]):
+            slide["value"]["description"] = self.link(self.targets[i + 1])
+        self.homepage.content = [banner, carousel]
+        self.homepage.save_revision().publish()
+
+        rich_text.expand_rich_text(self.homepage)
+        slides = self.homepage.content[1].value["slides"]
+        self.assertEqual(
+            [slide["description"].html for slide in slides],
+            ['<p><a href="/target-1/">Target 1</a></p>', '<p><a href="/target-2/">Target 2</a></p>'],
+        )
+        self.assertContains(self.client.get("/"), '<a href="/target-0/">Target 0</a>')
+
+        # Moving a linked page changes the expanded HTML.
+        self.targets[0].move(self.targets[1], pos="last-child")
+        self.assertContains(self.client.get("/"), '<a href="/target-1/target-0/">Target 0</a>')
+
+
+class EditorPayloadTests(WagtailPageTestCase):
+    """
+    Tests for the shared choice blocks and widgets in the editor's block
+    definitions.
+    """
+
+    def test_equal_widgets_are_packed_once(self):
+        definitions = pack_block_definitions(HomePage._meta.get_field("content").stream_block)
+        # Five CTA style fields use ButtonStyleBlock.
+        self.assertEqual(definitions.count('value=\\"ghost\\"'), 1)
+
+    def test_shared_choice_blocks_deconstruct_to_choice_block(self):
+        name, args, kwargs = ButtonStyleBlock(default="primary").deconstruct()
+        self.assertEqual(name, "wagtail.blocks.ChoiceBlock")
+        self.assertEqual(kwargs["choices"], ButtonStyleBlock.choices)
+
+    def test_shared_choice_blocks_share_widgets(self):
+        widget = ButtonStyleBlock(default="primary").field.widget
+        self.assertIs(ButtonStyleBlock(default="outline").field.widget, widget)
+        # A blank choice is added without a default, so the choices differ.
+        self.assertIsNot(ButtonStyleBlock().field.widget, widget)
+
+    def test_no_pending_migrations(self):
+        call_command("makemigrations", "home", check=True, dry_run=True, stdout=io.StringIO())
+
+    def test_benchmark_command_writes_json_report(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        output = os.path.join(media_root, "benchmark.json")
+
+        with self.settings(MEDIA_ROOT=media_root):
+            call_command("benchmark_editor", iterations=1, warmup=0, images=1, output=output, stdout=io.StringIO())
+
+        with open(output) as f:
+            report = json.load(f)
+        self.assertGreater(report["definitions"]["bytes"], 0)
+        self.assertIn("median", report["edit_view"]["time_ms"])
+        self.assertFalse(HomePage.objects.filter(title="Render benchmark").exists())
+
+
+class IncrementalPreviewTests(WagtailPageTestCase):
+    """
+    Tests for re-rendering only the changed blocks of a preview.
+    """
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.content = [sample_content.hero_banner(), sample_content.stats(), sample_content.theme_selector()]
+        self.request = RequestFactory().get("/")
+        self.request.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+
+    def preview(self, headline="Technology consulting that scales with you", title="Home"):
+        self.content[0]["value"]["headline"] = headline
+        self.homepage.title = title
+        self.homepage.content = json.dumps(self.content)
+        return self.homepage.make_preview_request(self.request, "")
+
+    def test_changed_blocks_are_spliced_into_previous_preview(self):
+        self.assertEqual(self.preview()["X-Preview-Render"], "full")
+
+        response = self.preview(headline="Updated headline")
+        self.assertEqual(response["X-Preview-Render"], "incremental")
+        self.assertContains(response, "Updated headline")
+        self.assertNotContains(response, "Technology consulting that scales with you")
+        with self.settings(INCREMENTAL_PREVIEW_ENABLED=False):
+            full = self.preview(headline="Updated headline").render()
+        strip = functools.partial(re.sub, r"0x[0-9a-f]+", "")
+        self.assertEqual(strip(response.content.decode()), strip(full.content.decode()))
+
+    def test_other_changes_render_the_whole_page(self):
+        self.preview()
+        self.assertEqual(self.preview(title="Renamed")["X-Preview-Render"], "full")
+        self.content.pop()
+        self.assertEqual(self.preview(title="Renamed")["X-Preview-Render"], "full")
+
+    def test_dependency_changes_render_the_whole_page(self):
+        self.preview()
+        theme = ThemeSettings.objects.create(name="Default", is_active=True)
+        self.assertEqual(self.preview()["X-Preview-Render"], "full")
+        theme.save()
+        self.assertEqual(self.preview()["X-Preview-Render"], "full")
+        self.homepage.add_child(instance=HomePage(title="Linked", slug="linked"))
+        self.assertEqual(self.preview()["X-Preview-Render"], "full")
+        image = sample_content.create_placeholder_image("Banner", width=8, height=8)
+        self.addCleanup(image.file.storage.delete, image.file.name)
+        self.assertEqual(self.preview()["X-Preview-Render"], "full")
+        self.assertEqual(self.preview()["X-Preview-Render"], "incremental")
+
+    def test_live_page_has_no_markers(self):
+        self.homepage.content = json.dumps(self.content)
+        self.homepage.save_revision().publish()
+        self.assertNotContains(self.client.get("/"), "preview-block")
+
+
+class QueryBudgetTests(WagtailPageTestCase):
+    """
+    Guards against N+1 regressions: the number of queries for page rendering
+    and the snippet admin listings must not grow with the amount of content.
+    """
+
+    SIZES = (1, 10, 100)
+
+    def setUp(self):
+        self.homepage = HomePage.objects.get(slug="home", depth=2)
+        self.image = sample_content.create_placeholder_image("Icon", width=8, height=8)
+        self.addCleanup(self.image.file.storage.delete, self.image.file.name)
+
+    def assertQueryBudget(self, budget, url, grow):
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                grow(size)
+                # Warm per-process caches (e.g. site root paths) first.
+                self.client.get(url)
+                with self.assertNumQueries(budget):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_homepage_render(self):
+        def grow(size):
+            self.homepage.content = (
+                [sample_content.service_card(self.image.pk) for _ in range(size)]
+                + [sample_content.hero_carousel([self.image.pk]) for _ in range(size)]
+                + [sample_content.stats() for _ in range(size)]
+            )
+            self.homepage.save_revision().publish()
+
+        # Content is deserialized once per published revision (see
+        # home.stream_cache), so the warm-up request leaves nothing to load.
+        self.assertQueryBudget(9, "/", grow)
+
+    def test_homepage_snippet_listing(self):
+        def grow(size):
+            for i in range(HomePage.objects.count(), size + 1):
+                self.homepage.add_child(instance=HomePage(title="Page %d" % i))
+
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        self.assertQueryBudget(8, reverse("wagtailsnippets_home_homepage:list"), grow)
+
+    def test_theme_settings_snippet_listing(self):
+        def grow(size):
+            for i in range(ThemeSettings.objects.count(), size):
+                ThemeSettings.objects.create(name="Theme %d" % i)
+
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        self.assertQueryBudget(8, reverse("wagtailsnippets_home_themesettings:list"), grow)
@@ -0,0 +1,320 @@
+import json
+import logging
+
+import django_filters
+from django.conf import settings
+from django.db.models import ExpressionWrapper, F, FloatField, Max, Sum
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods, require_POST
+from wagtail.admin.filters import WagtailFilterSet
+from wagtail.admin.ui.tables import Column, TitleColumn
+from wagtail.admin.views.reports import ReportView
+from wagtail.permission_policies import ModelPermissionPolicy
+
+from home import page_api, sitemap
+from home.carousel_feed import feed_etag, get_slides_payload
+from home.http_cache import DEFAULT_PAGE_CACHE_CONTROL, image_surrogate_key, page_surrogate_key
+from home.models import BlockRenderStats, HomePage
+from home.profiling import histogram_percentile, merge_histograms
+from it_consulting import slowlog
+from it_consulting.metrics import CAROUSEL_EVENTS
+
+logger = logging.getLogger("home.carousel")
+
+TRACKED_ACTIONS = {"view", "click"}
+
+
+@csrf_exempt
+@require_POST
+def carousel_track(request):
+    """
+    Default ``ajax_url`` target for hero carousel analytics: accepts the JSON
+    events posted by ``hero-carousel.js`` and logs them. Exempt from CSRF as
+    it's an anonymous beacon that changes no state.
+    """
+    try:
+        data = json.loads(request.body)
+        action = str(data["action"])
+        slide_index = int(data["slideIndex"])
+    except (ValueError, TypeError, KeyError):
+        return HttpResponseBadRequest("Expected a JSON object with action and slideIndex.")
+
+    if action not in TRACKED_ACTIONS:
+        return HttpResponseBadRequest("Unknown action.")
+
+    CAROUSEL_EVENTS.labels(action).inc()
+    logger.info(
+        "Carousel %s", action,
+        extra={"slide_index": slide_index, "slide_id": data.get("slideId"), "path": request.headers.get("Referer")},
+    )
+    return JsonResponse({"status": "ok"})
+
+
+@csrf_exempt
+@require_http_methods(["GET", "HEAD", "POST"])
+def carousel_slides(request, page_id, block_id):
+    """
+    Slides of a live page's hero carousel block as JSON (see
+    ``home.carousel_feed``), for use as the carousel's ``ajax_url``. The
+    tracking events ``hero-carousel.js`` posts to the same URL are handled
+    like ``carousel_track``.
+    """
+    if request.method == "POST":
+        return carousel_track(request)
+
+    # The content is only loaded if the slides aren't cached.
+    page = get_object_or_404(HomePage.objects.live().public().defer_streamfields(), pk=page_id)
+    etag = feed_etag(page, block_id)
+    # Loaded for 304s too, usually from the cache, as a CDN revalidating its
+    # copy takes the Surrogate-Key header from the 304.
+    feed = get_slides_payload(page, block_id)
+    if feed is None:
+        raise Http404("No carousel block with this id.")
+    payload, image_ids = feed
+    response = get_conditional_response(request, etag=etag) or JsonResponse(payload)
+    response["ETag"] = etag
+    response["Surrogate-Key"] = " ".join(
+        [page_surrogate_key(page.pk)] + [image_surrogate_key(image_id) for image_id in image_ids]
+    )
+    patch_cache_control(response, **getattr(settings, "PAGE_CACHE_CONTROL", DEFAULT_PAGE_CACHE_CONTROL))
+    return response
+
+
+def page_api_params(request, default_fields):
+    """Return the ``(fields, types)`` asked for in the query string."""
+    fields = request.GET.get("fields")
+    fields = page_api.parse_list(fields, page_api.FIELDS, "fields") if fields else list(default_fields)
+    types = page_api.parse_list(request.GET.get("types", ""), page_api.block_types(), "block types")
+    return fields, types
+
+
+@require_http_methods(["GET", "HEAD"])
+def page_api_listing(request):
+    """
+    Live public ``HomePage``s as ``{"items": [...]}``, streamed one page at a
+    time. Items have ``page_api.DEFAULT_LISTING_FIELDS`` unless ``?fields=``
+    lists others; ``?types=`` limits ``content`` to those block types.
+    """
+    try:
+        fields, types = page_api_params(request, page_api.DEFAULT_LISTING_FIELDS)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    pages = HomePage.objects.live().public().only(*page_api.columns(fields)).order_by("path")
+
+    def stream():
+        yield '{"items": ['
+        items = page_api.listing_items(pages.iterator(chunk_size=page_api.BATCH_SIZE), fields, types, request)
+        for index, item in enumerate(items):
+            yield ("," if index else "") + json.dumps(item, cls=DjangoJSONEncoder)
+        yield "]}"
+
+    response = StreamingHttpResponse(stream(), content_type="application/json")
+    patch_cache_control(response, **getattr(settings, "PAGE_CACHE_CONTROL", DEFAULT_PAGE_CACHE_CONTROL))
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+def page_api_detail(request, page_id):
+    """
+    A live public ``HomePage`` as JSON, with all its fields unless
+    ``?fields=`` lists some, and ``?types=`` as for ``page_api_listing``.
+    """
+    try:
+        fields, types = page_api_params(request, page_api.FIELDS)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    # The content is only loaded if the page's data isn't cached.
+    page = get_object_or_404(HomePage.objects.live().public().defer_streamfields(), pk=page_id)
+    etag = page_api.etag(page, fields, types)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(page_api.select(page_api.serialize_page(page, request), fields, types))
+    response["ETag"] = etag
+    response["Surrogate-Key"] = page_surrogate_key(page.pk)
+    patch_cache_control(response, **getattr(settings, "PAGE_CACHE_CONTROL", DEFAULT_PAGE_CACHE_CONTROL))
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+def sitemap_index(request):
+    """
+    The sitemap of the live public pages (see ``home.sitemap``), or a sitemap
+    index of ``sitemap_chunk`` URLs if there are more than
+    ``SITEMAP_MAX_URLS``.
+    """
+    starts = sitemap.chunk_starts()
+    if not starts:
+        response = HttpResponse(sitemap.URLSET_START + sitemap.URLSET_END, content_type="application/xml")
+    elif len(starts) == 1:
+        response = StreamingHttpResponse(sitemap.stream_chunk(0, request), content_type="application/xml")
+    else:
+        chunk_urls = [
+            request.build_absolute_uri(reverse("sitemap_chunk", args=(index,))) for index in range(len(starts))
+        ]
+        response = HttpResponse(sitemap.index_xml(chunk_urls), content_type="application/xml")
+    patch_cache_control(response, **getattr(settings, "PAGE_CACHE_CONTROL", DEFAULT_PAGE_CACHE_CONTROL))
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+def sitemap_chunk(request, index):
+    """One chunk of a sitemap split by ``sitemap_index``, streamed."""
+    if index >= len(sitemap.chunk_starts()):
+        raise Http404("No such sitemap.")
+    response = StreamingHttpResponse(sitemap.stream_chunk(index, request), content_type="application/xml")
+    patch_cache_control(response, **getattr(settings, "PAGE_CACHE_CONTROL", DEFAULT_PAGE_CACHE_CONTROL))
+    return response
+
+
+class BlockRenderStatsFilterSet(WagtailFilterSet):
+    day = django_filters.DateFromToRangeFilter(label="Day")
+
+    class Meta:
+        model = BlockRenderStats
+        fields = ["day"]
+
+
+# The performance reports need the "view" permission on BlockRenderStats,
+# which superusers have.
+performance_permission_policy = ModelPermissionPolicy(BlockRenderStats)
+
+
+class BaseRenderTimesReportView(ReportView):
+    """
+    Sampled render times from ``BlockRenderStats`` (see ``home.profiling``),
+    grouped by ``group_field`` and slowest first.
+    """
+
+    permission_policy = performance_permission_policy
+    permission_required = "view"
+    header_icon = "time"
+    filterset_class = BlockRenderStatsFilterSet
+    default_ordering = "-time_ms"
+    group_field = None
+    stat_columns = [
+        Column("renders", label="Sampled renders", sort_key="renders"),
+        Column("mean_ms", label="Mean (ms)", sort_key="mean_ms"),
+        Column("p95_ms", label="p95 (ms, bucket bound)"),
+        Column("worst_ms", label="Max (ms)", sort_key="worst_ms"),
+        Column("time_ms", label="Total (ms)", sort_key="time_ms"),
+    ]
+    stat_export = ["renders", "mean_ms", "p95_ms", "worst_ms", "time_ms"]
+
+    def get_group_fields(self):
+        return [self.group_field]
+
+    def get_base_queryset(self):
+        return (
+            BlockRenderStats.objects.values(*self.get_group_fields())
+            .annotate(
+                renders=Sum("count"),
+                time_ms=Sum("total_ms"),
+                worst_ms=Max("max_ms"),
+                mean_ms=ExpressionWrapper(F("time_ms") / F("renders"), output_field=FloatField()),
+            )
+            .order_by()
+        )
+
+    def get_table(self, object_list):
+        rows = list(object_list)
+        keys = [row[self.group_field] for row in rows]
+
+        # The p95 needs the histograms, which can't be summed in SQL.
+        histograms, block_types = {}, {}
+        stats = self.filter_queryset(BlockRenderStats.objects.filter(**{"%s__in" % self.group_field: keys}))
+        for key, block_type, histogram in stats.values_list(self.group_field, "block_type", "histogram"):
+            histograms.setdefault(key, []).append(histogram)
+            block_types.setdefault(key, set()).add(block_type)
+
+        for row in rows:
+            key = row[self.group_field]
+            row["p95_ms"] = histogram_percentile(merge_histograms(histograms.get(key, [])), 95)
+            row["block_types"] = ", ".join(sorted(block_types.get(key, ())))
+            for name in ("mean_ms", "worst_ms", "time_ms"):
+                row[name] = round(row[name], 2)
+        return super().get_table(rows)
+
+
+class BlockRenderTimesReportView(BaseRenderTimesReportView):
+    page_title = "Block render times"
+    index_url_name = "block_render_times_report"
+    index_results_url_name = "block_render_times_report_results"
+    group_field = "block_type"
+    columns = [
+        Column("block_type", label="Block type", sort_key="block_type"),
+    ] + BaseRenderTimesReportView.stat_columns
+    list_export = ["block_type"] + BaseRenderTimesReportView.stat_export
+
+
+class PageRenderTimesReportView(BaseRenderTimesReportView):
+    page_title = "Page render times"
+    index_url_name = "page_render_times_report"
+    index_results_url_name = "page_render_times_report_results"
+    group_field = "page"
+    columns = [
+        TitleColumn(
+            "page__title",
+            label="Page",
+            sort_key="page__title",
+            get_url=lambda row: reverse("wagtailadmin_pages:edit", args=(row["page"],)),
+        ),
+        Column("block_types", label="Block types"),
+    ] + BaseRenderTimesReportView.stat_columns
+    list_export = ["page__title", "block_types"] + BaseRenderTimesReportView.stat_export
+
+    def get_group_fields(self):
+        return ["page", "page__title"]
+
+
+class SlowOperationsReportView(ReportView):
+    """
+    The newest entries of the slow operation log (see
+    ``it_consulting.slowlog``), read from this server's log files. The CSV
+    and XLSX exports include the stack.
+    """
+
+    permission_policy = performance_permission_policy
+    permission_required = "view"
+    page_title = "Slow operations"
+    header_icon = "warning"
+    index_url_name = "slow_operations_report"
+    index_results_url_name = "slow_operations_report_results"
+    default_ordering = "-timestamp"
+    max_entries = 1000
+    columns = [
+        Column("timestamp", label="Time (UTC)", sort_key="timestamp"),
+        Column("kind", label="Kind", sort_key="kind"),
+        Column("duration_ms", label="Duration (ms)", sort_key="duration_ms"),
+        Column("path", label="Path"),
+        Column("page_id", label="Page ID"),
+        Column("block_type", label="Block type", sort_key="block_type"),
+        Column("operation", label="SQL / template"),
+        Column("location", label="Code location"),
+    ]
+    list_export = [
+        "timestamp", "kind", "duration_ms", "path", "page_id", "block_type", "operation", "location", "stack",
+    ]
+
+    def get_base_queryset(self):
+        entries = slowlog.read_entries(limit=self.max_entries)
+        for entry in entries:
+            entry["operation"] = entry.get("sql") or entry.get("template") or ""
+            stack = entry.get("stack") or []
+            entry["location"] = stack[-1] if stack else ""
+            entry["stack"] = "\n".join(stack)
+        return entries
+
+    def order_queryset(self, queryset):
+        field = self.ordering.lstrip("-")
+        return sorted(
+            queryset,
+            key=lambda entry: (entry.get(field) is not None, entry.get(field) or 0),
+            reverse=self.ordering.startswith("-"),
+        )
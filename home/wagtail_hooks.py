@@ -0,0 +1,83 @@
+import time
+
+from django.urls import path, reverse
+from wagtail import hooks
+from wagtail.admin.menu import MenuItem
+
+from home import views
+from home.http_cache import serve_page_with_validators
+from it_consulting.instrumentation import get_current_metrics
+
+
+@hooks.register("on_serve_page")
+def conditional_page_response(next_serve_page):
+    """Answer conditional requests with a 304 and add cache validators."""
+
+    def inner(page, request, serve_args, serve_kwargs):
+        return serve_page_with_validators(
+            next_serve_page, page, request, serve_args, serve_kwargs
+        )
+
+    return inner
+
+
+@hooks.register("before_serve_page")
+def record_routing_time(page, request, serve_args, serve_kwargs):
+    """Report the time from the start of the view to here (site lookup and
+    page routing) as the ``routing`` Server-Timing entry, and the page type
+    and id for the request metrics and slow operation log."""
+    metrics = get_current_metrics()
+    if metrics is not None and metrics.view_start is not None:
+        metrics.add_timing("routing", time.perf_counter() - metrics.view_start)
+        metrics.page_type = page._meta.label
+        metrics.page_id = page.pk
+
+
+@hooks.register("register_admin_urls")
+def register_render_times_report_urls():
+    return [
+        path("reports/block-render-times/", views.BlockRenderTimesReportView.as_view(), name="block_render_times_report"),
+        path(
+            "reports/block-render-times/results/",
+            views.BlockRenderTimesReportView.as_view(results_only=True),
+            name="block_render_times_report_results",
+        ),
+        path("reports/page-render-times/", views.PageRenderTimesReportView.as_view(), name="page_render_times_report"),
+        path(
+            "reports/page-render-times/results/",
+            views.PageRenderTimesReportView.as_view(results_only=True),
+            name="page_render_times_report_results",
+        ),
+        path("reports/slow-operations/", views.SlowOperationsReportView.as_view(), name="slow_operations_report"),
+        path(
+            "reports/slow-operations/results/",
+            views.SlowOperationsReportView.as_view(results_only=True),
+            name="slow_operations_report_results",
+        ),
+    ]
+
+
+class PerformanceReportMenuItem(MenuItem):
+    def is_shown(self, request):
+        return views.performance_permission_policy.user_has_permission(request.user, "view")
+
+
+@hooks.register("register_reports_menu_item")
+def register_block_render_times_menu_item():
+    return PerformanceReportMenuItem(
+        "Block render times", reverse("block_render_times_report"), icon_name="time", order=1000
+    )
+
+
+@hooks.register("register_reports_menu_item")
+def register_page_render_times_menu_item():
+    return PerformanceReportMenuItem(
+        "Page render times", reverse("page_render_times_report"), icon_name="time", order=1001
+    )
+
+
+@hooks.register("register_reports_menu_item")
+def register_slow_operations_menu_item():
+    return PerformanceReportMenuItem(
+        "Slow operations", reverse("slow_operations_report"), icon_name="warning", order=1002
+    )
@@ -0,0 +1,365 @@
+"""
+Pure-Python minification and bundling of the site's CSS and JavaScript.
+
+Bundles are declared in the ``STATIC_BUNDLES`` setting, one entry per block
+family, and are built during ``collectstatic`` by
+``it_consulting.storage.BundledStaticFilesMixin``. Each bundle is written as
+``bundles/<name>.min.<kind>`` together with a version 3 source map pointing
+back at the original files.
+
+The minifiers are deliberately conservative: they remove comments and
+redundant whitespace but never rewrite identifiers, and the JavaScript
+minifier keeps line breaks so automatic semicolon insertion behaves exactly
+as it does in the source.
+"""
+
+import json
+import posixpath
+
+from django.conf import settings
+
+BUNDLE_KINDS = ("css", "js")
+
+_BASE64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+# Characters that never need whitespace around them in CSS.
+_CSS_TIGHT = "{};,>"
+
+# A "/" after one of these starts a regular expression literal rather than a
+# division.
+_JS_REGEX_AFTER_PUNCT = set("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_AFTER_WORDS = {
+    "await", "case", "delete", "do", "else", "in", "instanceof", "new",
+    "of", "return", "throw", "typeof", "void", "yield",
+}
+
+
+def get_bundles():
+    return getattr(settings, "STATIC_BUNDLES", {})
+
+
+def bundle_path(name, kind):
+    """Return the static path of a bundle, e.g. ``bundles/hero.min.css``."""
+    return "bundles/%s.min.%s" % (name, kind)
+
+
+def _vlq(value):
+    value = ((-value) << 1) | 1 if value < 0 else value << 1
+    encoded = ""
+    while True:
+        digit = value & 31
+        value >>= 5
+        if value:
+            digit |= 32
+        encoded += _BASE64[digit]
+        if not value:
+            return encoded
+
+
+class SourceMap:
+    """Collects mapping segments and serializes a version 3 source map."""
+
+    def __init__(self, file):
+        self.file = file
+        self.sources = []
+        self.segments = []
+
+    def add_source(self, source):
+        self.sources.append(source)
+        return len(self.sources) - 1
+
+    def add(self, generated_line, generated_column, source, line, column):
+        self.segments.append((generated_line, generated_column, source, line, column))
+
+    def serialize_mappings(self):
+        lines = []
+        previous_generated_column = 0
+        previous_source = previous_line = previous_column = 0
+        for generated_line, generated_column, source, line, column in sorted(self.segments):
+            while len(lines) <= generated_line:
+                lines.append([])
+                previous_generated_column = 0
+            segment = (
+                _vlq(generated_column - previous_generated_column)
+                + _vlq(source - previous_source)
+                + _vlq(line - previous_line)
+                + _vlq(column - previous_column)
+            )
+            lines[generated_line].append(segment)
+            previous_generated_column = generated_column
+            previous_source, previous_line, previous_column = source, line, column
+        return ";".join(",".join(segments) for segments in lines)
+
+    def as_json(self):
+        return json.dumps(
+            {
+                "version": 3,
+                "file": self.file,
+                "sources": self.sources,
+                "names": [],
+                "mappings": self.serialize_mappings(),
+            }
+        )
+
+
+class _Output:
+    """Minified output buffer that records where each source line lands."""
+
+    def __init__(self):
+        self.parts = []
+        self.line = 0
+        self.column = 0
+        self.last = ""
+        self.segments = []
+        self._mapped_line = None
+
+    def write(self, text, source_line, source_column):
+        if source_line != self._mapped_line:
+            self.segments.append((self.line, self.column, source_line, source_column))
+            self._mapped_line = source_line
+        self.parts.append(text)
+        newlines = text.count("\n")
+        if newlines:
+            # Multi-line tokens (template literals) keep their line structure.
+            for offset in range(1, newlines + 1):
+                self.segments.append((self.line + offset, 0, source_line + offset, 0))
+            self.line += newlines
+            self.column = len(text) - text.rfind("\n") - 1
+            self._mapped_line = source_line + newlines
+        else:
+            self.column += len(text)
+        self.last = text[-1]
+
+    def drop_last_char(self):
+        self.parts[-1] = self.parts[-1][:-1]
+        self.column -= 1
+
+    def newline(self):
+        if self.parts and self.last != "\n":
+            self.parts.append("\n")
+            self.line += 1
+            self.column = 0
+            self.last = "\n"
+            self._mapped_line = None
+
+    def getvalue(self):
+        return "".join(self.parts).rstrip("\n")
+
+
+def _scan_quoted(source, start):
+    """Return the index just past the string literal starting at ``start``."""
+    quote = source[start]
+    index = start + 1
+    while index < len(source):
+        char = source[index]
+        if char == "\\":
+            index += 2
+            continue
+        index += 1
+        if char == quote or (char == "\n" and quote != "`"):
+            break
+    return index
+
+
+def _scan_template(source, start):
+    """Return the index just past the template literal starting at ``start``."""
+    index = start + 1
+    while index < len(source):
+        char = source[index]
+        if char == "\\":
+            index += 2
+        elif char == "`":
+            return index + 1
+        elif source.startswith("${", index):
+            index = _scan_template_expression(source, index + 2)
+        else:
+            index += 1
+    return index
+
+
+def _scan_template_expression(source, index):
+    depth = 1
+    while index < len(source) and depth:
+        char = source[index]
+        if char in "'\"":
+            index = _scan_quoted(source, index)
+        elif char == "`":
+            index = _scan_template(source, index)
+        else:
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+            index += 1
+    return index
+
+
+def _scan_regex(source, start):
+    index = start + 1
+    in_class = False
+    while index < len(source):
+        char = source[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == "\n":
+            break
+        index += 1
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            break
+    while index < len(source) and source[index].isalpha():
+        index += 1
+    return index
+
+
+def _is_word_char(char):
+    return char.isalnum() or char in "_$"
+
+
+def _tokenize(source, javascript):
+    """
+    Yield ``(kind, text, line, column)`` tokens, where kind is one of
+    ``space``, ``comment``, ``literal`` or ``code``.
+    """
+    index = 0
+    line = 0
+    line_start = 0
+    previous = ""
+    length = len(source)
+    while index < length:
+        char = source[index]
+        start = index
+        if char.isspace():
+            while index < length and source[index].isspace():
+                index += 1
+            kind = "space"
+        elif source.startswith("/*", index):
+            end = source.find("*/", index + 2)
+            index = length if end == -1 else end + 2
+            kind = "comment"
+        elif javascript and source.startswith("//", index):
+            end = source.find("\n", index)
+            index = length if end == -1 else end
+            kind = "comment"
+        elif char in "'\"":
+            index = _scan_quoted(source, index)
+            kind = "literal"
+        elif javascript and char == "`":
+            index = _scan_template(source, index)
+            kind = "literal"
+        elif javascript and char == "/" and (
+            not previous
+            or previous in _JS_REGEX_AFTER_PUNCT
+            or previous in _JS_REGEX_AFTER_WORDS
+        ):
+            index = _scan_regex(source, index)
+            kind = "literal"
+        elif _is_word_char(char):
+            while index < length and _is_word_char(source[index]):
+                index += 1
+            kind = "code"
+        else:
+            index += 1
+            kind = "code"
+
+        text = source[start:index]
+        yield kind, text, line, start - line_start
+        if kind not in ("space", "comment"):
+            previous = text if _is_word_char(text[0]) else text[-1]
+        newlines = text.count("\n")
+        if newlines:
+            line += newlines
+            line_start = start + text.rfind("\n") + 1
+
+
+def minify_css(source):
+    """Return ``(code, segments)`` for a CSS source string."""
+    output = _Output()
+    pending_space = False
+    for kind, text, line, column in _tokenize(source, javascript=False):
+        if kind in ("space", "comment"):
+            pending_space = True
+            continue
+        if not output.parts:
+            pending_space = False
+        if pending_space and output.last not in _CSS_TIGHT + ":" and text[0] not in _CSS_TIGHT:
+            output.write(" ", line, column)
+        pending_space = False
+        if text == "}" and output.last == ";":
+            output.drop_last_char()
+        output.write(text, line, column)
+    return output.getvalue(), output.segments
+
+
+def _js_needs_space(last, text):
+    if _is_word_char(last) and (_is_word_char(text[0]) or text[0] in ".\\"):
+        return True
+    return last + text[0] in ("++", "--", "//", "/*")
+
+
+def minify_js(source):
+    """Return ``(code, segments)`` for a JavaScript source string."""
+    output = _Output()
+    pending = None
+    for kind, text, line, column in _tokenize(source, javascript=True):
+        if kind in ("space", "comment"):
+            if "\n" in text:
+                pending = "\n"
+            elif pending is None:
+                pending = " "
+            continue
+        if pending == "\n":
+            output.newline()
+        elif pending == " " and output.parts and _js_needs_space(output.last, text):
+            output.write(" ", line, column)
+        pending = None
+        output.write(text, line, column)
+    return output.getvalue(), output.segments
+
+
+MINIFIERS = {
+    "css": minify_css,
+    "js": minify_js,
+}
+
+
+def source_map_comment(kind, map_name):
+    if kind == "css":
+        return "/*# sourceMappingURL=%s */" % map_name
+    return "//# sourceMappingURL=%s" % map_name
+
+
+def build_bundle(name, kind, files, read):
+    """
+    Minify and concatenate ``files`` into one bundle.
+
+    ``read`` is a callable returning the text content of a static path.
+    Returns ``(code, source_map_json)``.
+    """
+    path = bundle_path(name, kind)
+    directory = posixpath.dirname(path)
+    source_map = SourceMap(posixpath.basename(path))
+    minify = MINIFIERS[kind]
+
+    chunks = []
+    line_offset = 0
+    for file in files:
+        code, segments = minify(read(file))
+        if not code:
+            continue
+        source = source_map.add_source(posixpath.relpath(file, directory))
+        for generated_line, generated_column, line, column in segments:
+            source_map.add(generated_line + line_offset, generated_column, source, line, column)
+        if kind == "js":
+            # Guard against files that do not end with a semicolon.
+            code += ";"
+        chunks.append(code)
+        line_offset += code.count("\n") + 1
+
+    map_name = posixpath.basename(path) + ".map"
+    chunks.append(source_map_comment(kind, map_name))
+    return "\n".join(chunks) + "\n", source_map.as_json()
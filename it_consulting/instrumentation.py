@@ -0,0 +1,200 @@
+"""
+Per-request performance metrics.
+
+``ServerTimingMiddleware`` (in ``it_consulting.middleware``) starts a
+``RequestMetrics`` collector for each request and makes it current through a
+context variable. Instrumented code adds to it while the request runs:
+
+* every database query, through a connection execute wrapper;
+* cache hits and misses per cache layer, through ``CacheMetricsMixin`` on
+  the cache backends and conditional page requests in ``home.http_cache``;
+* page routing and template rendering, through the middleware and the
+  ``before_serve_page`` hook in ``home.wagtail_hooks``;
+* top-level StreamField block rendering, through ``home.blocks.TimedRenderMixin``.
+
+Queries and renders over the slow log thresholds are also written to the
+slow operation log (see ``it_consulting.slowlog``).
+
+All of these are no-ops when no collector is current (management commands,
+or when the middleware is disabled).
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from it_consulting import slowlog
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+_MISSING = object()
+
+
+class RequestMetrics:
+    def __init__(self, path=None):
+        self.path = path
+        self.start = time.perf_counter()
+        self.view_start = None
+        self.timings = {}
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache = {}
+        self.blocks = {}
+        self.block_depth = 0
+        self.current_block = None
+        self.page_type = None
+        self.page_id = None
+
+    def add_timing(self, name, duration):
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+
+    def add_cache_lookups(self, layer, hits, misses):
+        layer_hits, layer_misses = self.cache.get(layer, (0, 0))
+        self.cache[layer] = (layer_hits + hits, layer_misses + misses)
+
+    @property
+    def cache_hits(self):
+        return sum(hits for hits, misses in self.cache.values())
+
+    @property
+    def cache_misses(self):
+        return sum(misses for hits, misses in self.cache.values())
+
+    def add_block(self, block_type, duration):
+        count, total = self.blocks.get(block_type, (0, 0.0))
+        self.blocks[block_type] = (count + 1, total + duration)
+
+    def server_timing(self):
+        """Return the ``Server-Timing`` header value, durations in ms."""
+        entries = ["%s;dur=%.2f" % (name, duration * 1000) for name, duration in self.timings.items()]
+        entries.append('db;desc="%d queries";dur=%.2f' % (self.db_queries, self.db_time * 1000))
+        entries.append('cache;desc="%d hits, %d misses"' % (self.cache_hits, self.cache_misses))
+        entries.extend(
+            'block.%s;desc="%d rendered";dur=%.2f' % (block_type, count, total * 1000)
+            for block_type, (count, total) in sorted(self.blocks.items())
+        )
+        return ", ".join(entries)
+
+    def as_dict(self):
+        return {
+            "timings_ms": {name: round(duration * 1000, 3) for name, duration in self.timings.items()},
+            "db": {"queries": self.db_queries, "time_ms": round(self.db_time * 1000, 3)},
+            "cache": {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "layers": {layer: {"hits": hits, "misses": misses} for layer, (hits, misses) in self.cache.items()},
+            },
+            "blocks": {
+                block_type: {"count": count, "time_ms": round(total * 1000, 3)}
+                for block_type, (count, total) in sorted(self.blocks.items())
+            },
+        }
+
+
+def get_current_metrics():
+    return _current_metrics.get()
+
+
+@contextmanager
+def collect_metrics(path=None):
+    """Make a new ``RequestMetrics`` current for the duration of the block."""
+    metrics = RequestMetrics(path)
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to the current request's ``name`` timing."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_timing(name, time.perf_counter() - start)
+
+
+@contextmanager
+def timed_block(block_type):
+    """Time a StreamField block render. Nested blocks are counted as part of
+    their outermost block."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    metrics.block_depth += 1
+    if metrics.block_depth == 1:
+        metrics.current_block = block_type
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.block_depth -= 1
+        if metrics.block_depth == 0:
+            duration = time.perf_counter() - start
+            metrics.add_block(block_type, duration)
+            slowlog.record("block", duration, metrics)
+            metrics.current_block = None
+
+
+def query_metrics_wrapper(execute, sql, params, many, context):
+    """Database execute wrapper counting queries and their time, and logging
+    slow ones."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        metrics.db_queries += 1
+        metrics.db_time += duration
+        slowlog.record_query(sql, duration, metrics)
+
+
+class CacheMetricsMixin:
+    """Counts cache hits and misses of ``get`` and ``get_many`` for the
+    current request. Mix into any cache backend class; the ``LAYER`` key of
+    the cache's settings names it in the metrics (default: ``"default"``)."""
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self.metrics_layer = params.get("LAYER", "default")
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        metrics = _current_metrics.get()
+        # BaseCache.get_many() is implemented with get(); those lookups are
+        # counted by get_many() below.
+        if metrics is not None and default is not getattr(self, "_missing_key", _MISSING):
+            if value is _MISSING:
+                metrics.add_cache_lookups(self.metrics_layer, 0, 1)
+            else:
+                metrics.add_cache_lookups(self.metrics_layer, 1, 0)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = super().get_many(keys, version)
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.add_cache_lookups(self.metrics_layer, len(values), len(keys) - len(values))
+        return values
+
+
+class InstrumentedLocMemCache(CacheMetricsMixin, LocMemCache):
+    pass
+
+
+class InstrumentedFileBasedCache(CacheMetricsMixin, FileBasedCache):
+    pass
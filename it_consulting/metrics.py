@@ -0,0 +1,157 @@
+"""
+Prometheus metrics, exposed in the text format at ``/metrics``.
+
+Request, database and cache metrics are recorded at the end of each request
+from the ``RequestMetrics`` collected by ``ServerTimingMiddleware`` (see
+``it_consulting.instrumentation``); other metrics are updated where the work
+happens.
+
+Under gunicorn each worker has its own copy of every metric. Set the
+``PROMETHEUS_MULTIPROC_DIR`` environment variable to a writable, empty
+directory to have workers write their values to files there instead, which
+the ``/metrics`` view aggregates (see ``gunicorn.conf.py``).
+
+Access requires a staff session, or ``Authorization: Bearer <METRICS_TOKEN>``
+for scrapers.
+"""
+
+import functools
+import hmac
+import os
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from wagtail.images import get_image_model
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    # Management commands run before gunicorn has created it.
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+REQUEST_LATENCY = Histogram(
+    "django_request_duration_seconds",
+    "Request latency, by view and Wagtail page type.",
+    ["view", "page_type", "method"],
+)
+RESPONSES = Counter(
+    "django_responses_total",
+    "Responses, by view and status code.",
+    ["view", "status"],
+)
+DB_QUERIES = Counter(
+    "django_db_queries_total",
+    "Database queries made while handling requests, by view.",
+    ["view"],
+)
+DB_QUERY_TIME = Counter(
+    "django_db_query_duration_seconds_total",
+    "Time spent in database queries while handling requests, by view.",
+    ["view"],
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups while handling requests, by cache layer and result (hit or miss).",
+    ["layer", "result"],
+)
+RENDITIONS_GENERATED = Counter(
+    "wagtail_image_renditions_generated_total",
+    "Image renditions generated.",
+)
+RENDITION_GENERATION_TIME = Histogram(
+    "wagtail_image_rendition_generation_seconds",
+    "Time taken to generate an image rendition.",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SEARCH_LATENCY = Histogram(
+    "site_search_duration_seconds",
+    "Time taken to run a site search and fetch a page of results.",
+)
+CAROUSEL_EVENTS = Counter(
+    "carousel_tracking_events_total",
+    "Carousel tracking events received, by action.",
+    ["action"],
+)
+BUFFER_DEPTH = Gauge(
+    "buffer_depth",
+    "Entries waiting in in-process buffers, by buffer.",
+    ["buffer"],
+    multiprocess_mode="livesum",
+)
+
+
+def observe_request(request, response, metrics, duration):
+    match = getattr(request, "resolver_match", None)
+    view = match.view_name if match else "<unresolved>"
+    REQUEST_LATENCY.labels(view, metrics.page_type or "", request.method).observe(duration)
+    RESPONSES.labels(view, str(response.status_code)).inc()
+    DB_QUERIES.labels(view).inc(metrics.db_queries)
+    DB_QUERY_TIME.labels(view).inc(metrics.db_time)
+    for layer, (hits, misses) in metrics.cache.items():
+        if hits:
+            CACHE_LOOKUPS.labels(layer, "hit").inc(hits)
+        if misses:
+            CACHE_LOOKUPS.labels(layer, "miss").inc(misses)
+
+
+def set_buffer_depth(name, depth):
+    BUFFER_DEPTH.labels(name).set(depth)
+
+
+def install_rendition_metrics():
+    """
+    Record rendition generation by wrapping the image model's
+    ``generate_rendition_file()``, which both ``get_rendition()`` and
+    ``get_renditions()`` use for missing renditions, as Wagtail has no signal
+    or hook for it.
+    """
+    image_model = get_image_model()
+    generate = image_model.generate_rendition_file
+    if getattr(generate, "records_metrics", False):
+        return
+
+    @functools.wraps(generate)
+    def generate_rendition_file(self, filter, **kwargs):
+        start = time.perf_counter()
+        file = generate(self, filter, **kwargs)
+        RENDITION_GENERATION_TIME.observe(time.perf_counter() - start)
+        RENDITIONS_GENERATED.inc()
+        return file
+
+    generate_rendition_file.records_metrics = True
+    image_model.generate_rendition_file = generate_rendition_file
+
+
+def get_registry():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def is_authorized(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(credentials.encode(), token.encode()):
+            return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+def metrics_view(request):
+    if not is_authorized(request):
+        response = HttpResponse("Authentication required.", status=401, content_type="text/plain")
+        response["WWW-Authenticate"] = 'Bearer realm="metrics"'
+        return response
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
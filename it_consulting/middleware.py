@@ -0,0 +1,248 @@
+"""
+Project-wide middleware.
+"""
+
+import json
+import logging
+import mimetypes
+import os
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from it_consulting import metrics as prometheus_metrics
+from it_consulting import slowlog
+from it_consulting.instrumentation import collect_metrics, get_current_metrics, query_metrics_wrapper
+
+request_metrics_logger = logging.getLogger("it_consulting.request_metrics")
+
+# Preferred order when the client accepts several encodings.
+STATIC_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=60"
+
+
+def parse_accept_encoding(header):
+    """Return the set of content codings the client accepts (q > 0)."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class PrecompressedStaticFilesMiddleware:
+    """
+    Serve files from STATIC_ROOT directly, preferring the brotli or gzip
+    variants written by ``CompressedManifestStaticFilesStorage``.
+
+    Hashed file names (those listed in the staticfiles manifest) never change
+    content, so they are sent with an immutable, year-long Cache-Control.
+    Anything else gets a short max-age so deploys are picked up quickly.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.static_prefix = settings.STATIC_URL
+        self.static_root = settings.STATIC_ROOT
+        self.immutable_names = set(
+            getattr(staticfiles_storage, "hashed_files", {}).values()
+        )
+
+    def __call__(self, request):
+        if (
+            self.static_root
+            and request.method in ("GET", "HEAD")
+            and request.path_info.startswith(self.static_prefix)
+        ):
+            response = self.serve(request, request.path_info[len(self.static_prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.static_root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        accepted = parse_accept_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        has_variants = False
+        encoding = None
+        serve_path = path
+        for coding, suffix in STATIC_ENCODINGS:
+            if os.path.isfile(path + suffix):
+                has_variants = True
+                if encoding is None and coding in accepted:
+                    encoding = coding
+                    serve_path = path + suffix
+
+        if not was_modified_since(
+            request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime
+        ):
+            # Caches update their stored headers from the 304.
+            response = HttpResponseNotModified()
+            self.add_cache_headers(response, name, stat, has_variants)
+            return response
+
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(
+            open(serve_path, "rb"),
+            content_type=content_type or "application/octet-stream",
+        )
+        # FileResponse guesses headers from the (compressed) file on disk.
+        response.headers.pop("Content-Disposition", None)
+        if encoding:
+            response["Content-Encoding"] = encoding
+        self.add_cache_headers(response, name, stat, has_variants)
+        return response
+
+    def add_cache_headers(self, response, name, stat, has_variants):
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        if has_variants:
+            response["Vary"] = "Accept-Encoding"
+        if name in self.immutable_names:
+            response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response["Cache-Control"] = DEFAULT_CACHE_CONTROL
+
+
+def request_metrics_enabled():
+    return (
+        getattr(settings, "SERVER_TIMING", "staff") != "off"
+        or getattr(settings, "REQUEST_METRICS_SAMPLE_RATE", 0.0)
+        or getattr(settings, "METRICS_ENABLED", True)
+    )
+
+
+class ServerTimingMiddleware:
+    """
+    Collect per-request performance metrics (see
+    ``it_consulting.instrumentation``) and report them in a ``Server-Timing``
+    header, a sampled JSON log line and the Prometheus metrics (see
+    ``it_consulting.metrics``, enabled by ``METRICS_ENABLED``).
+
+    ``SERVER_TIMING`` controls who gets the header: ``"staff"`` (the
+    default), ``"all"`` or ``"off"``. Headers on shared-cacheable responses
+    are cached along with them, so ``"all"`` is meant for load tests.
+    ``REQUEST_METRICS_SAMPLE_RATE`` is the fraction of requests logged to
+    the ``it_consulting.request_metrics`` logger.
+
+    Must be first in MIDDLEWARE, with ``ServerTimingViewMiddleware`` last;
+    the time between the two is reported as ``middleware``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.mode = getattr(settings, "SERVER_TIMING", "staff")
+        self.sample_rate = getattr(settings, "REQUEST_METRICS_SAMPLE_RATE", 0.0)
+        self.export = getattr(settings, "METRICS_ENABLED", True)
+        if not request_metrics_enabled():
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        with collect_metrics(request.path) as metrics, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_metrics_wrapper))
+            response = self.get_response(request)
+
+        total = time.perf_counter() - metrics.start
+        metrics.add_timing("total", total)
+        metrics.add_timing("middleware", total - metrics.timings.get("app", 0.0))
+
+        if self.show_header(request):
+            response["Server-Timing"] = metrics.server_timing()
+        if self.sample_rate and random.random() < self.sample_rate:
+            self.log(request, response, metrics)
+        if self.export:
+            prometheus_metrics.observe_request(request, response, metrics, total)
+        return response
+
+    def show_header(self, request):
+        if self.mode == "all":
+            return True
+        if self.mode == "staff":
+            user = getattr(request, "user", None)
+            return bool(user and user.is_staff)
+        return False
+
+    def log(self, request, response, metrics):
+        match = getattr(request, "resolver_match", None)
+        request_metrics_logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            **metrics.as_dict(),
+        }, sort_keys=True))
+
+
+def template_name(response):
+    """The name of the template a ``TemplateResponse`` was rendered with."""
+    name = response.template_name
+    if isinstance(name, (list, tuple)):
+        # Picked by select_template(), so the first that exists was used.
+        return response.resolve_template(name).origin.template_name if name else None
+    return name if isinstance(name, str) else getattr(getattr(name, "origin", None), "template_name", None)
+
+
+class ServerTimingViewMiddleware:
+    """
+    Inner half of ``ServerTimingMiddleware``: times the view including
+    template rendering (``app``), and template rendering alone (``render``),
+    logging slow renders to the slow operation log.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not request_metrics_enabled():
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        metrics = get_current_metrics()
+        if metrics is None:
+            return self.get_response(request)
+        metrics.view_start = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            metrics.add_timing("app", time.perf_counter() - metrics.view_start)
+
+    def process_template_response(self, request, response):
+        metrics = get_current_metrics()
+        if metrics is not None:
+            start = time.perf_counter()
+
+            def record_render_time(rendered):
+                duration = time.perf_counter() - start
+                metrics.add_timing("render", duration)
+                if slowlog.is_slow("template", duration):
+                    slowlog.record("template", duration, metrics, template=template_name(response))
+
+            response.add_post_render_callback(record_render_time)
+        return response
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "it_consulting.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -57,6 +58,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "wagtail.contrib.redirects.middleware.RedirectMiddleware",
+    "it_consulting.middleware.ServerTimingViewMiddleware",
 ]
 
 ROOT_URLCONF = "it_consulting.urls"
@@ -142,6 +144,46 @@ STATIC_URL = "/static/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
 
+# Minified CSS/JS bundles, one per block family, built during collectstatic
+# by it_consulting.storage.BundledManifestStaticFilesStorage and referenced
+# with the {% static_bundle %} template tag. Until STATIC_BUNDLES_ENABLED is
+# set, the tag links the individual source files instead. The bundles hold
+# the files base.html has always linked; the hero banner and theme selector
+# block templates include their own bundles, so pages without those blocks
+# don't load them.
+STATIC_BUNDLES = {
+    "core": {
+        "css": ["css/it_consulting.css"],
+        "js": ["js/it_consulting.js"],
+    },
+    "hero": {
+        "css": [
+            "css/hero-carousel.css",
+            "css/hero-video-background.css",
+        ],
+        "js": [
+            "js/hero-carousel.js",
+            "js/hero-video-background.js",
+        ],
+    },
+    "services": {
+        "css": ["css/service-card.css", "css/service-cards.css"],
+    },
+    "welcome": {
+        "css": ["css/welcome_page.css"],
+    },
+    "hero_banner": {
+        "css": ["css/hero-banner.css"],
+        "js": ["js/hero-banner.js"],
+    },
+    "theme_selector": {
+        "css": ["css/theme-selector.css"],
+        "js": ["js/theme-selector.js"],
+    },
+}
+
+STATIC_BUNDLES_ENABLED = False
+
 # Default storage settings
 # See https://docs.djangoproject.com/en/5.0/ref/settings/#std-setting-STORAGES
 STORAGES = {
@@ -170,6 +212,85 @@ WAGTAILSEARCH_BACKENDS = {
     }
 }
 
+# HTTP caching of page responses (see home.http_cache). Bump
+# PAGE_CACHE_VERSION to invalidate every page ETag, e.g. after a template change.
+PAGE_CACHE_VERSION = ""
+PAGE_CACHE_CONTROL = {"public": True, "max_age": 0, "s_maxage": 86400}
+
+# CDN purge backends, notified when pages are published or the settings
+# snippets and images they depend on change (see home.purge), e.g.
+# {"default": {"BACKEND": "home.purge.HTTPPurgeBackend", "LOCATION": "https://..."}}
+CDN_PURGE_BACKENDS = {}
+
+# Per-request performance metrics (see it_consulting.instrumentation).
+# SERVER_TIMING is who gets a Server-Timing header: "staff", "all" or "off";
+# REQUEST_METRICS_SAMPLE_RATE is the fraction of requests logged as JSON to
+# the it_consulting.request_metrics logger.
+SERVER_TIMING = "staff"
+REQUEST_METRICS_SAMPLE_RATE = 0.0
+
+# Sampling profiler for StreamField block rendering (see home.profiling):
+# the fraction of block renders timed, the size of each process's in-memory
+# sample buffer, and how often (seconds) it is written to the database.
+BLOCK_PROFILE_SAMPLE_RATE = 0.0
+BLOCK_PROFILE_BUFFER_SIZE = 10000
+BLOCK_PROFILE_FLUSH_INTERVAL = 60
+
+# Slow operation log (see it_consulting.slowlog): queries and block or
+# template renders taking at least SLOW_QUERY_MS / SLOW_RENDER_MS are written
+# as JSON lines to SLOW_LOG_PATH (disabled when empty). Rotate it externally
+# (e.g. logrotate to SLOW_LOG_PATH.1, .2...); the admin viewer also reads up
+# to SLOW_LOG_BACKUP_COUNT rotated files.
+SLOW_LOG_PATH = ""
+SLOW_LOG_BACKUP_COUNT = 5
+SLOW_QUERY_MS = 100
+SLOW_RENDER_MS = 200
+
+# Page revision retention, applied by the prune_revisions command (see
+# home.revisions): the newest REVISION_RETENTION_KEEP revisions of each page
+# and all published ones are kept, others older than
+# REVISION_RETENTION_MAX_AGE_DAYS are deleted; the remaining ones older than
+# REVISION_COMPRESS_AFTER_DAYS are stored compressed.
+REVISION_RETENTION_KEEP = 20
+REVISION_RETENTION_MAX_AGE_DAYS = 90
+REVISION_COMPRESS_AFTER_DAYS = 30
+
+# How long (seconds) deserialized StreamField values of live pages are cached
+# (see home.stream_cache), and in which cache. The same cache holds expanded
+# rich text, previews, the carousel feed, page API data and sitemaps, which
+# are invalidated by bumping version keys and deleting entries in it, so it
+# must be shared by every process serving the site (see production.py).
+STREAMFIELD_CACHE_ALIAS = "default"
+STREAMFIELD_CACHE_TIMEOUT = 3600
+
+# How long (seconds) expanded rich text HTML is cached, in the
+# STREAMFIELD_CACHE_ALIAS cache (see home.rich_text).
+RICH_TEXT_CACHE_TIMEOUT = 3600
+
+# Update each editor's last preview by re-rendering only the changed
+# StreamField blocks (see home.preview), keeping it for this many seconds.
+INCREMENTAL_PREVIEW_ENABLED = True
+INCREMENTAL_PREVIEW_TIMEOUT = 1800
+
+# URLs per sitemap before sitemap.xml becomes an index of several, and how
+# long (seconds) each is cached in the STREAMFIELD_CACHE_ALIAS cache (see
+# home.sitemap).
+SITEMAP_MAX_URLS = 50000
+SITEMAP_CACHE_TIMEOUT = 3600
+
+# The instrumented backend counts cache hits and misses for the metrics.
+CACHES = {
+    "default": {
+        "BACKEND": "it_consulting.instrumentation.InstrumentedLocMemCache",
+        "LAYER": "default",
+    }
+}
+
+# Prometheus metrics at /metrics (see it_consulting.metrics), readable by
+# staff users or with "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_ENABLED = True
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
 # Base URL to use when referring to full URLs within the Wagtail admin backend -
 # e.g. in notification emails. Don't include '/admin' or a trailing slash
 WAGTAILADMIN_BASE_URL = "http://example.com"
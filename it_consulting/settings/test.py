@@ -0,0 +1,12 @@
+from .dev import *
+
+# Copy a migrated, pre-seeded template database instead of migrating for
+# every run (see it_consulting.test_runner). Templates are kept in
+# TEST_TEMPLATE_DB_DIR, or a directory in the system temp dir if empty.
+TEST_RUNNER = "it_consulting.test_runner.TemplateDatabaseTestRunner"
+TEST_TEMPLATE_DB_DIR = os.environ.get("TEST_TEMPLATE_DB_DIR", "")
+
+# Hashing passwords with the production hasher makes every login slow.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
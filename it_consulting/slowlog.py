@@ -0,0 +1,159 @@
+"""
+Slow operation log.
+
+Database queries slower than ``SLOW_QUERY_MS`` and StreamField block or
+template renders slower than ``SLOW_RENDER_MS`` are appended as JSON lines to
+``SLOW_LOG_PATH``. Every gunicorn worker appends to the same file, so it's
+left to an external tool such as logrotate to rotate it (to ``.1``, ``.2``...,
+uncompressed); the ``WatchedFileHandler`` reopens it once it's moved. Each
+entry records the duration,
+the page being served and the block being rendered (when known), the SQL
+with literal values scrubbed (query parameters are never logged) or the
+template name, and the innermost frames of the project code that caused it.
+
+Operations are only checked during requests, using the ``RequestMetrics``
+instrumentation (see ``it_consulting.instrumentation``). The log can be
+browsed in the Wagtail admin under Reports > Slow operations.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from logging.handlers import WatchedFileHandler
+
+from django.conf import settings
+
+logger = logging.getLogger("it_consulting.slowlog")
+logger.propagate = False
+
+STACK_LIMIT = 8
+
+# The instrumentation itself is left out of stacks.
+_IGNORED_FILES = {
+    os.path.join(os.path.dirname(__file__), name) for name in ("slowlog.py", "instrumentation.py", "middleware.py")
+}
+
+_handler_lock = threading.Lock()
+_handler_path = None
+
+# Quoted strings, then numbers not part of an identifier.
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+
+
+def scrub_sql(sql):
+    """Replace literal values in ``sql`` with ``?``."""
+    return _SQL_LITERALS.sub("?", sql)
+
+
+def get_log_path():
+    return getattr(settings, "SLOW_LOG_PATH", "")
+
+
+def configure_handler():
+    """(Re)attach the file handler if ``SLOW_LOG_PATH`` changed."""
+    global _handler_path
+    path = get_log_path()
+    if path == _handler_path:
+        return
+    with _handler_lock:
+        if path == _handler_path:
+            return
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                handler = WatchedFileHandler(path)
+            except OSError:
+                # An unwritable log must not break the request being logged.
+                logging.getLogger("it_consulting").warning("Can't open the slow operation log %s", path, exc_info=True)
+            else:
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+                logger.setLevel(logging.INFO)
+        _handler_path = path
+
+
+def project_stack(limit=STACK_LIMIT):
+    """The innermost ``limit`` frames of project code on the current stack,
+    outermost first, excluding this module and installed packages."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(base_dir)
+        and frame.filename not in _IGNORED_FILES
+        and "site-packages" not in frame.filename
+    ]
+    return [
+        "%s:%d in %s" % (os.path.relpath(frame.filename, base_dir), frame.lineno, frame.name)
+        for frame in frames[-limit:]
+    ]
+
+
+def threshold(kind):
+    if kind == "query":
+        return getattr(settings, "SLOW_QUERY_MS", 100)
+    return getattr(settings, "SLOW_RENDER_MS", 200)
+
+
+def is_slow(kind, duration):
+    """Whether a ``kind`` operation taking ``duration`` seconds is logged."""
+    return bool(get_log_path()) and duration * 1000 >= threshold(kind)
+
+
+def record(kind, duration, metrics, **details):
+    """Log the operation if it took longer than the ``kind``'s threshold.
+    ``duration`` is in seconds."""
+    if not is_slow(kind, duration):
+        return
+    configure_handler()
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "kind": kind,
+        "duration_ms": round(duration * 1000, 3),
+        "page_id": getattr(metrics, "page_id", None),
+        "block_type": getattr(metrics, "current_block", None),
+        "path": getattr(metrics, "path", None),
+        "pid": os.getpid(),
+        "stack": project_stack(),
+        **details,
+    }
+    logger.info(json.dumps(entry, default=str))
+
+
+def record_query(sql, duration, metrics):
+    record("query", duration, metrics, sql=scrub_sql(sql))
+
+
+def read_entries(path=None, limit=1000):
+    """Return up to ``limit`` of the newest entries, newest first, reading
+    up to ``SLOW_LOG_BACKUP_COUNT`` rotated files if needed. Workers append
+    concurrently, so entries may be slightly out of order."""
+    path = path or get_log_path()
+    if not path:
+        return []
+    entries = []
+    backups = getattr(settings, "SLOW_LOG_BACKUP_COUNT", 5)
+    for index in range(backups + 1):
+        filename = path if index == 0 else "%s.%d" % (path, index)
+        try:
+            with open(filename) as f:
+                lines = deque(f, maxlen=limit - len(entries))
+        except FileNotFoundError:
+            break
+        for line in reversed(lines):
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A line cut short by a crash.
+                continue
+        if len(entries) >= limit:
+            break
+    return entries
@@ -0,0 +1,110 @@
+"""
+Static files storage for production.
+
+``CompressedManifestStaticFilesStorage`` extends Django's
+``ManifestStaticFilesStorage`` so that ``collectstatic`` also writes gzip and
+brotli variants of text assets next to both the original and the hashed
+copies. ``it_consulting.middleware.PrecompressedStaticFilesMiddleware`` picks
+those variants up at request time.
+
+``BundledManifestStaticFilesStorage`` additionally builds the minified
+bundles declared in ``STATIC_BUNDLES`` (see ``it_consulting.bundles``) before
+hashing, so bundles and their source maps are hashed and compressed like any
+other static file.
+"""
+
+import gzip
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from it_consulting.bundles import build_bundle, bundle_path, get_bundles
+
+
+class CompressedStaticFilesMixin:
+    """Write ``.gz`` and ``.br`` siblings for compressible static files."""
+
+    # File extensions worth compressing; images and fonts are already compressed.
+    compress_extensions = (".css", ".js", ".svg")
+
+    # Files smaller than this are not worth the extra request negotiation.
+    compress_min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+
+        if dry_run:
+            return
+
+        names = set(paths)
+        names.update(getattr(self, "hashed_files", {}).values())
+        for name in sorted(names):
+            if name.endswith(self.compress_extensions):
+                self.compress_file(name)
+
+    def compress_file(self, name):
+        """Write the compressed variants of ``name`` and return their names."""
+        path = self.path(name)
+        with open(path, "rb") as source:
+            content = source.read()
+
+        if len(content) < self.compress_min_size:
+            return []
+
+        written = []
+        for suffix, compressed in (
+            (".gz", gzip.compress(content, compresslevel=9, mtime=0)),
+            (".br", brotli.compress(content, mode=brotli.MODE_TEXT)),
+        ):
+            # Only keep variants that actually save bytes on the wire.
+            if len(compressed) >= len(content):
+                continue
+            with open(path + suffix, "wb") as target:
+                target.write(compressed)
+            written.append(name + suffix)
+        return written
+
+
+class CompressedManifestStaticFilesStorage(
+    CompressedStaticFilesMixin, ManifestStaticFilesStorage
+):
+    pass
+
+
+class BundledStaticFilesMixin:
+    """Build the ``STATIC_BUNDLES`` bundles from the collected files."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name in self.build_bundles():
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def read_text(self, name):
+        with self.open(name) as f:
+            return f.read().decode("utf-8")
+
+    def write_text(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self.save(name, ContentFile(content.encode("utf-8")))
+
+    def build_bundles(self):
+        """Write every configured bundle and return the names written."""
+        written = []
+        for name, kinds in get_bundles().items():
+            for kind, files in kinds.items():
+                path = bundle_path(name, kind)
+                code, source_map = build_bundle(name, kind, files, self.read_text)
+                self.write_text(path, code)
+                self.write_text(path + ".map", source_map)
+                written.extend([path, path + ".map"])
+        return written
+
+
+class BundledManifestStaticFilesStorage(
+    BundledStaticFilesMixin, CompressedManifestStaticFilesStorage
+):
+    pass
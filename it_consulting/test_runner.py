@@ -0,0 +1,146 @@
+"""
+Test runner that reuses a migrated template database.
+
+Running the full migration chain (Wagtail's and the project's) dominates the
+start of a test run. ``TemplateDatabaseTestRunner`` instead migrates a SQLite
+database once, seeds it with shared fixtures (see ``seed_fixtures()``) and
+keeps it in ``TEST_TEMPLATE_DB_DIR``, keyed by a fingerprint of the migration
+files and the fixture code. Each run copies the template into a fresh
+temporary directory, and Django's ``--parallel`` support clones that copy
+once per worker.
+
+Use ``--rebuild-template`` to force a new template; it is rebuilt
+automatically whenever a migration or the fixtures change. Databases other
+than SQLite are set up the usual way. ``--parallel`` needs ``tblib``
+installed to report errors from the workers.
+"""
+
+import hashlib
+import inspect
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+FIXTURES_SLUG = "test-fixtures"
+FIXTURE_PAGES = 20
+
+
+def seed_fixtures():
+    """
+    Create the shared fixtures: a tree of ``FIXTURE_PAGES`` generated pages
+    under a ``FIXTURES_SLUG`` page, outside the default site so it doesn't
+    change what the site serves, and some inactive settings snippets.
+    """
+    from wagtail.models import Page
+
+    from home.content_generator import generate_content
+    from home.models import HomePage
+
+    fixtures_root = Page.get_first_root_node().add_child(
+        instance=HomePage(title="Test fixtures", slug=FIXTURES_SLUG)
+    )
+    generate_content(
+        fixtures_root, FIXTURE_PAGES, fanout=5, images=0, themes=1, carousels=1, video_backgrounds=1, seed=0
+    )
+
+
+def template_fingerprint():
+    from home import content_generator, sample_content
+    from home.management.commands.migrate_if_needed import migration_fingerprint
+
+    digest = hashlib.sha256(migration_fingerprint().encode())
+    for module in (content_generator, sample_content, inspect.getmodule(seed_fixtures)):
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()[:16]
+
+
+class TemplateDatabaseTestRunner(DiscoverRunner):
+    def __init__(self, rebuild_template=False, **kwargs):
+        super().__init__(**kwargs)
+        self.rebuild_template = rebuild_template
+        self.run_dir = None
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--rebuild-template",
+            action="store_true",
+            help="Rebuild the migrated template database even if it is up to date.",
+        )
+
+    def get_template_dir(self):
+        return getattr(settings, "TEST_TEMPLATE_DB_DIR", "") or os.path.join(
+            tempfile.gettempdir(), "it_consulting-test-templates"
+        )
+
+    def get_template(self, connection):
+        """Return the path of an up to date template database for ``connection``."""
+        template_dir = self.get_template_dir()
+        path = os.path.join(template_dir, "%s-%s.sqlite3" % (connection.alias, template_fingerprint()))
+        if self.rebuild_template or not os.path.exists(path):
+            os.makedirs(template_dir, exist_ok=True)
+            self.build_template(connection, path)
+        elif self.verbosity >= 1:
+            self.log("Using template database %s for alias %r." % (path, connection.alias))
+        return path
+
+    def build_template(self, connection, path):
+        if self.verbosity >= 1:
+            self.log("Building template database %s for alias %r..." % (path, connection.alias))
+        test_settings = connection.settings_dict["TEST"]
+        old_test_name = test_settings["NAME"]
+        old_name = connection.settings_dict["NAME"]
+        # Built under a temporary name, so concurrent runs never copy a
+        # half-built template.
+        build_path = "%s.%d.tmp" % (path, os.getpid())
+        test_settings["NAME"] = build_path
+        try:
+            connection.creation.create_test_db(verbosity=self.verbosity, autoclobber=True, serialize=False)
+            if connection.alias == "default":
+                seed_fixtures()
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=True)
+        finally:
+            test_settings["NAME"] = old_test_name
+        os.replace(build_path, path)
+
+        # Remove templates for older migrations.
+        prefix = "%s-" % connection.alias
+        for name in os.listdir(os.path.dirname(path)):
+            if name.startswith(prefix) and name.endswith(".sqlite3") and name != os.path.basename(path):
+                os.remove(os.path.join(os.path.dirname(path), name))
+
+    def setup_databases(self, **kwargs):
+        self.run_dir = tempfile.mkdtemp(prefix="it_consulting-tests-")
+        aliases = set(kwargs.pop("aliases", connections))
+        copied = set()
+        for alias in aliases:
+            connection = connections[alias]
+            if connection.vendor != "sqlite" or connection.settings_dict.get("TEST", {}).get("MIRROR"):
+                continue
+            test_name = os.path.join(self.run_dir, "%s.sqlite3" % alias)
+            shutil.copyfile(self.get_template(connection), test_name)
+            connection.settings_dict["TEST"].update(NAME=test_name, MIGRATE=False)
+            copied.add(alias)
+
+        # Copies are used as they are, with keepdb; as migrations are disabled
+        # Django only checks that every model's table exists. Other databases
+        # are created the usual way, with keepdb only if it was asked for.
+        keepdb = self.keepdb
+        self.keepdb = True
+        try:
+            old_config = super().setup_databases(aliases=copied, **kwargs) if copied else []
+        finally:
+            self.keepdb = keepdb
+        if aliases - copied:
+            old_config += super().setup_databases(aliases=aliases - copied, **kwargs)
+        return old_config
+
+    def teardown_databases(self, old_config, **kwargs):
+        super().teardown_databases(old_config, **kwargs)
+        if self.run_dir:
+            shutil.rmtree(self.run_dir, ignore_errors=True)
@@ -6,6 +6,8 @@ from wagtail.admin import urls as wagtailadmin_urls
 from wagtail import urls as wagtail_urls
 from wagtail.documents import urls as wagtaildocs_urls
 
+from home import views as home_views
+from it_consulting.metrics import metrics_view
 from search import views as search_views
 
 urlpatterns = [
@@ -13,6 +15,17 @@ urlpatterns = [
     path("admin/", include(wagtailadmin_urls)),
     path("documents/", include(wagtaildocs_urls)),
     path("search/", search_views.search, name="search"),
+    path("carousel/track/", home_views.carousel_track, name="carousel_track"),
+    path(
+        "carousel/<int:page_id>/<str:block_id>/slides/",
+        home_views.carousel_slides,
+        name="carousel_slides",
+    ),
+    path("api/pages/", home_views.page_api_listing, name="page_api_listing"),
+    path("api/pages/<int:page_id>/", home_views.page_api_detail, name="page_api_detail"),
+    path("sitemap.xml", home_views.sitemap_index, name="sitemap_index"),
+    path("sitemap-<int:index>.xml", home_views.sitemap_chunk, name="sitemap_chunk"),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 
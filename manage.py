@@ -6,7 +6,10 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "it_consulting.settings.dev")
+    if sys.argv[1:2] == ["test"]:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "it_consulting.settings.test")
+    else:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "it_consulting.settings.dev")
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
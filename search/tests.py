@@ -0,0 +1,39 @@
+from django.urls import reverse
+from home.models import HomePage
+
+from wagtail.test.utils import WagtailPageTestCase
+
+
+class SearchQueryBudgetTests(WagtailPageTestCase):
+    """
+    The number of queries for a search results page must not grow with the
+    number of matching pages.
+    """
+
+    def test_search_results(self):
+        homepage = HomePage.objects.get(slug="home", depth=2)
+        url = reverse("search") + "?query=consulting"
+
+        for size in (1, 10, 100):
+            with self.subTest(size=size):
+                # The search index is updated once the transaction commits.
+                with self.captureOnCommitCallbacks(execute=True):
+                    for i in range(HomePage.objects.child_of(homepage).count(), size):
+                        homepage.add_child(
+                            instance=HomePage(title="Consulting %d" % i, search_description="IT consulting")
+                        )
+                # Warm per-process caches (e.g. site root paths) first.
+                self.client.get(url)
+                # The database backend runs the full-text query once for the
+                # paginator count and once for the page of results.
+                with self.assertNumQueries(5):
+                    response = self.client.get(url)
+                self.assertEqual(len(response.context["search_results"]), min(size, 10))
+
+    def test_result_urls(self):
+        homepage = HomePage.objects.get(slug="home", depth=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            page = homepage.add_child(instance=HomePage(title="Consulting", slug="consulting"))
+        response = self.client.get(reverse("search") + "?query=consulting")
+        self.assertEqual(response.context["search_results"][0].result_url, page.url)
+        self.assertContains(response, '<a href="%s">Consulting</a>' % page.url, html=True)
@@ -1,7 +1,11 @@
+from contextlib import nullcontext
+
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.template.response import TemplateResponse
 
-from wagtail.models import Page
+from wagtail.models import Page, Site
+
+from it_consulting.metrics import SEARCH_LATENCY
 
 # To enable logging of search queries for use with the "Promoted search results" module
 # <https://docs.wagtail.org/en/stable/reference/contrib/searchpromotions.html>
@@ -11,30 +15,47 @@ from wagtail.models import Page
 # from wagtail.contrib.search_promotions.models import Query
 
 
+def add_result_urls(results, request):
+    """
+    Set ``result_url`` on each result page, finding the current site and the
+    site root paths once for the whole page of results instead of once per
+    ``{% pageurl %}`` call.
+    """
+    site = Site.find_for_request(request)
+    for result in results:
+        result.result_url = result.get_url(request=request, current_site=site)
+    return results
+
+
 def search(request):
     search_query = request.GET.get("query", None)
     page = request.GET.get("page", 1)
 
-    # Search
-    if search_query:
-        search_results = Page.objects.live().search(search_query)
+    # Search and fetch the page of results, timed for the metrics.
+    with SEARCH_LATENCY.time() if search_query else nullcontext():
+        if search_query:
+            # Results only need the title, URL path and search description,
+            # so StreamField content is never loaded even if they're made
+            # specific.
+            search_results = Page.objects.live().defer_streamfields().search(search_query)
 
-        # To log this query for use with the "Promoted search results" module:
+            # To log this query for use with the "Promoted search results" module:
 
-        # query = Query.get(search_query)
-        # query.add_hit()
+            # query = Query.get(search_query)
+            # query.add_hit()
 
-    else:
-        search_results = Page.objects.none()
+        else:
+            search_results = Page.objects.none()
 
-    # Pagination
-    paginator = Paginator(search_results, 10)
-    try:
-        search_results = paginator.page(page)
-    except PageNotAnInteger:
-        search_results = paginator.page(1)
-    except EmptyPage:
-        search_results = paginator.page(paginator.num_pages)
+        # Pagination
+        paginator = Paginator(search_results, 10)
+        try:
+            search_results = paginator.page(page)
+        except PageNotAnInteger:
+            search_results = paginator.page(1)
+        except EmptyPage:
+            search_results = paginator.page(paginator.num_pages)
+        search_results.object_list = add_result_urls(list(search_results.object_list), request)
 
     return TemplateResponse(
         request,